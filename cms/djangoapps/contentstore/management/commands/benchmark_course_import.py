@@ -0,0 +1,90 @@
+"""
+Command to compare the wall-clock time of course imports with different numbers of threads
+importing the static content.
+"""
+
+
+from time import perf_counter
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+# To run from command line: ./manage.py cms benchmark_course_import /path/to/data course_dir --workers 1 4 8
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py cms benchmark_course_import /edx/var/edxapp/data edX-DemoX --workers 1 4 --settings=devstack
+    """
+    help = (
+        'Imports the given OLX course into throwaway split courses, once for each of the given numbers of '
+        'threads importing the static content, and reports the mean wall-clock time of the imports. The '
+        'throwaway courses and their static content are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'data_directory',
+            help='Directory containing the extracted OLX course.',
+        )
+        parser.add_argument(
+            'course_dir',
+            help='Subdirectory of data_directory containing the OLX course.',
+        )
+        parser.add_argument(
+            '--workers',
+            help='Numbers of threads importing the static content to compare.',
+            nargs='+',
+            default=[1, 4],
+            type=int,
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each import is timed; the mean is reported.',
+            default=1,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for workers in options['workers']:
+            total = 0
+            for _ in range(options['iterations']):
+                total += self._time_import(options['data_directory'], options['course_dir'], workers)
+            self.stdout.write(
+                '{course_dir}\tworkers={workers}\timport_s={import_s:.2f}'.format(
+                    course_dir=options['course_dir'],
+                    workers=workers,
+                    import_s=total / options['iterations'],
+                )
+            )
+
+    @staticmethod
+    def _time_import(data_directory, course_dir, workers):
+        """
+        Returns the time, in seconds, taken to import the given course into a throwaway course,
+        with the given number of threads importing its static content.
+        """
+        store = modulestore()
+        with store.default_store(ModuleStoreEnum.Type.split):
+            course_key = store.make_course_key('benchmark', f'import_{uuid4().hex}', 'run')
+            try:
+                start = perf_counter()
+                import_course_from_xml(
+                    store, ModuleStoreEnum.UserID.mgmt_command, data_directory, [course_dir],
+                    load_error_modules=False,
+                    static_content_store=contentstore(),
+                    target_id=course_key,
+                    create_if_not_present=True,
+                    static_import_workers=workers,
+                )
+                return perf_counter() - start
+            finally:
+                if store.has_course(course_key):
+                    store.delete_course(course_key, ModuleStoreEnum.UserID.mgmt_command)
+                contentstore().delete_all_course_assets(course_key)
@@ -0,0 +1,92 @@
+"""
+Command to compare the codecs of the course structure cache on the structures of real courses.
+"""
+
+
+from time import perf_counter
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+
+from openedx.core.lib.command_utils import parse_course_keys
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache, CourseStructureCodec
+
+# To run from command line: ./manage.py cms benchmark_course_structure_cache course-v1:org+course+run
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py cms benchmark_course_structure_cache 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    help = (
+        'Reports, for each serializer and installed compressor of the course structure cache, the bytes '
+        'stored for the draft structure of each of the given split courses and the latency of setting and '
+        'getting it in the course_structure_cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Course keys of the split courses to benchmark.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each operation is timed; the mean is reported.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if CourseStructureCache().cache is None:
+            raise CommandError('The course_structure_cache is not configured.')
+
+        for course_key in parse_course_keys(options['courses']):
+            store = modulestore()._get_modulestore_for_courselike(course_key)  # pylint: disable=protected-access
+            if store.get_modulestore_type() != ModuleStoreEnum.Type.split:
+                raise CommandError(f'{course_key} is not a split modulestore course.')
+            structure = store._lookup_course(  # pylint: disable=protected-access
+                course_key.for_branch(ModuleStoreEnum.BranchName.draft)
+            ).structure
+
+            for serializer in CourseStructureCodec.SERIALIZERS:
+                for compressor, functions in CourseStructureCodec.COMPRESSORS.items():
+                    if functions is None:
+                        continue
+                    codec = CourseStructureCodec(serializer, compressor)
+                    self.stdout.write(
+                        '{course_key}\tblocks={blocks}\tcodec={serializer}+{compressor}\tbytes={bytes}\t'
+                        'set_ms={set_ms:.2f}\tget_ms={get_ms:.2f}'.format(
+                            course_key=course_key,
+                            blocks=len(structure['blocks']),
+                            serializer=serializer,
+                            compressor=compressor,
+                            **self._measure(structure, codec, options['iterations'])
+                        )
+                    )
+
+    @staticmethod
+    def _measure(structure, codec, iterations):
+        """
+        Returns the bytes stored for the given structure with the given codec, and the mean
+        time, in milliseconds, taken to set it in and get it from the course_structure_cache.
+        """
+        cache = CourseStructureCache(codec)
+        key = f'benchmark_course_structure_cache_{uuid4().hex}'
+        try:
+            start = perf_counter()
+            for _ in range(iterations):
+                cache.set(key, structure)
+            set_ms = (perf_counter() - start) * 1000 / iterations
+
+            start = perf_counter()
+            for _ in range(iterations):
+                cache.get(key)
+            get_ms = (perf_counter() - start) * 1000 / iterations
+        finally:
+            cache.cache.delete(key)
+
+        return {'bytes': len(codec.encode(structure)), 'set_ms': set_ms, 'get_ms': get_ms}
@@ -9,7 +9,7 @@ import pkg_resources
 import shutil
 import tarfile
 from datetime import datetime
-from tempfile import NamedTemporaryFile, mkdtemp
+from tempfile import NamedTemporaryFile
 
 import olxcleaner
 from ccx_keys.locator import CCXLocator
@@ -60,7 +60,7 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError, InvalidProctoringProvider
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import TarExportFS, export_course_to_xml, export_library_to_xml
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 
 from .outlines import update_outline_from_modulestore
@@ -310,20 +310,22 @@ def create_export_tarball(course_module, course_key, context, status=None):
     """
     name = course_module.url_name
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-        if status:
-            status.set_state('Compressing')
-            status.increment_completed_steps()
+        # The OLX files and static assets are streamed straight into the compressed tarball,
+        # rather than being written to a temporary directory which is then compressed.
         LOGGER.debug('tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+        with tarfile.open(fileobj=export_file, mode='w:gz') as tar_file:
+            export_fs = TarExportFS(tar_file)
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, export_fs, name)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_module.id, export_fs, name)
+
+            if status:
+                status.set_state('Compressing')
+                status.increment_completed_steps()
+        export_file.seek(0)
 
     except SerializationError as exc:
         LOGGER.exception('There was an error exporting %s', course_key, exc_info=True)
@@ -356,9 +358,6 @@ def create_export_tarball(course_module, course_key, context, status=None):
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
-    finally:
-        if os.path.exists(root_dir / name):
-            shutil.rmtree(root_dir / name)
 
     return export_file
 
@@ -606,7 +605,8 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
             static_content_store=contentstore(),
             target_id=courselike_key,
             verbose=True,
-            status=self.status
+            status=self.status,
+            static_import_workers=settings.COURSE_IMPORT_STATIC_CONTENT_WORKERS,
         )
 
         new_location = courselike_items[0].location
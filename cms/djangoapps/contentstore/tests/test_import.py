@@ -5,6 +5,8 @@ Tests for import_course_from_xml using the mongo modulestore.
 
 
 import copy
+import os
+import re
 from unittest.mock import patch
 from uuid import uuid4
 
@@ -16,7 +18,7 @@ from django.test.utils import override_settings
 from xmodule.contentstore.django import contentstore
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import ModuleStoreEnum
-from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.django import ASSET_IGNORE_REGEX, modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import check_exact_number_of_calls, check_number_of_calls
 from xmodule.modulestore.xml_importer import import_course_from_xml
@@ -156,6 +158,32 @@ class ContentStoreImportTest(ModuleStoreTestCase):
         self.assertEqual(len(all_assets), 0)
         self.assertEqual(count, 0)
 
+    @ddt.data(1, 4)
+    def test_static_import_workers(self, static_import_workers):
+        """
+        Test that the static files are all imported, whether concurrently with the blocks or not.
+        """
+        static_dir = os.path.join(TEST_DATA_DIR, 'toy', 'static')
+        expected_paths = {
+            os.path.relpath(os.path.join(dirname, filename), static_dir)
+            for dirname, _, filenames in os.walk(static_dir)
+            for filename in filenames
+            if not re.match(ASSET_IGNORE_REGEX, filename)
+        }
+
+        content_store = contentstore()
+        module_store = modulestore()
+        import_course_from_xml(
+            module_store, self.user.id, TEST_DATA_DIR, ['toy'],
+            static_content_store=content_store, create_if_not_present=True,
+            static_import_workers=static_import_workers,
+        )
+
+        course_key = module_store.make_course_key('edX', 'toy', '2012_Fall')
+        all_assets, count = content_store.get_all_content_for_course(course_key)
+        self.assertEqual(count, len(expected_paths))
+        self.assertEqual({asset['import_path'] for asset in all_assets}, expected_paths)
+
     def test_no_static_link_rewrites_on_import(self):
         module_store = modulestore()
         courses = import_course_from_xml(
@@ -5,6 +5,9 @@ Unit tests for course import and export Celery tasks
 
 import copy
 import json
+import shutil
+import tarfile
+from tempfile import mkdtemp
 from unittest import mock
 from uuid import uuid4
 
@@ -14,15 +17,19 @@ from django.test.utils import override_settings
 from opaque_keys.edx.locator import CourseLocator
 from organizations.models import OrganizationCourse
 from organizations.tests.factories import OrganizationFactory
+from path import Path as path
 from user_tasks.models import UserTaskArtifact, UserTaskStatus
 
-from cms.djangoapps.contentstore.tasks import export_olx, rerun_course
+from cms.djangoapps.contentstore.tasks import create_export_tarball, export_olx, rerun_course
 from cms.djangoapps.contentstore.tests.test_libraries import LibraryTestCase
 from cms.djangoapps.contentstore.tests.utils import CourseTestCase
 from common.djangoapps.course_action_state.models import CourseRerunState
 from common.djangoapps.student.tests.factories import UserFactory
 from openedx.core.djangoapps.embargo.models import Country, CountryAccessRule, RestrictedCourse
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_importer import import_course_from_xml
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
 TEST_DATA_CONTENTSTORE['DOC_STORE_CONFIG']['db'] = 'test_xcontent_%s' % uuid4().hex
@@ -82,6 +89,33 @@ class ExportCourseTestCase(CourseTestCase):
         result = export_olx.delay(nonstaff_user.id, key, 'en')
         self._assert_failed(result, 'Permission denied')
 
+    def test_tarball_matches_directory_export(self):
+        """
+        Verify that the tarball streamed by create_export_tarball holds the same files as an export to a directory
+        """
+        course = import_course_from_xml(
+            self.store, self.user.id, settings.COMMON_TEST_DATA_ROOT, ['toy'],
+            static_content_store=contentstore(), create_if_not_present=True,
+        )[0]
+        root_dir = path(mkdtemp())
+        self.addCleanup(shutil.rmtree, root_dir)
+        export_course_to_xml(self.store, contentstore(), course.id, root_dir, course.url_name)
+        course_dir = root_dir / course.url_name
+        expected_files = {
+            f'{course.url_name}/{course_dir.relpathto(file_path)}': file_path.read_bytes()
+            for file_path in course_dir.walkfiles()
+        }
+
+        with create_export_tarball(course, course.id, {}) as tarball:
+            with tarfile.open(fileobj=tarball, mode='r:gz') as tar_file:
+                exported_files = {
+                    member.name: tar_file.extractfile(member).read() for member in tar_file if member.isfile()
+                }
+
+        self.assertIn(f'{course.url_name}/course.xml', exported_files)
+        self.assertIn(f'{course.url_name}/policies/assets.json', exported_files)
+        self.assertEqual(exported_files, expected_files)
+
     def _assert_failed(self, task_result, error_message):
         """
         Verify that a task failed with the specified error message
@@ -45,7 +45,13 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, ModuleStoreTestCase
-from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, LibraryFactory, check_mongo_calls
+from xmodule.modulestore.tests.factories import (
+    CourseFactory,
+    ItemFactory,
+    LibraryFactory,
+    check_mongo_calls,
+    check_query_budget
+)
 from xmodule.partitions.partitions import (
     ENROLLMENT_TRACK_PARTITION_ID,
     MINIMUM_STATIC_PARTITION_ID,
@@ -195,6 +201,22 @@ class GetItemTest(ItemTest):
         with check_mongo_calls(unit_queries):
             self.client.get(reverse_usage_url('xblock_container_handler', self.populated_usage_keys['vertical'][-1]))
 
+    def test_container_get_query_budget(self):
+        """
+        Test that the modulestore queries made to get a unit container don't grow with its number of children.
+        """
+        self.populate_course(1)
+        usage_key = self.populated_usage_keys['vertical'][-1]
+        container_url = reverse_usage_url('xblock_container_handler', usage_key)
+        self.client.get(container_url)
+        with check_query_budget() as profile:
+            self.client.get(container_url)
+
+        for _ in range(3):
+            self.create_xblock(parent_usage_key=usage_key, category='problem')
+        with check_query_budget(**profile.query_counts()):
+            self.client.get(container_url)
+
     def test_get_vertical(self):
         # Add a vertical
         resp = self.create_xblock(category='vertical')
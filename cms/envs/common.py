@@ -151,6 +151,15 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Format used to serialize collected block structures: 'zpickle' or
+    # 'compact'. Only switch to 'compact' once every LMS and Studio worker
+    # can read it.
+    SERIALIZATION_FORMAT='zpickle',
+
+    # Maximum size, in bytes, of the process-local cache tier of
+    # block structures. 0 disables it.
+    LOCAL_CACHE_MAX_SIZE=0,
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -720,6 +729,9 @@ MIDDLEWARE = [
     # Cookie monitoring
     'openedx.core.lib.request_utils.CookieMonitoringMiddleware',
 
+    # Modulestore query profiling, see MODULESTORE_QUERY_PROFILING.
+    'openedx.core.lib.request_utils.ModulestoreProfilingMiddleware',
+
     'openedx.core.djangoapps.header_control.middleware.HeaderControlMiddleware',
     'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -973,6 +985,19 @@ CODE_JAIL = {
     # Keys should be course run ids.
     # Values should be dictionaries that look like 'limits'.
     "limit_overrides": {},
+
+    # Pool of warm workers executing the jailed code of capa problems, instead of a new
+    # process for each execution (see common/lib/capa/capa/safe_exec/pool.py).
+    'pool': {
+        # Maximum number of workers of each process; 0 disables the pool.
+        'size': 0,
+        # Number of executions after which a worker is replaced.
+        'max_runs': 100,
+        # Peak resident memory of an execution (in bytes) over which its worker is replaced; 0 means no threshold.
+        'max_memory': 0,
+        # Time in seconds that an execution waits for a free worker before failing.
+        'queue_timeout': 1,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1089,6 +1114,13 @@ MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 COURSE_IMPORT_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 COURSE_METADATA_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# .. setting_name: COURSE_IMPORT_STATIC_CONTENT_WORKERS
+# .. setting_default: 4
+# .. setting_description: Number of threads importing the static files of a course or library into the contentstore
+#   while its blocks are imported into the modulestore, during OLX imports. If 1, the static files are imported
+#   before the blocks, one by one.
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 4
+
 
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
@@ -2031,6 +2063,42 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_SERIALIZER
+# .. setting_default: 'pickle4'
+# .. setting_description: How split modulestore course structures are serialized in the 'course_structure_cache':
+#   'pickle4', 'pickle5' or 'bson'. Structures cached with another serializer are rewritten when they're read, so
+#   this can be changed without clearing the cache. Only 'pickle4' with the 'zlib' compressor can be read by
+#   releases which predate this setting.
+COURSE_STRUCTURE_CACHE_SERIALIZER = 'pickle4'
+
+# .. setting_name: COURSE_STRUCTURE_CACHE_COMPRESSOR
+# .. setting_default: 'zlib'
+# .. setting_description: How split modulestore course structures are compressed in the 'course_structure_cache':
+#   'none', 'zlib', 'zstd' (requires the zstandard package) or 'lz4' (requires the lz4 package). Falls back to
+#   'zlib' if the package of the compressor isn't installed. See COURSE_STRUCTURE_CACHE_SERIALIZER.
+COURSE_STRUCTURE_CACHE_COMPRESSOR = 'zlib'
+
+# .. setting_name: COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES
+# .. setting_default: 0
+# .. setting_description: Maximum total size, in bytes, of the published split modulestore course structures kept
+#   in memory by each process and shared across its requests, which are checked before the 'course_structure_cache'.
+#   The least recently used structures are evicted beyond it. 0 disables the process-wide cache, as in Studio, which
+#   mostly reads draft structures.
+COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES = 0
+
+# .. toggle_name: MODULESTORE_QUERY_PROFILING
+# .. toggle_implementation: DjangoSetting
+# .. toggle_default: False
+# .. toggle_description: Profile the split modulestore queries made by each request and celery task: the number and
+#   duration of the structure, definition and course index queries, and the hits of the structure caches. Requests
+#   report them as custom monitoring attributes, a log line and an X-Modulestore-Profile response header; tasks log
+#   them when they complete.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warnings: The response header exposes the query counts of each view to its users, so only enable this
+#   outside of production, or briefly while investigating a slow view.
+MODULESTORE_QUERY_PROFILING = False
+
 ############################ OAUTH2 Provider ###################################
 
 
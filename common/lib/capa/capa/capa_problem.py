@@ -32,6 +32,7 @@ import capa.inputtypes as inputtypes
 import capa.responsetypes as responsetypes
 import capa.xqueue_interface as xqueue_interface
 from capa.correctmap import CorrectMap
+from capa.formula import monitor_parsed_formulas
 from capa.safe_exec import safe_exec
 from capa.util import contextualize_text, convert_files_to_filenames, get_course_id_from_capa_module
 from openedx.core.djangolib.markup import HTML, Text
@@ -497,6 +498,7 @@ class LoncapaProblem(object):
                 results = responder.evaluate_answers(self.student_answers, oldcmap)
             newcmap.update(results)
 
+        monitor_parsed_formulas()
         return newcmap
 
     def get_question_answers(self):
@@ -0,0 +1,311 @@
+"""
+Math expressions parsed once by calc, and evaluated for many values of their variables.
+
+`calc.evaluator` parses the expression it evaluates on every call, which makes checking a
+FormulaResponse, that evaluates the student's and the instructor's expressions at every sample
+point, parse both expressions once per sample.  A CompiledFormula parses its expression once, and
+evaluates it at all the sample points at once, with the variables as NumPy arrays.
+
+Evaluating with arrays gives the same values as evaluating sample by sample, except where NumPy
+and Python numbers behave differently: Python raises on division by zero or overflow, gives a
+complex number for a negative number raised to a fractional power, and `fact` or `arccot` only
+accept single numbers.  These all make the evaluation with arrays fail, under `numpy.errstate`
+raising on any floating-point error, in which case the samples are evaluated one by one, exactly
+like `calc.evaluator` does.
+
+Parsing with pyparsing is what most of the time of evaluating an expression or rendering its
+preview goes to, and the same expressions (the instructors' answers, the tolerances, the answers
+students preview while typing them) come back again and again.  The parse trees are kept in a
+per-process LRU cache, used by the `evaluator` and `latex_preview` drop-in replacements of their
+calc counterparts too.
+"""
+
+
+import threading
+from collections import OrderedDict
+
+import numpy
+from calc import (
+    ParseAugmenter,
+    add_defaults,
+    check_parens,
+    eval_atom,
+    eval_number,
+    eval_parallel,
+    eval_power,
+    eval_product,
+    eval_sum
+)
+from calc import preview
+from edx_django_utils.monitoring import set_custom_attribute
+
+__all__ = ['CompiledFormula', 'PARSED_FORMULAS', 'evaluator', 'latex_preview', 'monitor_parsed_formulas']
+
+# The maximum number of parsed expressions kept by each process.
+PARSED_FORMULA_CACHE_SIZE = 10000
+
+
+def _operands(parse_result):
+    """
+    Returns the values of a list of processed child nodes, without the operators and parentheses.
+    """
+    return [value for value in parse_result if not isinstance(value, str)]
+
+
+def _eval_atom(parse_result):
+    """
+    Like `calc.eval_atom`, for arrays.
+    """
+    return _operands(parse_result)[0]
+
+
+def _eval_power(parse_result):
+    """
+    Like `calc.eval_power`, for arrays: exponentiates from right to left.
+    """
+    operands = _operands(parse_result)
+    power = operands.pop()
+    while operands:
+        power = operands.pop() ** power
+    return power
+
+
+def _eval_parallel(parse_result):
+    """
+    Like `calc.eval_parallel`, for arrays.  A zero input makes the division by zero raise, so that
+    the samples are evaluated one by one.
+    """
+    operands = _operands(parse_result)
+    if len(operands) == 1:
+        return operands[0]
+    return 1. / sum(1. / operand for operand in operands)
+
+
+def _eval_sum(parse_result):
+    """
+    Like `calc.eval_sum`, for arrays.
+    """
+    total = 0.0
+    sign = '+'
+    for token in parse_result:
+        if isinstance(token, str):
+            sign = token
+        elif sign == '-':
+            total = total - token
+        else:
+            total = total + token
+    return total
+
+
+def _eval_product(parse_result):
+    """
+    Like `calc.eval_product`, for arrays.
+    """
+    product = 1.0
+    operator = '*'
+    for token in parse_result:
+        if isinstance(token, str):
+            operator = token
+        elif operator == '/':
+            product = product / token
+        else:
+            product = product * token
+    return product
+
+
+# The actions evaluating the nodes of the parse tree other than numbers, variables and functions,
+# for Python numbers and for arrays.
+SCALAR_ACTIONS = {
+    'atom': eval_atom,
+    'power': eval_power,
+    'parallel': eval_parallel,
+    'product': eval_product,
+    'sum': eval_sum,
+}
+VECTOR_ACTIONS = {
+    'atom': _eval_atom,
+    'power': _eval_power,
+    'parallel': _eval_parallel,
+    'product': _eval_product,
+    'sum': _eval_sum,
+}
+
+
+class ParsedFormulaCache(object):
+    """
+    A bounded, thread-safe LRU cache of the parse of math expressions by calc, keyed by the
+    expression and its case sensitivity, counting its hits and misses.
+
+    The parse of an expression doesn't depend on the variables and functions it's evaluated with,
+    which are only checked against it afterwards.  Nothing changes a parse once it's done, so the
+    cached parses are shared by all their users.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, math_expr, case_sensitive=False):
+        """
+        Return the calc ParseAugmenter of the given expression, parsed.  Raises the pyparsing
+        errors if the expression can't be parsed.
+        """
+        key = (math_expr, case_sensitive)
+        with self._lock:
+            parsed = self._parsed.get(key)
+            if parsed is not None:
+                self._parsed.move_to_end(key)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        parsed = ParseAugmenter(math_expr, case_sensitive)
+        parsed.parse_algebra()
+        if self.max_size > 0:
+            with self._lock:
+                self._parsed[key] = parsed
+                self._parsed.move_to_end(key)
+                while len(self._parsed) > self.max_size:
+                    self._parsed.popitem(last=False)
+        return parsed
+
+    def stats(self):
+        """
+        Return the number of cached parses, of hits and of misses, and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._parsed),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """
+        Remove all of the cached parses, and reset the counts.
+        """
+        with self._lock:
+            self._parsed.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._parsed)
+
+
+PARSED_FORMULAS = ParsedFormulaCache(PARSED_FORMULA_CACHE_SIZE)
+
+
+def monitor_parsed_formulas():
+    """
+    Set the statistics of the parsed formulas cache of this process as custom attributes of the
+    current transaction.
+    """
+    for name, value in PARSED_FORMULAS.stats().items():
+        set_custom_attribute(f'capa.parsed_formulas.{name}', value)
+
+
+class CompiledFormula(object):
+    """
+    A math expression parsed by calc, evaluated like `calc.evaluator` would.
+
+    Like `calc.evaluator`, raises UnmatchedParenthesis or the pyparsing errors if the expression
+    can't be parsed, and UndefinedVariable if it uses variables or functions that aren't defined.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.parsed = None
+        if math_expr.strip() != "":
+            check_parens(math_expr)
+            self.parsed = PARSED_FORMULAS.parse(math_expr, case_sensitive)
+
+    def _casify(self, name):
+        """
+        Returns the name variables and functions are looked up with.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def _reduce(self, all_variables, all_functions, actions):
+        """
+        Returns the value of the expression with the given variables and functions, defaults
+        included, the nodes of the parse tree being evaluated with the given actions.
+        """
+        return self.parsed.reduce_tree(dict(
+            actions,
+            number=eval_number,
+            variable=lambda x: all_variables[self._casify(x[0])],
+            function=lambda x: all_functions[self._casify(x[0])](x[1]),
+        ))
+
+    def evaluate(self, variables, functions=None):
+        """
+        Returns the value of the expression for the given values of its variables, like
+        `calc.evaluator(variables, functions, math_expr, case_sensitive)`.
+        """
+        if self.parsed is None:
+            return float('nan')
+        all_variables, all_functions = add_defaults(variables, functions or {}, self.case_sensitive)
+        self.parsed.check_variables(all_variables, all_functions)
+        return self._reduce(all_variables, all_functions, SCALAR_ACTIONS)
+
+    def evaluate_samples(self, var_dict_list, functions=None):
+        """
+        Returns the list of the values of the expression for each of the given dictionaries of
+        values of its variables, all of which define the same variables.
+        """
+        if not var_dict_list:
+            return []
+        if self.parsed is None:
+            return [float('nan')] * len(var_dict_list)
+
+        variables = {
+            name: numpy.array([var_dict[name] for var_dict in var_dict_list])
+            for name in var_dict_list[0]
+        }
+        all_variables, all_functions = add_defaults(variables, functions or {}, self.case_sensitive)
+        self.parsed.check_variables(all_variables, all_functions)
+        try:
+            with numpy.errstate(all='raise'):
+                values = self._reduce(all_variables, all_functions, VECTOR_ACTIONS)
+        except Exception:  # pylint: disable=broad-except
+            # Evaluating sample by sample raises the same errors as calc.evaluator, if any.
+            values = None
+        if values is None or numpy.shape(values) not in ((), (len(var_dict_list),)):
+            return [self.evaluate(var_dict, functions) for var_dict in var_dict_list]
+        return list(numpy.broadcast_to(values, (len(var_dict_list),)))
+
+
+def evaluator(variables, functions, math_expr, case_sensitive=False):
+    """
+    Like `calc.evaluator`: evaluate a math expression with the given variables and functions.
+    """
+    return CompiledFormula(math_expr, case_sensitive).evaluate(variables, functions)
+
+
+def latex_preview(math_expr, variables=(), functions=(), case_sensitive=False):
+    """
+    Like `calc.preview.latex_preview`: convert a math expression into latex.
+    """
+    if math_expr.strip() == "":
+        return ""
+
+    parsed = PARSED_FORMULAS.parse(math_expr, case_sensitive)
+    variables, functions = preview.add_defaults(variables, functions, case_sensitive)
+    casify = (lambda x: x) if case_sensitive else (lambda x: x.lower())
+    render_actions = {
+        'number': preview.render_number,
+        'variable': preview.variable_closure(variables, casify),
+        'function': preview.function_closure(functions, casify),
+        'atom': preview.render_atom,
+        'power': preview.render_power,
+        'parallel': preview.render_parallel,
+        'product': preview.render_product,
+        'sum': preview.render_sum,
+    }
+    return parsed.reduce_tree(
+        render_actions,
+        terminal_converter=lambda s: preview.LatexRendered(s.replace('\\', '\\\\')),
+    ).latex
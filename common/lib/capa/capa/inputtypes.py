@@ -51,7 +51,6 @@ import bleach
 import html5lib
 import pyparsing
 import six
-from calc.preview import latex_preview
 from chem import chemcalc
 from django.utils.encoding import python_2_unicode_compatible
 from lxml import etree
@@ -63,6 +62,7 @@ from openedx.core.lib import edx_six
 from xmodule.stringify import stringify_children
 
 from . import xqueue_interface
+from .formula import latex_preview, monitor_parsed_formulas
 from .registry import TagRegistry
 from .util import sanitize_html
 
@@ -1324,6 +1324,7 @@ class FormulaEquationInput(InputTypeBase):
             )
             result['error'] = _("Error while rendering preview")
 
+        monitor_parsed_formulas()
         return result
 
 #-----------------------------------------------------------------------------
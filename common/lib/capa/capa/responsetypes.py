@@ -32,7 +32,7 @@ import random2 as random
 import requests
 import six
 # specific library imports
-from calc import UndefinedVariable, UnmatchedParenthesis, evaluator
+from calc import UndefinedVariable, UnmatchedParenthesis
 from django.utils import html
 from django.utils.encoding import python_2_unicode_compatible
 from lxml import etree
@@ -50,6 +50,7 @@ from openedx.core.lib import edx_six
 from openedx.core.lib.grade_utils import round_away_from_zero
 
 from . import correctmap
+from .formula import CompiledFormula, evaluator
 from .registry import TagRegistry
 from .util import (
     compare_with_tolerance,
@@ -3095,64 +3096,61 @@ class FormulaResponse(LoncapaResponse):
         """
         _ = edx_six.get_gettext(self.capa_system.i18n)
 
-        out = []
-        for var_dict in var_dict_list:
-            try:
-                out.append(evaluator(
-                    var_dict,
-                    dict(),
-                    answer,
-                    case_sensitive=self.case_sensitive,
-                ))
-            except UndefinedVariable as err:
-                log.debug(
-                    'formularesponse: undefined variable in formula=%s',
-                    html.escape(answer)
-                )
-                raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
-                    err.args[0]
-                )
-            except UnmatchedParenthesis as err:
+        # Nothing is evaluated, so nothing can fail, without samples.
+        if not var_dict_list:
+            return []
+
+        try:
+            # The answer is parsed once, and evaluated for all the test cases at once.
+            return CompiledFormula(answer, case_sensitive=self.case_sensitive).evaluate_samples(var_dict_list)
+        except UndefinedVariable as err:
+            log.debug(
+                'formularesponse: undefined variable in formula=%s',
+                html.escape(answer)
+            )
+            raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
+                err.args[0]
+            )
+        except UnmatchedParenthesis as err:
+            log.debug(
+                'formularesponse: unmatched parenthesis in formula=%s',
+                html.escape(answer)
+            )
+            raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
+                err.args[0]
+            )
+        except ValueError as err:
+            if 'factorial' in text_type(err):
+                # This is thrown when fact() or factorial() is used in a formularesponse answer
+                #   that tests on negative and/or non-integer inputs
+                # text_type(err) will be: `factorial() only accepts integral values` or
+                # `factorial() not defined for negative values`
                 log.debug(
-                    'formularesponse: unmatched parenthesis in formula=%s',
+                    ('formularesponse: factorial function used in response '
+                     'that tests negative and/or non-integer inputs. '
+                     'Provided answer was: %s'),
                     html.escape(answer)
                 )
                 raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
-                    err.args[0]
+                    _("Factorial function not permitted in answer "
+                      "for this problem. Provided answer was: "
+                      "{bad_input}").format(bad_input=html.escape(answer))
                 )
-            except ValueError as err:
-                if 'factorial' in text_type(err):
-                    # This is thrown when fact() or factorial() is used in a formularesponse answer
-                    #   that tests on negative and/or non-integer inputs
-                    # text_type(err) will be: `factorial() only accepts integral values` or
-                    # `factorial() not defined for negative values`
-                    log.debug(
-                        ('formularesponse: factorial function used in response '
-                         'that tests negative and/or non-integer inputs. '
-                         'Provided answer was: %s'),
-                        html.escape(answer)
-                    )
-                    raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
-                        _("Factorial function not permitted in answer "
-                          "for this problem. Provided answer was: "
-                          "{bad_input}").format(bad_input=html.escape(answer))
-                    )
-                # If non-factorial related ValueError thrown, handle it the same as any other Exception
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
-                    _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
-                        bad_input=html.escape(answer)
-                    )
+            # If non-factorial related ValueError thrown, handle it the same as any other Exception
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
+                _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
+                    bad_input=html.escape(answer)
                 )
-            except Exception as err:
-                # traceback.print_exc()
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
-                    _("Invalid input: Could not parse '{bad_input}' as a formula").format(
-                        bad_input=html.escape(answer)
-                    )
+            )
+        except Exception as err:
+            # traceback.print_exc()
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(  # lint-amnesty, pylint: disable=raise-missing-from
+                _("Invalid input: Could not parse '{bad_input}' as a formula").format(
+                    bad_input=html.escape(answer)
                 )
-        return out
+            )
 
     def randomize_variables(self, samples):
         """
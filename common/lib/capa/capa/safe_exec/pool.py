@@ -0,0 +1,421 @@
+"""
+A bounded pool of warm, sandboxed Python workers to run capa's jailed code.
+
+codejail starts a fresh sandboxed Python process for every execution, which then has to import the
+modules capa's code assumes before it can run a single line of the problem's code.  A worker of the
+pool is a long-lived Python process started the same way (as the configured sandbox user, with the
+configured sandbox Python) that imports those modules once, up front.  Every execution then runs
+in a child forked from a worker, with codejail's resource limits applied to the child only, so
+executions stay isolated from each other and from the worker while skipping the start-up.
+
+A worker never runs jailed code itself, so nothing an execution does to its interpreter is seen by
+the next one, whichever learner it's for.  What the executions of all learners do share, as they
+do with codejail, is the sandbox user: anything an execution leaves outside of its own directory
+where the sandbox user can write, or any process it starts outside of its process group, is
+within reach of later executions.  Capa seeds the random module of each execution itself, and
+the worker reseeds numpy in each child, so executions don't share the worker's random state.
+
+Each worker runs one execution at a time; the executions requested by the threads of the process
+are multiplexed over the workers.  When all the workers are busy, an execution waits for one to be
+free for a bounded time, then fails rather than starting yet another process.  A worker is
+replaced after a number of executions, or when the peak resident memory of one of its executions,
+which includes the memory of the worker itself, grows over a threshold.
+"""
+
+
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+
+log = logging.getLogger(__name__)
+
+# Seconds, on top of the REALTIME limit of an execution, that a worker has to answer before it's
+# considered stuck.
+WORKER_TIMEOUT_MARGIN = 5
+
+# The code of a worker, run with `python -c`.  Its only argument is the JSON list of the modules to
+# import up front.  Requests and responses are length-prefixed JSON documents, read from stdin and
+# written to stdout.
+WORKER_CODE = r'''
+import json, os, resource, select, shutil, signal, struct, sys, time, traceback
+
+os.environ["OPENBLAS_NUM_THREADS"] = "1"    # See TNL-6456
+for modname in json.loads(sys.argv[1]):
+    try:
+        __import__(modname)
+    except Exception:
+        pass
+
+# Keep the protocol out of reach of the jailed code, which gets /dev/null as stdin and stdout.
+REQUESTS = os.dup(0)
+RESPONSES = os.dup(1)
+DEVNULL = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1):
+    os.dup2(DEVNULL, fd)
+
+
+def read_exactly(fd, size):
+    data = b""
+    while len(data) < size:
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def write_message(fd, message):
+    data = json.dumps(message).encode("utf-8")
+    data = memoryview(struct.pack(">I", len(data)) + data)
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def jsonable(value):
+    if not isinstance(value, (type(None), bool, int, float, str, list, tuple, dict)):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def set_limits(limits):
+    # The same limits as codejail.jail_code.create_rlimits.
+    if limits.get("NPROC"):
+        resource.setrlimit(resource.RLIMIT_NPROC, (limits["NPROC"], limits["NPROC"]))
+    if limits.get("CPU"):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits["CPU"], limits["CPU"] + 1))
+    if limits.get("VMEM"):
+        resource.setrlimit(resource.RLIMIT_AS, (limits["VMEM"], limits["VMEM"]))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits.get("FSIZE", 0), limits.get("FSIZE", 0)))
+
+
+def run_child(request, result_fd):
+    os.setpgid(0, 0)
+    os.close(REQUESTS)
+    os.close(RESPONSES)
+    os.dup2(DEVNULL, 2)
+    os.chdir(request["cwd"])
+    os.environ["TMPDIR"] = os.path.join(request["cwd"], "tmp")
+    if "tempfile" in sys.modules:
+        sys.modules["tempfile"].tempdir = None
+    if "numpy" in sys.modules:
+        # Forked children would otherwise all share the worker's random state.
+        sys.modules["numpy"].random.seed()
+    sys.path.extend(request["python_path"])
+    set_limits(request["limits"])
+    globals_dict = request["globals"]
+    try:
+        exec(compile(request["code"], "jailed_code", "exec"), globals_dict)
+    except BaseException:
+        result = {"status": 1, "stderr": traceback.format_exc()}
+    else:
+        result = {
+            "status": 0,
+            "globals": {
+                name: value for name, value in globals_dict.items()
+                if name != "__builtins__" and jsonable(value)
+            },
+        }
+    write_message(result_fd, result)
+
+
+def execute(request):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            run_child(request, write_fd)
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+
+    realtime = request["limits"].get("REALTIME")
+    deadline = time.monotonic() + realtime if realtime else None
+    output = b""
+    while len(output) < 4 or len(output) - 4 < struct.unpack(">I", output[:4])[0]:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if not select.select([read_fd], [], [], timeout)[0]:
+            break
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        output += chunk
+    os.close(read_fd)
+
+    # Also kills whatever the jailed code left running.
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    _, status, usage = os.wait4(pid, 0)
+    tmp = os.path.join(request["cwd"], "tmp")
+    for name in os.listdir(tmp):
+        path = os.path.join(tmp, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    if len(output) >= 4 and len(output) - 4 == struct.unpack(">I", output[:4])[0]:
+        response = json.loads(output[4:].decode("utf-8"))
+    elif os.WIFSIGNALED(status):
+        response = {"status": -os.WTERMSIG(status), "stderr": ""}
+    else:
+        response = {"status": os.WEXITSTATUS(status) or 1, "stderr": ""}
+    # The peak resident memory of the child, which includes the memory it shares with the worker.
+    response["maxrss"] = usage.ru_maxrss * 1024
+    return response
+
+
+while True:
+    header = read_exactly(REQUESTS, 4)
+    if header is None:
+        break
+    request = json.loads(read_exactly(REQUESTS, struct.unpack(">I", header)[0]).decode("utf-8"))
+    write_message(RESPONSES, execute(request))
+'''
+
+
+def sandbox_command():
+    """
+    Returns the command line codejail starts its jailed python processes with.
+    """
+    command = list(jail_code.COMMANDS['python']['cmdline_start'])
+    user = jail_code.COMMANDS['python']['user']
+    if user:
+        command = ['sudo', '-u', user] + command
+    return command
+
+
+class WorkerError(Exception):
+    """
+    A worker of the pool exited, broke the protocol or didn't answer in time.
+    """
+
+
+class Worker(object):
+    """
+    A warm, sandboxed Python process running one execution at a time.
+    """
+    def __init__(self, command, preload):
+        self.runs = 0
+        self.process = subprocess.Popen(  # lint-amnesty, pylint: disable=consider-using-with
+            command + ['-c', WORKER_CODE, json.dumps(list(preload))],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            cwd='/',
+            env={},
+        )
+
+    def execute(self, request, timeout=None):
+        """
+        Returns the response of the worker to the given request, waiting for it at most `timeout`
+        seconds.  Raises WorkerError if the response doesn't come.
+        """
+        data = json.dumps(request).encode('utf-8')
+        data = memoryview(struct.pack('>I', len(data)) + data)
+        try:
+            while data:
+                data = data[self.process.stdin.write(data):]
+        except OSError as err:
+            raise WorkerError('Could not send the request to the worker.') from err
+
+        deadline = time.monotonic() + timeout if timeout else None
+        size, = struct.unpack('>I', self._read(4, deadline))
+        try:
+            response = json.loads(self._read(size, deadline).decode('utf-8'))
+        except ValueError as err:
+            raise WorkerError('The worker sent an invalid response.') from err
+        self.runs += 1
+        return response
+
+    def _read(self, size, deadline):
+        """
+        Returns the next `size` bytes written by the worker, waiting for them until `deadline`.
+        """
+        data = b''
+        stdout = self.process.stdout
+        while len(data) < size:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not select.select([stdout], [], [], timeout)[0]:
+                raise WorkerError('The worker did not answer in time.')
+            chunk = stdout.read(size - len(data))
+            if not chunk:
+                raise WorkerError(f'The worker exited with status {self.process.poll()}.')
+            data += chunk
+        return data
+
+    def close(self):
+        """
+        Stops the worker.
+        """
+        self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+
+
+class SafeExecPool(object):
+    """
+    A bounded pool of warm, sandboxed Python workers, with the same interface as
+    codejail.safe_exec.safe_exec.
+
+    `command` is the command line starting the sandboxed Python, `size` the maximum number of
+    workers, `max_runs` the number of executions after which a worker is replaced, `max_memory`
+    the peak resident memory of an execution, in bytes, over which its worker is replaced (0 means
+    no threshold),
+    `queue_timeout` the number of seconds an execution waits for a free worker, and `preload` the
+    modules the workers import up front.
+    """
+    def __init__(self, command, size, max_runs=100, max_memory=0, queue_timeout=1, preload=()):
+        self.command = list(command)
+        self.size = size
+        self.max_runs = max_runs
+        self.max_memory = max_memory
+        self.queue_timeout = queue_timeout
+        self.preload = list(preload)
+        self.pid = os.getpid()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+
+    def start(self):
+        """
+        Starts all the workers of the pool, so that they're warm by the time they're needed.
+        """
+        for _ in range(self.size - self._idle.qsize()):
+            self._idle.put(Worker(self.command, self.preload))
+
+    def safe_exec(
+        self,
+        code,
+        globals_dict,
+        python_path=None,
+        extra_files=None,
+        limit_overrides_context=None,
+        slug=None,
+    ):
+        """
+        Executes `code` in a child of a worker, like codejail.safe_exec.safe_exec: the changes it
+        makes to the JSON-safe globals of `globals_dict` are visible in `globals_dict` when this
+        returns, and SafeExecException is raised if it fails.
+        """
+        limits = jail_code.get_effective_limits(limit_overrides_context)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            log.warning('All %d workers of the safe_exec pool are busy; not executing %s', self.size, slug)
+            raise SafeExecException(
+                f"Couldn't execute jailed code: all {self.size} workers of the safe_exec pool are busy"
+            )
+        try:
+            with _sandbox_directory(python_path, extra_files) as (directory, jailed_python_path):
+                request = {
+                    'code': code,
+                    'globals': json_safe(globals_dict),
+                    'cwd': directory,
+                    'python_path': jailed_python_path,
+                    'limits': limits,
+                }
+                timeout = limits['REALTIME'] + WORKER_TIMEOUT_MARGIN if limits.get('REALTIME') else None
+                response = self._execute(request, timeout, slug)
+        finally:
+            self._slots.release()
+
+        if response['status'] != 0:
+            raise SafeExecException(
+                "Couldn't execute jailed code: stdout: {stdout!r}, "
+                "stderr: {stderr!r} with status code: {status}".format(
+                    stdout=b'',
+                    stderr=response['stderr'].encode('utf-8'),
+                    status=response['status'],
+                )
+            )
+        globals_dict.update(response['globals'])
+
+    def _execute(self, request, timeout, slug):
+        """
+        Returns the response of an idle or new worker to the given request, and puts the worker
+        back in the pool unless it's due to be replaced.
+        """
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = Worker(self.command, self.preload)
+
+        try:
+            response = worker.execute(request, timeout)
+        except WorkerError as err:
+            log.warning('Worker of the safe_exec pool failed executing %s: %s', slug, err)
+            worker.close()
+            raise SafeExecException(f"Couldn't execute jailed code: {err}") from err
+
+        if worker.runs >= self.max_runs or (self.max_memory and response['maxrss'] > self.max_memory):
+            worker.close()
+        else:
+            self._idle.put(worker)
+        return response
+
+    def close(self):
+        """
+        Stops the idle workers.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+@contextmanager
+def _sandbox_directory(python_path, extra_files):
+    """
+    Creates the directory an execution runs in, like codejail.jail_code does: readable by the
+    sandbox user, with the extra files and copies of the `python_path` entries, and a `tmp`
+    subdirectory writable by the sandbox user.  Yields the directory and the `python_path` entries
+    relative to it.
+    """
+    directory = tempfile.mkdtemp(prefix='codejail-')
+    try:
+        os.chmod(directory, 0o775)
+        os.mkdir(os.path.join(directory, 'tmp'))
+        os.chmod(os.path.join(directory, 'tmp'), 0o777)
+
+        extra_names = set()
+        for name, content in extra_files or ():
+            extra_names.add(name)
+            with open(os.path.join(directory, name), 'wb') as extra_file:
+                extra_file.write(content)
+
+        jailed_python_path = []
+        for path in python_path or ():
+            name = os.path.basename(path)
+            jailed_python_path.append(name)
+            if name in extra_names:
+                continue
+            if os.path.isdir(path):
+                shutil.copytree(path, os.path.join(directory, name))
+            else:
+                shutil.copy(path, directory)
+
+        yield directory, jailed_python_path
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -2,14 +2,19 @@
 
 
 import hashlib
+import os
+import threading
 
+from codejail import jail_code
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 import six
+from django.conf import settings
 from six import text_type
 
 from . import lazymod
+from .pool import SafeExecPool, sandbox_command
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -55,6 +60,9 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
 
 def update_hash(hasher, obj):
     """
@@ -79,6 +87,34 @@ def update_hash(hasher, obj):
         hasher.update(six.b(repr(obj)))
 
 
+def get_pool():
+    """
+    Returns the pool of warm workers executing the jailed code of this process, or None if
+    `settings.CODE_JAIL['pool']` doesn't enable it or codejail isn't configured for python.
+
+    The workers are started the first time the pool is needed in a process.
+    """
+    global _POOL  # pylint: disable=global-statement
+    config = getattr(settings, 'CODE_JAIL', None) or {}
+    config = config.get('pool') or {}
+    if not config.get('size') or not jail_code.is_configured('python'):
+        return None
+
+    with _POOL_LOCK:
+        # A forked process can't share the workers of its parent.
+        if _POOL is None or _POOL.pid != os.getpid():
+            _POOL = SafeExecPool(
+                sandbox_command(),
+                config['size'],
+                max_runs=config.get('max_runs', 100),
+                max_memory=config.get('max_memory', 0),
+                queue_timeout=config.get('queue_timeout', 1),
+                preload=[modname for _, modname in ASSUMED_IMPORTS],
+            )
+            _POOL.start()
+        return _POOL
+
+
 def safe_exec(
     code,
     globals_dict,
@@ -142,8 +178,12 @@ def safe_exec(
     code_prolog = CODE_PROLOG % random_seed
 
     # Decide which code executor to use.
+    pool = None if unsafely else get_pool()
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif pool is not None and not jail_code.get_effective_limits(limit_overrides_context).get('PROXY'):
+        # The workers of the pool can't proxy the network access of the jailed code.
+        exec_fn = pool.safe_exec
     else:
         exec_fn = codejail_safe_exec
 
@@ -4,7 +4,10 @@
 import hashlib
 import os
 import os.path
+import sys
 import textwrap
+import threading
+import time
 import unittest
 
 import pytest
@@ -20,6 +23,8 @@ from six import text_type, unichr
 from six.moves import range
 
 from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec.pool import SafeExecPool
+from capa.safe_exec.safe_exec import get_pool
 
 
 class TestSafeExec(unittest.TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
@@ -173,6 +178,74 @@ class TestLimitConfiguration(unittest.TestCase):
         assert jail_code.get_effective_limits('course-v1:my+special+course')['NPROC'] == 30
 
 
+class TestSafeExecPool(unittest.TestCase):
+    """
+    Test the pool of warm workers, with workers running the test's Python outside of the sandbox.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.pool = SafeExecPool([sys.executable, '-E', '-B'], 1, max_runs=2, preload=['math'])
+        self.addCleanup(self.pool.close)
+
+    def test_set_values(self):
+        g = {'a': 17}
+        self.pool.safe_exec("import math; b = a + int(math.pi); c = object()", g)
+        assert g['b'] == 20
+        assert 'c' not in g
+
+    def test_python_lib(self):
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        g = {}
+        self.pool.safe_exec("import constant; a = constant.THE_CONST", g, python_path=[pylib])
+        assert g['a'] == 23
+
+    def test_raising_exceptions(self):
+        with pytest.raises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", {})
+        assert 'ZeroDivisionError' in text_type(cm.value)
+
+    def test_executions_are_isolated(self):
+        self.pool.safe_exec("import math; math.pi = 3", {})
+        g = {}
+        self.pool.safe_exec("import math; a = math.pi", g)
+        assert g['a'] > 3
+
+    def test_workers_are_recycled(self):
+        pids = []
+        for _ in range(3):
+            g = {}
+            self.pool.safe_exec("import os; pid = os.getppid()", g)
+            pids.append(g['pid'])
+        assert pids[0] == pids[1]
+        assert pids[1] != pids[2]
+
+    def test_workers_are_recycled_over_max_memory(self):
+        self.pool.max_runs = 100
+        self.pool.max_memory = 64 * 1024 * 1024
+        pids = []
+        for code in ("a = 1", "a = b'x' * (128 * 1024 * 1024)", "a = 1"):
+            g = {}
+            self.pool.safe_exec("import os; pid = os.getppid()\n" + code, g)
+            pids.append(g['pid'])
+        assert pids[0] == pids[1]
+        assert pids[1] != pids[2]
+
+    def test_saturated_pool(self):
+        self.pool.queue_timeout = 0
+        sleeping = threading.Thread(target=self.pool.safe_exec, args=("import time; time.sleep(1)", {}))
+        sleeping.start()
+        self.addCleanup(sleeping.join)
+        time.sleep(0.2)
+
+        with pytest.raises(SafeExecException) as cm:
+            self.pool.safe_exec("a = 1", {})
+        assert 'busy' in text_type(cm.value)
+
+    def test_pool_is_disabled_by_default(self):
+        assert get_pool() is None
+
+
 class DictCache(object):
     """A cache implementation over a simple dict, for testing."""
 
@@ -0,0 +1,107 @@
+"""
+Tests of capa.formula
+"""
+
+
+import unittest
+from cmath import isnan
+
+import ddt
+import pytest
+from calc import UndefinedVariable, UnmatchedParenthesis
+from calc import evaluator as calc_evaluator
+from calc.preview import latex_preview as calc_latex_preview
+from pyparsing import ParseException
+
+from capa.formula import PARSED_FORMULAS, CompiledFormula, ParsedFormulaCache, evaluator, latex_preview
+from capa.util import compare_with_tolerance
+
+SAMPLES = [{'x': x, 'y': y} for x, y in ((-3.5, 0.5), (-1.0, 1.5), (0.25, 2.0), (2.0, 3.5), (7.5, 1.25))]
+
+
+@ddt.ddt
+class CompiledFormulaTest(unittest.TestCase):
+    """
+    Test that compiled formulas give the same values as calc.evaluator.
+    """
+
+    @ddt.data(
+        'x+2*y', '-x - y', 'x/y/2', 'x^2^0.5', 'x^y', 'sin(x)/cos(y)', 'sqrt(x)', 'ln(x)', 'i*x + j*y',
+        'x||y', 'x||0', '5*x', '3%*y', 'e^x', '2', 'pi', '', 'arccot(x)', 'abs(x-y)', 'X+Y',
+    )
+    def test_same_values_as_evaluator(self, math_expr):
+        expected = [calc_evaluator(sample, {}, math_expr) for sample in SAMPLES]
+        values = CompiledFormula(math_expr).evaluate_samples(SAMPLES)
+        assert len(values) == len(expected)
+        for value, expected_value in zip(values, expected):
+            if isnan(expected_value):
+                assert isnan(value)
+            else:
+                assert compare_with_tolerance(value, expected_value)
+
+    @ddt.data(
+        ('1/0', ZeroDivisionError),
+        ('x^', ParseException),
+        ('x + z', UndefinedVariable),
+        ('(x + y', UnmatchedParenthesis),
+        ('X + y', UndefinedVariable),
+    )
+    @ddt.unpack
+    def test_same_errors_as_evaluator(self, math_expr, error):
+        with pytest.raises(error):
+            calc_evaluator(SAMPLES[0], {}, math_expr, case_sensitive=True)
+        with pytest.raises(error):
+            evaluator(SAMPLES[0], {}, math_expr, case_sensitive=True)
+        with pytest.raises(error):
+            CompiledFormula(math_expr, case_sensitive=True).evaluate_samples(SAMPLES)
+
+    def test_no_samples(self):
+        assert not CompiledFormula('x').evaluate_samples([])
+
+
+@ddt.ddt
+class ParsedFormulaCacheTest(unittest.TestCase):
+    """
+    Test the cache of parsed formulas, and the evaluator and latex_preview using it.
+    """
+
+    def setUp(self):
+        super().setUp()
+        PARSED_FORMULAS.clear()
+        self.addCleanup(PARSED_FORMULAS.clear)
+
+    def test_hits_and_misses(self):
+        for _ in range(3):
+            evaluator({'x': 2}, {}, 'x^2 + 1')
+        latex_preview('x^2 + 1')
+        evaluator({'x': 2}, {}, 'x^2 + 1', case_sensitive=True)
+        assert PARSED_FORMULAS.stats() == {'size': 2, 'hits': 3, 'misses': 2, 'hit_rate': 0.6}
+
+    def test_least_recently_used_are_evicted(self):
+        cache = ParsedFormulaCache(2)
+        first = cache.parse('x + 1')
+        cache.parse('x + 2')
+        assert cache.parse('x + 1') is first
+        cache.parse('x + 3')
+        assert len(cache) == 2
+        assert cache.parse('x + 1') is first
+        assert cache.stats()['misses'] == 3
+
+    def test_parse_errors_are_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(ParseException):
+                PARSED_FORMULAS.parse('x^')
+        assert not PARSED_FORMULAS
+
+    def test_unmatched_parenthesis_preview(self):
+        with pytest.raises(ParseException):
+            calc_latex_preview('(x + y')
+        with pytest.raises(ParseException):
+            latex_preview('(x + y')
+
+    @ddt.data('', 'x^2/y', 'sqrt(x_{ij}) + 3%', 'f(x)*pi', 'x||y - (a+b)', 'X*x')
+    def test_same_preview_as_calc(self, math_expr):
+        for case_sensitive in (False, True):
+            expected = calc_latex_preview(math_expr, variables=['x'], functions=['f'], case_sensitive=case_sensitive)
+            preview = latex_preview(math_expr, variables=['x'], functions=['f'], case_sensitive=case_sensitive)
+            assert preview == expected
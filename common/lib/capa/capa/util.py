@@ -10,9 +10,9 @@ from decimal import Decimal
 
 import bleach
 import six
-from calc import evaluator
 from lxml import etree
 
+from capa.formula import evaluator
 from openedx.core.djangolib.markup import HTML
 
 #-----------------------------------------------------------------------------
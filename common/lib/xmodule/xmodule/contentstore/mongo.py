@@ -6,6 +6,7 @@ MongoDB/GridFS-level code for the contentstore.
 import json
 import os
 
+import fs.path
 import gridfs
 import pymongo
 from bson.son import SON
@@ -175,22 +176,32 @@ class MongoContentStore(ContentStore):
                 return None
 
     def export(self, location, output_directory):  # lint-amnesty, pylint: disable=missing-function-docstring
-        content = self.find(location)
-
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
-
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
+        self.export_to_fs(location, OSFS(output_directory))
+
+    def export_to_fs(self, location, export_fs, static_dir='/'):
+        """
+        Export the asset at the given location into the given pyfilesystem FS, under the directory
+        of its import path inside static_dir. The asset's data is streamed from GridFS chunk by chunk
+        rather than read into memory at once.
+        """
+        content = self.find(location, as_stream=True)
+        try:
+            export_dir = static_dir
+            if content.import_path is not None:
+                export_dir = fs.path.combine(static_dir, os.path.dirname(content.import_path))
+            asset_dir = export_fs.makedirs(export_dir, recreate=True)
 
-        disk_fs = OSFS(output_directory)
+            # Escape invalid char from filename.
+            export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
 
-        with disk_fs.open(export_name, 'wb') as asset_file:
-            asset_file.write(content.data)
+            with asset_dir.open(export_name, 'wb') as asset_file:
+                for chunk in content.stream_data():
+                    asset_file.write(chunk)
+        finally:
+            content.close()
 
     def export_all_for_course(self, course_key, output_directory, assets_policy_file):
         """
@@ -203,6 +214,35 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
+        policy = self._export_all_for_course(
+            course_key, lambda asset_key: self.export(asset_key, output_directory)
+        )
+        with open(assets_policy_file, 'w') as f:
+            json.dump(policy, f, sort_keys=True, indent=4)
+
+    def export_all_for_course_to_fs(self, course_key, export_fs, static_dir, assets_policy_path):
+        """
+        Export all of this course's assets, and the policy file of their attributes, into the given
+        pyfilesystem FS, such as the one of an OLX export.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            export_fs (FS): the filesystem to export to
+            static_dir: the directory of export_fs under which to put all the asset files
+            assets_policy_path: the path in export_fs of the policy file
+        """
+        policy = self._export_all_for_course(
+            course_key, lambda asset_key: self.export_to_fs(asset_key, export_fs, static_dir)
+        )
+        export_fs.makedirs(fs.path.dirname(assets_policy_path), recreate=True)
+        with export_fs.open(assets_policy_path, 'wb') as assets_policy_file:
+            assets_policy_file.write(json.dumps(policy, sort_keys=True, indent=4).encode('utf-8'))
+
+    def _export_all_for_course(self, course_key, export_asset):
+        """
+        Call export_asset with the key of each of this course's assets, and return the policy of
+        their attributes.
+        """
         policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
@@ -215,13 +255,12 @@ class MongoContentStore(ContentStore):
             #
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
+            export_asset(asset['asset_key'])
             for attr, value in asset.items():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
 
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+        return policy
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
@@ -336,29 +336,52 @@ class InheritingFieldData(KvsFieldData):
         The default for an inheritable name is found on a parent.
         """
         if name in self.inheritable_names:
-            # Walk up the content tree to find the first ancestor
-            # that this field is set on. Use the field from the current
-            # block so that if it has a different default than the root
-            # node of the tree, the block's default will be used.
-            field = block.fields[name]
-            ancestor = block.get_parent()
             # In case, if block's parent is of type 'library_content',
             # bypass inheritance and use kvs' default instead of reusing
             # from parent as '_copy_from_templates' puts fields into
             # defaults.
-            if ancestor and \
-               ancestor.location.block_type == 'library_content' and \
+            if block.parent is not None and \
+               block.parent.block_type == 'library_content' and \
                self.has_default_value(name):
                 return super().default(block, name)
 
-            while ancestor is not None:
+            # Walk up the content tree to find the first ancestor
+            # that this field is set on. Use the field from the current
+            # block so that if it has a different default than the root
+            # node of the tree, the block's default will be used.
+            # Rather than loading ancestors which aren't loaded yet, look
+            # up what the block reached so far inherits in its runtime's
+            # inheritance table, if the runtime has one.
+            field = block.fields[name]
+            ancestor = block
+            while True:
+                inherited_settings = _get_inherited_settings(ancestor)
+                if inherited_settings is not None:
+                    if name in inherited_settings:
+                        return inherited_settings[name]
+                    break
+                ancestor = ancestor.get_parent()
+                if ancestor is None:
+                    break
                 if field.is_set_on(ancestor):
                     return field.read_json(ancestor)
-                else:
-                    ancestor = ancestor.get_parent()
         return super().default(block, name)
 
 
+def _get_inherited_settings(block):
+    """
+    Return the json values of the settings which the given block inherits from its ancestors,
+    as looked up by its runtime, or None if its parent is already loaded or its runtime can't
+    look them up.
+    """
+    if block.has_cached_parent:
+        return None
+    get_inherited_settings = getattr(block.runtime, 'get_inherited_settings', None)
+    if get_inherited_settings is None:
+        return None
+    return get_inherited_settings(block)
+
+
 def inheriting_field_data(kvs):
     """Create an InheritanceFieldData that inherits the names in InheritanceMixin."""
     return InheritingFieldData(
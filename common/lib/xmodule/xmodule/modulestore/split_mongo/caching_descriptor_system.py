@@ -41,12 +41,13 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
     A system that has a cache of a course version's json that it will use to load modules
     from, with a backup of calling to the underlying modulestore for more data.
 
-    Computes the settings (nee 'metadata') inheritance upon creation.
+    Looks up the settings (nee 'metadata') inherited by its blocks in the inheritance table of
+    the course structure.
     """
     @contract(course_entry=CourseEnvelope)
     def __init__(self, modulestore, course_entry, default_class, module_data, lazy, **kwargs):  # lint-amnesty, pylint: disable=redefined-outer-name
         """
-        Computes the settings inheritance and sets up the cache.
+        Sets up the cache.
 
         modulestore: the module store that can be used to retrieve additional
         modules
@@ -84,6 +85,9 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
         self.module_data = module_data
         self.default_class = default_class
         self.local_modules = {}
+        # ids of the definitions to load in a single batch as soon as the first of them is needed
+        self._definitions_to_prefetch = set()
+        self._prefetched_definitions = {}
         self._services['library_tools'] = LibraryToolsService(modulestore, user_id=None)
 
     @lazy
@@ -161,6 +165,53 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
 
         return json_data
 
+    def prefetch_definitions(self, definition_ids):
+        """
+        Load the given definitions with a single query as soon as the first of them is needed
+        by a block of this system, instead of loading each one when its block first needs it.
+        """
+        self._definitions_to_prefetch.update(definition_ids)
+
+    def get_definition(self, course_key, definition_id):
+        """
+        Get the definition with the given id, loading all of the definitions waiting to be
+        prefetched along with it.
+        """
+        if definition_id in self._definitions_to_prefetch:
+            definition_ids, self._definitions_to_prefetch = self._definitions_to_prefetch, set()
+            for definition in self.modulestore.get_definitions(course_key, definition_ids):
+                self._prefetched_definitions[definition['_id']] = definition
+
+        definition = self._prefetched_definitions.pop(definition_id, None)
+        if definition is None:
+            definition = self.modulestore.get_definition(course_key, definition_id)
+        return definition
+
+    def get_inherited_settings(self, block):
+        """
+        Return the json values of the inheritable settings which the given block of this system
+        inherits from its ancestors, looked up in the inheritance table of the course structure.
+
+        Returns None if they can't be looked up there: if the table isn't available, if the block
+        isn't in it, or if any of its ancestors is cached by an active bulk operation, in which case
+        the ancestors are cheap to get and may have changes which aren't in the structure yet.
+        """
+        if isinstance(block.location.block_id, LocalId):
+            return None
+        inheritance_table = self.modulestore.get_inheritance_table(self.course_entry.structure)
+        if inheritance_table is None:
+            return None
+
+        block_key = BlockKey.from_usage_key(block.location)
+        ancestor_key = self._parent_map.get(block_key)
+        while ancestor_key is not None:
+            if self.modulestore.get_cached_block(
+                block.location.course_key, self.course_entry.course_key.version_guid, ancestor_key
+            ):
+                return None
+            ancestor_key = self._parent_map.get(ancestor_key)
+        return inheritance_table.get(block_key)
+
     # xblock's runtime does not always pass enough contextual information to figure out
     # which named container (course x branch) or which parent is requesting an item. Because split allows
     # a many:1 mapping from named containers to structures and because item's identities encode
@@ -200,6 +251,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):  # li
                 block_key.type,
                 definition_id,
                 convert_fields,
+                runtime=self,
             )
         else:
             definition_loader = None
@@ -8,12 +8,17 @@ import logging
 import math
 import pickle
 import re
+import struct
+import threading
 import zlib
+from collections import Counter, OrderedDict, defaultdict
 from contextlib import contextmanager
 from time import time
 
+import bson
 import pymongo
 import pytz
+from bson.codec_options import CodecOptions
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
 # Import this just to export it
@@ -24,11 +29,22 @@ from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
     DJANGO_AVAILABLE = False
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
@@ -98,10 +114,168 @@ class Tagger:
         ]
 
 
+class QueryProfile:
+    """
+    The counts and latencies of the split modulestore operations timed by a :class:`QueryTimer`
+    while the profile is active, along with the hits of the structure caches and the bytes of
+    structures they decoded. A profile is active while :func:`profile_queries` is used, so that
+    a request, a celery task or a test can inspect the queries it made.
+    """
+    # The timed operations which query mongo, by the kind of documents they query.
+    QUERY_KINDS = {
+        'structure': (
+            'get_structure.find_one', 'find_structures_by_id', 'find_courselike_blocks_by_id',
+            'find_structures_derived_from', 'find_ancestor_structures', 'insert_structure',
+        ),
+        'definition': ('get_definition', 'get_definitions', 'insert_definition'),
+        'course_index': (
+            'get_course_index', 'find_matching_course_indexes', 'insert_course_index', 'update_course_index',
+            'delete_course_index',
+        ),
+    }
+    # The structure cache tiers, with the timed operation which looks a structure up in each,
+    # and the tag it adds to tell whether the structure was found.
+    CACHE_TIERS = {
+        'shared_structure_cache': ('get_structure.shared_cache', 'from_shared_cache'),
+        'course_structure_cache': ('CourseStructureCache.get', 'from_cache'),
+    }
+
+    def __init__(self):
+        self.counts = Counter()
+        self.durations = defaultdict(float)
+        self.tag_counts = Counter()
+        self.measures = defaultdict(float)
+
+    def record(self, metric_name, duration, tagger):
+        """
+        Record an operation timed by a :class:`QueryTimer`.
+
+        Arguments:
+            metric_name: The name of the timed operation, without the timer's metric base.
+            duration (float): The time, in seconds, the operation took.
+            tagger (Tagger): The tagger of the operation.
+        """
+        self.counts[metric_name] += 1
+        self.durations[metric_name] += duration
+        for name, value in tagger.added_tags:
+            self.tag_counts[(metric_name, name, value)] += 1
+        for name, size in tagger.measures:
+            self.measures[(metric_name, name)] += size
+
+    def query_count(self, kind=None):
+        """
+        Return the number of mongo queries of the given kind (see QUERY_KINDS), or of all kinds.
+        """
+        return sum(self.counts[metric_name] for metric_name in self._query_metric_names(kind))
+
+    def query_counts(self):
+        """
+        Return a dict of the number of mongo queries of each kind.
+        """
+        return {kind: self.query_count(kind) for kind in self.QUERY_KINDS}
+
+    def query_duration(self, kind=None):
+        """
+        Return the time, in seconds, taken by the mongo queries of the given kind, or of all kinds.
+        """
+        return sum(self.durations[metric_name] for metric_name in self._query_metric_names(kind))
+
+    def cache_hits(self, tier):
+        """
+        Return the number of structures found in the given cache tier (see CACHE_TIERS).
+        """
+        metric_name, tag_name = self.CACHE_TIERS[tier]
+        return self.tag_counts[(metric_name, tag_name, 'true')]
+
+    def cache_misses(self, tier):
+        """
+        Return the number of structures not found in the given cache tier (see CACHE_TIERS).
+        """
+        metric_name, tag_name = self.CACHE_TIERS[tier]
+        return self.tag_counts[(metric_name, tag_name, 'false')]
+
+    @property
+    def bytes_decoded(self):
+        """
+        The number of bytes of serialized structures decoded from the course_structure_cache.
+        """
+        return int(self.measures[('CourseStructureCache.get', 'uncompressed_size')])
+
+    def summary(self):
+        """
+        Return a flat dict summarizing the profile, suitable for logging and monitoring.
+        """
+        summary = {}
+        for kind in self.QUERY_KINDS:
+            summary[f'{kind}_queries'] = self.query_count(kind)
+            summary[f'{kind}_ms'] = round(self.query_duration(kind) * 1000, 1)
+        for tier in self.CACHE_TIERS:
+            summary[f'{tier}_hits'] = self.cache_hits(tier)
+            summary[f'{tier}_misses'] = self.cache_misses(tier)
+        summary['bytes_decoded'] = self.bytes_decoded
+        return summary
+
+    def __str__(self):
+        return ', '.join(f'{name}={value}' for name, value in self.summary().items())
+
+    def _query_metric_names(self, kind):
+        """
+        Return the names of the timed operations which make mongo queries of the given kind, or of all kinds.
+        """
+        if kind is not None:
+            return self.QUERY_KINDS[kind]
+        return [metric_name for metric_names in self.QUERY_KINDS.values() for metric_name in metric_names]
+
+
+_ACTIVE_PROFILES = threading.local()
+
+
+def active_profiles():
+    """
+    Return the :class:`QueryProfile` objects active in the current thread, outermost first.
+    """
+    if not hasattr(_ACTIVE_PROFILES, 'profiles'):
+        _ACTIVE_PROFILES.profiles = []
+    return _ACTIVE_PROFILES.profiles
+
+
+def start_profile():
+    """
+    Start recording the operations of the current thread into a new :class:`QueryProfile`, and return it.
+    Prefer :func:`profile_queries` unless the profile can't be stopped in the same block of code.
+    """
+    profile = QueryProfile()
+    active_profiles().append(profile)
+    return profile
+
+
+def stop_profile(profile):
+    """
+    Stop recording operations into the given profile, started with :func:`start_profile`.
+    """
+    profiles = active_profiles()
+    if profile in profiles:
+        profiles.remove(profile)
+
+
+@contextmanager
+def profile_queries():
+    """
+    Contextmanager which records the split modulestore operations made in its block into the
+    :class:`QueryProfile` it yields. Profiles can be nested; each records all of the operations
+    made while it's active.
+    """
+    profile = start_profile()
+    try:
+        yield profile
+    finally:
+        stop_profile(profile)
+
+
 class QueryTimer:
     """
     An object that allows timing a block of code while also recording measurements
-    about that code.
+    about that code. The timings are recorded in the active :class:`QueryProfile` objects.
     """
     def __init__(self, metric_base, sample_rate=1):
         """
@@ -126,15 +300,18 @@ class QueryTimer:
             course_context: The course which the query is being made for.
         """
         tagger = Tagger(self._sample_rate)
+        operation_name = metric_name
         metric_name = f"{self._metric_base}.{metric_name}"
 
-        start = time()  # lint-amnesty, pylint: disable=unused-variable
+        start = time()
         try:
             yield tagger
         finally:
-            end = time()  # lint-amnesty, pylint: disable=unused-variable
+            end = time()
             tags = tagger.tags
             tags.append(f'course:{course_context}')
+            for profile in active_profiles():
+                profile.record(operation_name, end - start, tagger)
 
 
 TIMER = QueryTimer(__name__, 0.01)
@@ -202,64 +379,354 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def _pickle5_dumps(structure):
+    """
+    Pickle the structure with protocol 5, framing any out-of-band buffers after the pickle
+    as a count followed by length-prefixed buffers.
+    """
+    buffers = []
+    pickled_data = pickle.dumps(structure, 5, buffer_callback=buffers.append)
+    frames = [struct.pack('>I', len(buffers))]
+    for buffer in [pickled_data] + [buffer.raw() for buffer in buffers]:
+        frames.append(struct.pack('>Q', len(buffer)))
+        frames.append(buffer)
+    return b''.join(frames)
+
+
+def _pickle5_loads(data):
+    """
+    Unpickle the output of _pickle5_dumps, passing the out-of-band buffers back to pickle.
+    """
+    data = memoryview(data)
+    buffer_count, = struct.unpack_from('>I', data)
+    offset = 4
+    frames = []
+    for _ in range(buffer_count + 1):
+        length, = struct.unpack_from('>Q', data, offset)
+        offset += 8
+        frames.append(data[offset:offset + length])
+        offset += length
+    return pickle.loads(frames[0], buffers=frames[1:])
+
+
+def _bson_dumps(structure):
+    """
+    Encode the structure as a BSON document, in the format it's stored in mongo.
+    """
+    return bson.encode(structure_to_mongo(structure))
+
+
+def _bson_loads(data):
+    """
+    Decode a structure from the output of _bson_dumps.
+    """
+    return structure_from_mongo(bson.decode(data, codec_options=CodecOptions(tz_aware=True)))
+
+
+class CourseStructureCodec:
+    """
+    A serializer and a compressor for the structures stored in the CourseStructureCache.
+
+    Cached structures are wrapped in a versioned envelope recording their serializer
+    and compressor, so that the configured codec can be changed without clearing the
+    cache. The exception is the legacy codec (pickle protocol 4 and zlib), which is
+    stored without an envelope so that it stays readable by previous releases.
+    """
+    ENVELOPE_MAGIC = b'\x00CSC'  # Never the start of a zlib stream, so never the start of a legacy value
+    ENVELOPE_VERSION = 1
+
+    # The ids of the serializers and compressors in the envelope, which must never change
+    SERIALIZER_IDS = {'pickle4': 1, 'pickle5': 2, 'bson': 3}
+    COMPRESSOR_IDS = {'none': 1, 'zlib': 2, 'zstd': 3, 'lz4': 4}
+
+    # Serializer names and their (dumps, loads) functions
+    SERIALIZERS = {
+        'pickle4': (lambda structure: pickle.dumps(structure, 4), lambda data: pickle.loads(data, encoding='latin-1')),
+        'pickle5': (_pickle5_dumps, _pickle5_loads),
+        'bson': (_bson_dumps, _bson_loads),
+    }
+
+    # Compressor names and their (compress, decompress) functions, or None if not installed
+    COMPRESSORS = {
+        'none': (bytes, bytes),
+        # 1 = Fastest (slightly larger results)
+        'zlib': (lambda data: zlib.compress(data, 1), zlib.decompress),
+        'zstd': (
+            lambda data: zstandard.ZstdCompressor().compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        ) if zstandard else None,
+        'lz4': (lz4.frame.compress, lz4.frame.decompress) if lz4 else None,
+    }
+
+    LEGACY = ('pickle4', 'zlib')
+
+    def __init__(self, serializer='pickle4', compressor='zlib'):
+        if serializer not in self.SERIALIZERS:
+            raise ValueError(f'Unknown course structure cache serializer: {serializer}')
+        if compressor not in self.COMPRESSORS:
+            raise ValueError(f'Unknown course structure cache compressor: {compressor}')
+        if self.COMPRESSORS[compressor] is None:
+            log.warning(
+                "CourseStructureCache: The %s compressor isn't installed, falling back to zlib", compressor
+            )
+            compressor = 'zlib'
+        self.serializer = serializer
+        self.compressor = compressor
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return the codec configured by the COURSE_STRUCTURE_CACHE_SERIALIZER and
+        COURSE_STRUCTURE_CACHE_COMPRESSOR settings.
+        """
+        if not DJANGO_AVAILABLE:
+            return cls()
+        return cls(
+            getattr(settings, 'COURSE_STRUCTURE_CACHE_SERIALIZER', 'pickle4'),
+            getattr(settings, 'COURSE_STRUCTURE_CACHE_COMPRESSOR', 'zlib'),
+        )
+
+    def encode(self, structure, tagger=None):
+        """
+        Serialize, compress and wrap the structure in an envelope.
+        """
+        dumps, _ = self.SERIALIZERS[self.serializer]
+        serialized_data = dumps(structure)
+        if tagger:
+            tagger.measure('uncompressed_size', len(serialized_data))
+
+        compress, _ = self.COMPRESSORS[self.compressor]
+        compressed_data = compress(serialized_data)
+        if (self.serializer, self.compressor) == self.LEGACY:
+            return compressed_data
+
+        return self.ENVELOPE_MAGIC + bytes([
+            self.ENVELOPE_VERSION,
+            self.SERIALIZER_IDS[self.serializer],
+            self.COMPRESSOR_IDS[self.compressor],
+        ]) + compressed_data
+
+    @classmethod
+    def decode(cls, data, tagger=None):
+        """
+        Decode data written with any codec.
+
+        Returns:
+            (structure, (serializer, compressor)) where serializer and compressor are the
+            names of the codec the data was written with.
+        """
+        codec = cls.LEGACY
+        if data.startswith(cls.ENVELOPE_MAGIC):
+            header_end = len(cls.ENVELOPE_MAGIC) + 3
+            version, serializer_id, compressor_id = data[len(cls.ENVELOPE_MAGIC):header_end]
+            if version != cls.ENVELOPE_VERSION:
+                raise ValueError(f'Unknown course structure cache envelope version: {version}')
+            codec = (
+                cls._name_for_id(cls.SERIALIZER_IDS, serializer_id),
+                cls._name_for_id(cls.COMPRESSOR_IDS, compressor_id),
+            )
+            data = data[header_end:]
+
+        serializer, compressor = codec
+        if cls.COMPRESSORS[compressor] is None:
+            raise ValueError(f"The {compressor} compressor isn't installed")
+        _, decompress = cls.COMPRESSORS[compressor]
+        serialized_data = decompress(data)
+        if tagger:
+            tagger.measure('uncompressed_size', len(serialized_data))
+
+        _, loads = cls.SERIALIZERS[serializer]
+        return loads(serialized_data), codec
+
+    @staticmethod
+    def _name_for_id(codec_ids, codec_id):
+        """
+        Return the name of the serializer or compressor in codec_ids with the envelope id codec_id.
+        """
+        for name, name_id in codec_ids.items():
+            if name_id == codec_id:
+                return name
+        raise ValueError(f'Unknown course structure cache codec id: {codec_id}')
+
+
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are serialized and compressed when cached, with the
+    codec configured by the COURSE_STRUCTURE_CACHE_SERIALIZER and
+    COURSE_STRUCTURE_CACHE_COMPRESSOR settings. Structures cached with another
+    codec are rewritten with the configured one when they're read.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
-    def __init__(self):
+    def __init__(self, codec=None):
         self.cache = None
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+        self.codec = codec
+        if self.cache is not None and self.codec is None:
+            self.codec = CourseStructureCodec.from_settings()
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed, serialized struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
             try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+                compressed_data = self.cache.get(key)
+                tagger.tag(from_cache=str(compressed_data is not None).lower())
 
-                if compressed_pickled_data is None:
+                if compressed_data is None:
                     # Always log cache misses, because they are unexpected
                     tagger.sample_rate = 1
                     return None
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
+                tagger.measure('compressed_size', len(compressed_data))
 
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
-
-                return pickle.loads(pickled_data, encoding='latin-1')
+                structure, codec = CourseStructureCodec.decode(compressed_data, tagger)
             except Exception:  # lint-amnesty, pylint: disable=broad-except
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
                 self.cache.delete(key)
                 return None
 
+        if codec != (self.codec.serializer, self.codec.compressor):
+            # Migrate the cached structure to the configured codec
+            self.set(key, structure, course_context)
+        return structure
+
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will serialize, compress, and write to cache."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
-            tagger.measure('uncompressed_size', len(pickled_data))
-
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            compressed_data = self.codec.encode(structure, tagger)
+            tagger.measure('compressed_size', len(compressed_data))
 
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set(key, compressed_data, None)
+
+
+class SharedStructureCache:
+    """
+    A bounded, thread-safe, process-wide LRU cache of decoded course structures, keyed by
+    their version guid. Structures are immutable once persisted, so its entries never have
+    to be invalidated; they're evicted, least recently used first, when the total size of
+    the cached structures exceeds the COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES setting.
+
+    Indexes derived from a cached structure (such as its inheritance table) can be kept
+    alongside it, and are evicted with it.
+
+    The size of a structure or index is estimated by the length of its pickle.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._structures = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        """
+        The maximum total size of the cached structures, in bytes. 0 disables the cache.
+        """
+        if not DJANGO_AVAILABLE:
+            return 0
+        return getattr(settings, 'COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES', 0)
+
+    def get(self, key):
+        """
+        Return the structure with the given version guid, or None if it isn't cached.
+        """
+        with self._lock:
+            entry = self._structures.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._structures.move_to_end(key)
+            self.hits += 1
+            return entry['structure']
+
+    def set(self, key, structure):
+        """
+        Cache the structure with the given version guid, evicting the least recently used
+        structures until the cache fits in its maximum size.
+        """
+        max_size = self.max_size
+        if not max_size:
+            return
+        size = len(pickle.dumps(structure, pickle.HIGHEST_PROTOCOL))
+        if size > max_size:
+            return
+
+        with self._lock:
+            if key in self._structures:
+                return
+            self._structures[key] = {'structure': structure, 'size': size, 'indexes': {}}
+            self.size += size
+            self._evict(max_size)
+
+    def get_index(self, key, index_name):
+        """
+        Return the index named index_name kept alongside the structure with the given version
+        guid, or None if either of them isn't cached.
+        """
+        with self._lock:
+            entry = self._structures.get(key)
+            if entry is None:
+                return None
+            return entry['indexes'].get(index_name)
+
+    def set_index(self, key, structure, index_name, index):
+        """
+        Keep the index named index_name, built from the given structure, alongside the cached
+        structure with the given version guid. The index isn't kept if the structure isn't the
+        cached one.
+        """
+        max_size = self.max_size
+        if not max_size:
+            return
+        size = len(pickle.dumps(index, pickle.HIGHEST_PROTOCOL))
+
+        with self._lock:
+            entry = self._structures.get(key)
+            if entry is None or entry['structure'] is not structure or index_name in entry['indexes']:
+                return
+            entry['indexes'][index_name] = index
+            entry['size'] += size
+            self.size += size
+            self._evict(max_size)
+
+    def _evict(self, max_size):
+        """
+        Evict the least recently used structures until the cache fits in max_size.
+        """
+        while self.size > max_size:
+            _, evicted_entry = self._structures.popitem(last=False)
+            self.size -= evicted_entry['size']
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all of the cached structures.
+        """
+        with self._lock:
+            self._structures.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._structures)
+
+
+SHARED_STRUCTURE_CACHE = SharedStructureCache()
 
 
 class MongoConnection:
@@ -61,6 +61,7 @@ import hashlib
 import logging
 from collections import defaultdict
 from importlib import import_module
+from operator import itemgetter
 
 from bson.objectid import ObjectId
 from ccx_keys.locator import CCXBlockUsageLocator, CCXLocator
@@ -91,7 +92,6 @@ from xmodule.modulestore import (
     BulkOpsRecord,
     ModuleStoreEnum,
     ModuleStoreWriteBase,
-    SortedAssetList,
     inheritance
 )
 from xmodule.modulestore.exceptions import (
@@ -103,7 +103,12 @@ from xmodule.modulestore.exceptions import (
     VersionConflictError
 )
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
-from xmodule.modulestore.split_mongo.mongo_connection import DuplicateKeyError, MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    SHARED_STRUCTURE_CACHE,
+    TIMER,
+    DuplicateKeyError,
+    MongoConnection
+)
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.partitions.partitions_service import PartitionService
 
@@ -353,7 +358,21 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         else:
             # cast string to ObjectId if necessary
             version_guid = course_key.as_object_id(version_guid)
-            return self.db_connection.get_structure(version_guid, course_key)
+            if course_key.branch != ModuleStoreEnum.BranchName.published:
+                return self.db_connection.get_structure(version_guid, course_key)
+
+            # Published structures are read much more often than they're created, so they're
+            # shared across requests by the process-wide structure cache.
+            with TIMER.timer("get_structure.shared_cache", course_key) as tagger:
+                structure = SHARED_STRUCTURE_CACHE.get(version_guid)
+                tagger.tag(from_shared_cache=str(structure is not None).lower())
+                if structure is None:
+                    structure = self.db_connection.get_structure(version_guid, course_key)
+                    if structure is not None:
+                        SHARED_STRUCTURE_CACHE.set(version_guid, structure)
+                tagger.measure('shared_cache_structures', len(SHARED_STRUCTURE_CACHE))
+                tagger.measure('shared_cache_size', SHARED_STRUCTURE_CACHE.size)
+            return structure
 
     def update_structure(self, course_key, structure):
         """
@@ -483,8 +502,11 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         if bulk_write_record.active and course_key.branch in bulk_write_record.dirty_branches:
             return bulk_write_record.structure_for_branch(course_key.branch)
 
-        # Otherwise, make a new structure
-        new_structure = copy.deepcopy(structure)
+        # Otherwise, make a new structure. The lists of asset metadata are replaced rather than
+        # updated in place, so they're shared with the previous version instead of being copied.
+        new_structure = copy.deepcopy({key: value for key, value in structure.items() if key != 'assets'})
+        if 'assets' in structure:
+            new_structure['assets'] = dict(structure['assets'])
         new_structure['_id'] = ObjectId()
         new_structure['previous_version'] = structure['_id']
         new_structure['edited_by'] = user_id
@@ -768,7 +790,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         self.db_connection._drop_database(database, collections, connections)  # pylint: disable=protected-access
 
-    def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True):
+    def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True, prefetch_definitions=False):
         """
         Handles caching of items once inheritance and any other one time
         per course per fetch operations are done.
@@ -779,6 +801,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             course_key: the destination course providing the context
             depth: how deep below these to prefetch
             lazy: whether to load definitions now or later
+            prefetch_definitions: if lazy, whether to load the definitions of all of the
+                fetched blocks in a single batch as soon as the first of them is needed
         """
         with self.bulk_operations(course_key, emit_signals=False):
             new_module_data = {}
@@ -805,12 +829,26 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 definitions = {definition['_id']: definition
                                for definition in descendent_definitions}
 
-                for block in new_module_data.values():
+                for block_key, block in new_module_data.items():
                     if block.definition in definitions:
                         definition = definitions[block.definition]
+                        # Load the definition into a copy of the block, so that the structure,
+                        # which may be shared across requests and threads, isn't modified
+                        block = copy.copy(block)
                         # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
+                        block.fields = dict(block.fields, **definition.get('fields'))
                         block.definition_loaded = True
+                        new_module_data[block_key] = block
+            else:
+                # Keep the blocks whose definitions were loaded by an earlier, non-lazy fetch
+                new_module_data = {
+                    block_key: block for block_key, block in new_module_data.items()
+                    if not getattr(system.module_data.get(block_key), 'definition_loaded', False)
+                }
+                if prefetch_definitions:
+                    system.prefetch_definitions(
+                        block.definition for block in new_module_data.values() if block.definition is not None
+                    )
 
             system.module_data.update(new_module_data)
             return system.module_data
@@ -821,10 +859,13 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         Load & cache the given blocks from the course. May return the blocks in any order.
 
         Load the definitions into each block if lazy is in kwargs and is False;
-        otherwise, do not load the definitions - they'll be loaded later when needed.
+        otherwise, do not load the definitions - they'll be loaded later when needed,
+        in a single batch for all of the loaded blocks if prefetch_definitions is in
+        kwargs and is True.
         """
         lazy = kwargs.pop('lazy', True)
-        should_cache_items = not lazy
+        prefetch_definitions = kwargs.pop('prefetch_definitions', False)
+        should_cache_items = not lazy or prefetch_definitions
 
         runtime = self._get_cache(course_entry.structure['_id'])
         if runtime is None:
@@ -833,7 +874,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             should_cache_items = True
 
         if should_cache_items:
-            self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
+            self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy, prefetch_definitions)
 
         with self.bulk_operations(course_entry.course_key, emit_signals=False):
             return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
@@ -867,12 +908,14 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return
 
         if course_version_guid:
-            try:
-                del self.request_cache.data.setdefault('course_cache', {})[course_version_guid]
-            except KeyError:
-                pass
+            for cache_name in ('course_cache', 'structure_index_cache'):
+                try:
+                    del self.request_cache.data.setdefault(cache_name, {})[course_version_guid]
+                except KeyError:
+                    pass
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['structure_index_cache'] = {}
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1281,20 +1324,33 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         items = []
         qualifiers = qualifiers.copy() if qualifiers else {}  # copy the qualifiers (destructively manipulated here)
 
-        def _block_matches_all(block_data):
+        def _blocks_matching_all(block_ids):
             """
-            Check that the block matches all the criteria
+            Return the block_ids of the blocks which match all the criteria, loading the
+            definitions needed to check the content criteria with a single query
             """
+            blocks = course.structure['blocks']
             # do the checks which don't require loading any additional data
-            if (
-                self._block_matches(block_data, qualifiers) and
-                self._block_matches(block_data.fields, settings)
-            ):
-                if content:
-                    definition_block = self.get_definition(course_locator, block_data.definition)
-                    return self._block_matches(definition_block['fields'], content)
-                else:
-                    return True
+            block_ids = [
+                block_id
+                for block_id in block_ids
+                if self._block_matches(blocks[block_id], qualifiers) and
+                self._block_matches(blocks[block_id].fields, settings)
+            ]
+            if content and block_ids:
+                definitions = {
+                    definition['_id']: definition
+                    for definition in self.get_definitions(
+                        course_locator, [blocks[block_id].definition for block_id in block_ids]
+                    )
+                }
+                block_ids = [
+                    block_id
+                    for block_id in block_ids
+                    if blocks[block_id].definition in definitions and
+                    self._block_matches(definitions[blocks[block_id].definition]['fields'], content)
+                ]
+            return block_ids
 
         if settings is None:
             settings = {}
@@ -1302,7 +1358,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
             block_ids = []
-            for block_id, block in course.structure['blocks'].items():
+            for block_id in course.structure['blocks']:
                 # Don't do an in comparison blindly; first check to make sure
                 # that the name qualifier we're looking at isn't a plain string;
                 # if it is a string, then it should match exactly. If it's other
@@ -1313,10 +1369,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                     name_matches = block_id.id == block_name
                 else:
                     name_matches = block_id.id in block_name
-                if name_matches and _block_matches_all(block):
+                if name_matches:
                     block_ids.append(block_id)
 
-            return self._load_items(course, block_ids, **kwargs)
+            return self._load_items(course, _blocks_matching_all(block_ids), **kwargs)
 
         if 'category' in qualifiers:
             qualifiers['block_type'] = qualifiers.pop('category')
@@ -1331,18 +1387,20 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         if not include_orphans:
             path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
-
-        for block_id, value in course.structure['blocks'].items():
-            if _block_matches_all(value):
-                if not include_orphans:
-                    if (
-                        block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
-                    ):
-                        items.append(block_id)
-                else:
+            parents_cache = self._get_parents_index(course.structure)
+            if parents_cache is None:
+                parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+
+        candidate_block_ids = self._get_candidate_block_keys(course.structure, qualifiers, settings)
+        for block_id in _blocks_matching_all(candidate_block_ids):
+            if not include_orphans:
+                if (
+                    block_id.type in DETACHED_XBLOCK_TYPES or
+                    self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                ):
                     items.append(block_id)
+            else:
+                items.append(block_id)
 
         if len(items) > 0:
             return self._load_items(course, items, depth=0, **kwargs)
@@ -1385,7 +1443,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if parents_cache is None:
             xblock_parents = self._get_parents_from_structure(block_key, course.structure)
         else:
-            xblock_parents = parents_cache[block_key]
+            xblock_parents = parents_cache.get(block_key, [])
 
         if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
             # Found, xblock has the path to the root
@@ -2772,7 +2830,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         self._emit_course_deleted_signal(course_key)
 
-    @contract(block_map="dict(BlockKey: dict)", block_key=BlockKey)
+    @contract(block_map="dict(BlockKey: BlockData)", block_key=BlockKey)
     def inherit_settings(
         self, block_map, block_key, inherited_settings_map, inheriting_settings=None, inherited_from=None
     ):
@@ -2851,21 +2909,119 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         Split specific lookup
         """
+        structure = self._find_asset_structure(course_key)
+        if structure is None:
+            return {}
+        return structure.get('assets', {})
+
+    def _find_asset_structure(self, course_key):
+        """
+        Return the structure holding the asset metadata of the given course, or None if it can't be found.
+        """
         try:
-            course_assets = self._lookup_course(course_key).structure.get('assets', {})
-        except (InsufficientSpecificationError, VersionConflictError) as err:  # lint-amnesty, pylint: disable=unused-variable
+            return self._lookup_course(course_key).structure
+        except (InsufficientSpecificationError, VersionConflictError):
             log.warning('Error finding assets for org "%s" course "%s" on asset '
                         'request. Either version of course_key is None or invalid.',
                         course_key.org, course_key.course)
-            return {}
+            return None
 
-        return course_assets
+    def _get_asset_index(self, structure):
+        """
+        Return the index of the asset metadata of the given structure used to look assets up by
+        filename, or None if there's no request cache to keep it in. The index maps each
+        asset_type to a dict of the storable metadata of its assets by filename.
+        """
+        return self._get_structure_index(
+            structure, 'assets',
+            lambda: {
+                asset_type: {asset['filename']: asset for asset in assets}
+                for asset_type, assets in structure.get('assets', {}).items()
+            },
+            shared=True,
+        )
+
+    def _get_sorted_assets(self, structure, asset_type, sort_by):
+        """
+        Return the storable metadata of the assets of the given asset_type (or of all types, if
+        None) of the given structure, sorted in ascending order by filename, or by upload date if
+        sort_by is 'uploadDate'. The sorted lists are built once per structure version, or None
+        is returned if there's no request cache to keep them in.
+        """
+        def build_sorted_assets():
+            """
+            Sort the assets; the lists stored for each asset_type are already sorted by filename.
+            """
+            course_assets = structure.get('assets', {})
+            if asset_type is None:
+                assets = [asset for type_assets in course_assets.values() for asset in type_assets]
+            else:
+                assets = course_assets.get(asset_type, [])
+            if sort_by == 'uploadDate':
+                return sorted(assets, key=lambda asset: asset['edit_info']['edited_on'])
+            return sorted(assets, key=itemgetter('filename'))
+
+        return self._get_structure_index(
+            structure, f'assets.{asset_type}.{sort_by}', build_sorted_assets, shared=True
+        )
+
+    @contract(asset_key='AssetKey')
+    def find_asset_metadata(self, asset_key, **kwargs):
+        """
+        Find the metadata for a particular course asset, using the asset index of the course's structure.
+        """
+        structure = self._find_asset_structure(asset_key.course_key)
+        if structure is None:
+            return None
+        asset_index = self._get_asset_index(structure)
+        if asset_index is None:
+            return super().find_asset_metadata(asset_key, **kwargs)
+
+        raw_asset = asset_index.get(asset_key.asset_type, {}).get(asset_key.path)
+        if raw_asset is None:
+            return None
+        mdata = AssetMetadata(asset_key, asset_key.path, **kwargs)
+        # The cached structure may be shared with other lookups, so the metadata gets its own copy of the asset.
+        mdata.from_storable(copy.deepcopy(raw_asset))
+        return mdata
+
+    def get_all_asset_metadata(self, course_key, asset_type, start=0, maxresults=-1, sort=None, **kwargs):
+        """
+        Returns a list of asset metadata for all assets of the given asset_type in the course, paging
+        through the assets of the course's structure sorted once per structure version.
+        See ModuleStoreAssetBase.get_all_asset_metadata for the arguments.
+        """
+        structure = self._find_asset_structure(course_key)
+        if structure is None:
+            return []
+        sort_by = 'uploadDate' if sort and sort[0] == 'uploadDate' else 'displayname'
+        sorted_assets = self._get_sorted_assets(structure, asset_type, sort_by)
+        if sorted_assets is None:
+            return super().get_all_asset_metadata(course_key, asset_type, start, maxresults, sort, **kwargs)
+
+        num_assets = len(sorted_assets)
+        end = num_assets if maxresults < 0 else min(num_assets, start + maxresults)
+        if start >= end:
+            return []
+        if sort and sort[1] == ModuleStoreEnum.SortOrder.descending:
+            page = sorted_assets[num_assets - end:num_assets - start][::-1]
+        else:
+            page = sorted_assets[start:end]
+
+        ret_assets = []
+        for raw_asset in page:
+            asset_key = course_key.make_asset_key(raw_asset['asset_type'], raw_asset['filename'])
+            new_asset = AssetMetadata(asset_key)
+            new_asset.from_storable(copy.deepcopy(raw_asset))
+            ret_assets.append(new_asset)
+        return ret_assets
 
     def _update_course_assets(self, user_id, asset_key, update_function):
         """
         A wrapper for functions wanting to manipulate assets. Gets and versions the structure,
-        passes the mutable array for either 'assets' or 'thumbnails' as well as the idx to the function for it to
-        update, then persists the changed data back into the course.
+        passes a copy of the list of the assets of the asset_key's type, which is sorted by filename, as
+        well as the idx of the asset in it (or None if it isn't there) to the function for it to update,
+        then persists the changed data back into the course.
 
         The update function can raise an exception if it doesn't want to actually do the commit. The
         surrounding method probably should catch that exception.
@@ -2877,11 +3033,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             course_assets = new_structure.setdefault('assets', {})
 
             asset_type = asset_key.asset_type
-            all_assets = SortedAssetList(iterable=course_assets.setdefault(asset_type, []))
-            asset_idx = all_assets.find(asset_key)
+            all_assets = list(course_assets.get(asset_type, []))
+            asset_idx = _bisect_assets(all_assets, asset_key.path)
+            if asset_idx == len(all_assets) or all_assets[asset_idx]['filename'] != asset_key.path:
+                asset_idx = None
 
-            all_assets_updated = update_function(all_assets, asset_idx)
-            new_structure['assets'][asset_type] = list(all_assets_updated)
+            course_assets[asset_type] = update_function(all_assets, asset_idx)
 
             # update index if appropriate and structures
             self.update_structure(asset_key.course_key, new_structure)
@@ -2923,9 +3080,23 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
     def save_asset_metadata(self, asset_metadata, user_id, import_only=False):
         """
-        Saves or updates a single asset. Simply makes it a list and calls the list save above.
+        Saves or updates a single asset, inserting it into the list of assets of its type in place.
         """
-        return self.save_asset_metadata_list([asset_metadata, ], user_id, import_only)
+        asset_key = asset_metadata.asset_id
+        if not import_only:
+            asset_metadata.update({'edited_by': user_id, 'edited_on': datetime.datetime.now(UTC)})
+
+        def _internal_method(all_assets, asset_idx):
+            """
+            Replace the item if it was found, otherwise insert it where it sorts
+            """
+            if asset_idx is None:
+                all_assets.insert(_bisect_assets(all_assets, asset_key.path), asset_metadata.to_storable())
+            else:
+                all_assets[asset_idx] = asset_metadata.to_storable()
+            return all_assets
+
+        self._update_course_assets(user_id, asset_key, _internal_method)
 
     @contract(asset_key='AssetKey', attr_dict=dict)
     def set_asset_metadata_attrs(self, asset_key, attr_dict, user_id):  # lint-amnesty, pylint: disable=arguments-differ
@@ -2947,13 +3118,14 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             if asset_idx is None:
                 raise ItemNotFoundError(asset_key)
 
-            # Form an AssetMetadata.
+            # Form an AssetMetadata, with its own fields, as the stored ones may be shared with other versions.
             mdata = AssetMetadata(asset_key, asset_key.path)
             mdata.from_storable(all_assets[asset_idx])
+            mdata.fields = dict(mdata.fields)
             mdata.update(attr_dict)
 
             # Generate a Mongo doc from the metadata and update the course asset info.
-            all_assets.insert_or_update(mdata)
+            all_assets[asset_idx] = mdata.to_storable()
             return all_assets
 
         self._update_course_assets(user_id, asset_key, _internal_method)
@@ -3000,8 +3172,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             index_entry = self._get_index_if_valid(dest_course_key)
             new_structure = self.version_structure(dest_course_key, original_structure, user_id)
 
-            new_structure['assets'] = source_structure.get('assets', {})
-            new_structure['thumbnails'] = source_structure.get('thumbnails', [])
+            new_structure['assets'] = dict(source_structure.get('assets', {}))
+            new_structure['thumbnails'] = list(source_structure.get('thumbnails', []))
 
             # update index if appropriate and structures
             self.update_structure(dest_course_key, new_structure)
@@ -3225,6 +3397,22 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         Given a structure, find block_key's parent in that structure. Note returns
         the encoded format for parent
+
+        The parents are looked up in the index of the structure's version (see
+        _get_parents_index), so a structure which is being modified must be passed
+        to update_structure before looking up parents in it again.
+        """
+        parents_index = self._get_parents_index(structure)
+        if parents_index is None:
+            return self._find_parents_in_structure(block_key, structure)
+        return list(parents_index.get(block_key, []))
+
+    @contract(block_key=BlockKey)
+    def _find_parents_in_structure(self, block_key, structure):
+        """
+        Given a structure, find block_key's parent in that structure by scanning all
+        of its blocks. Unlike _get_parents_from_structure, this is safe to use while
+        the structure is being modified.
         """
         return [
             parent_block_key
@@ -3232,6 +3420,120 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             if block_key in value.fields.get('children', [])
         ]
 
+    def _get_parents_index(self, structure):
+        """
+        Return the mapping of block_keys to the list of their parents for the given
+        structure, or None if there's no request cache to keep it in.
+        """
+        return self._get_structure_index(
+            structure, 'parents', lambda: dict(self.build_block_key_to_parents_mapping(structure)),
+        )
+
+    def _get_block_index(self, structure):
+        """
+        Return the index of the blocks of the given structure used by get_items, or None
+        if there's no request cache to keep it in. The index is a dict with:
+            'positions': the position of each block_key in structure['blocks']
+            'block_types': the set of block_keys of each block_type
+            'fields': the set of block_keys of the blocks which have each settings field set
+        """
+        def build_block_index():
+            """
+            Build the index in a single pass over the blocks of the structure
+            """
+            positions = {}
+            block_types = defaultdict(set)
+            fields = defaultdict(set)
+            for position, (block_key, block_data) in enumerate(structure['blocks'].items()):
+                positions[block_key] = position
+                block_types[block_data.block_type].add(block_key)
+                for field_name in block_data.fields:
+                    fields[field_name].add(block_key)
+            return {'positions': positions, 'block_types': dict(block_types), 'fields': dict(fields)}
+
+        return self._get_structure_index(structure, 'blocks', build_block_index)
+
+    def get_inheritance_table(self, structure):
+        """
+        Return the inheritance table of the given structure, or None if there's no request
+        cache to keep it in. The table maps the block_key of each block reachable from the
+        root of the structure to the json values of the inheritable settings it inherits from
+        its ancestors, so that looking them up doesn't require loading the ancestors.
+
+        The table of a published structure is also kept alongside it in the process-wide
+        structure cache, so it's only computed once per process.
+        """
+        def build_inheritance_table():
+            """
+            Walk the tree of the structure from its root, accumulating the inherited settings
+            """
+            inherited_settings_map = {}
+            self.inherit_settings(structure['blocks'], BlockKey(*structure['root']), inherited_settings_map)
+            return inherited_settings_map
+
+        return self._get_structure_index(structure, 'inheritance', build_inheritance_table, shared=True)
+
+    def _get_structure_index(self, structure, index_name, build_index, shared=False):
+        """
+        Return the index named index_name of the given structure, calling build_index to
+        build it the first time it's needed for the structure's version and caching it in
+        the request cache alongside the course_cache. The indexes of a version are
+        discarded by _clear_cache whenever update_structure is called for it.
+
+        If shared is True, the index is also kept alongside the structure in the process-wide
+        structure cache when the structure is cached there; those are immutable published
+        structures, so the index can be reused by subsequent requests.
+
+        Returns None if there's no request cache to keep the index in.
+        """
+        if self.request_cache is None:
+            return None
+
+        structure_indexes = self.request_cache.data.setdefault('structure_index_cache', {}).setdefault(
+            structure['_id'], {}
+        )
+        if index_name not in structure_indexes:
+            index = SHARED_STRUCTURE_CACHE.get_index(structure['_id'], index_name) if shared else None
+            if index is None:
+                index = build_index()
+                if shared:
+                    SHARED_STRUCTURE_CACHE.set_index(structure['_id'], structure, index_name, index)
+            structure_indexes[index_name] = index
+        return structure_indexes[index_name]
+
+    def _get_candidate_block_keys(self, structure, qualifiers, settings):
+        """
+        Return, in structure order, the block_keys of the given structure which can match the
+        block_type qualifier and the settings of get_items, using the structure's block index
+        to skip the blocks which can't. The candidates still have to be checked against all of
+        the criteria.
+        """
+        block_index = self._get_block_index(structure)
+        if block_index is None:
+            return list(structure['blocks'])
+
+        candidate_sets = []
+        block_type = qualifiers.get('block_type')
+        if isinstance(block_type, str):
+            candidate_sets.append(block_index['block_types'].get(block_type, set()))
+        elif isinstance(block_type, dict) and '$in' in block_type and all(
+            isinstance(block_type_value, str) for block_type_value in block_type['$in']
+        ):
+            candidate_sets.append(set().union(
+                *(block_index['block_types'].get(block_type_value, set()) for block_type_value in block_type['$in'])
+            ))
+
+        for field_name, criteria in settings.items():
+            # Only blocks which have the field set can match, unless its absence is asked for
+            if not (isinstance(criteria, dict) and criteria.get('$exists') is False):
+                candidate_sets.append(block_index['fields'].get(field_name, set()))
+
+        if not candidate_sets:
+            return list(structure['blocks'])
+
+        candidates = set.intersection(*candidate_sets)
+        return sorted(candidates, key=block_index['positions'].get)
+
     def _sync_children(self, source_parent, destination_parent, new_child):
         """
         Reorder destination's children to the same as source's and remove any no longer in source.
@@ -3338,7 +3640,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         Delete the orphan and any of its descendants which no longer have parents.
         """
-        if len(self._get_parents_from_structure(orphan, structure)) == 0:
+        if len(self._find_parents_in_structure(orphan, structure)) == 0:
             orphan_data = structure['blocks'].pop(orphan)
             for child in orphan_data.fields.get('children', []):
                 self._delete_if_true_orphan(BlockKey(*child), structure)
@@ -3484,6 +3786,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         self.db_connection.ensure_indexes()
 
 
+def _bisect_assets(assets, filename):
+    """
+    Return the position of the first of the given storable asset metadata, which are sorted by
+    filename, whose filename isn't less than the given filename.
+    """
+    low, high = 0, len(assets)
+    while low < high:
+        middle = (low + high) // 2
+        if assets[middle]['filename'] < filename:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
 class SparseList(list):
     """
     Enable inserting items into a list in arbitrary order and then retrieving them.
@@ -485,7 +485,7 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
             course_structure (dict)  : course structure of the course.
             user_id (int)   : User id
         """
-        parent_block_keys = self._get_parents_from_structure(BlockKey.from_usage_key(item_location), course_structure)
+        parent_block_keys = self._find_parents_in_structure(BlockKey.from_usage_key(item_location), course_structure)
         for block_key in parent_block_keys:
             # Item's parent is different than its new parent - so it has moved.
             if block_key.id != original_parent_location.block_id:
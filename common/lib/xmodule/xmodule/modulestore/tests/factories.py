@@ -23,6 +23,7 @@ from xblock.core import XBlock
 
 from xmodule.course_module import Textbook
 from xmodule.modulestore import ModuleStoreEnum, prefer_xmodules
+from xmodule.modulestore.split_mongo.mongo_connection import profile_queries
 from xmodule.modulestore.tests.sample_courses import TOY_BLOCK_INFO_TREE, default_block_info_tree
 from xmodule.tabs import CourseTab
 
@@ -681,6 +682,26 @@ def check_mongo_calls(num_finds=0, num_sends=None, stack_depth=2):
     ):
         yield
 
+
+@contextmanager
+def check_query_budget(**budgets):
+    """
+    Profiles the split modulestore queries made in the with statement, and verifies that the number of queries
+    of each of the given kinds doesn't exceed its budget. Yields the QueryProfile, for further assertions.
+
+    :param budgets: the maximum number of queries of each kind (structure, definition or course_index, see
+        QueryProfile.QUERY_KINDS), or of all kinds for 'total'
+    """
+    with profile_queries() as profile:
+        yield profile
+
+    messages = []
+    for kind, budget in budgets.items():
+        query_count = profile.query_count(None if kind == 'total' else kind)
+        if query_count > budget:
+            messages.append(f"Expected at most {budget} {kind} queries, {query_count} were made.")
+    assert not messages, " ".join(messages + [f"Profile: {profile}"])
+
 # This dict represents the attribute keys for a course's 'about' info.
 # Note: The 'video' attribute is intentionally excluded as it must be
 # handled separately; its value maps to an alternate key name.
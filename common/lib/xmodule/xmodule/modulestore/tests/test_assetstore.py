@@ -400,6 +400,36 @@ class TestMongoAssetMetadataStorage(TestCase):
                 with pytest.raises(AttributeError):
                     assert getattr(updated_asset_md, attribute) == value
 
+    @ddt.data(*MODULESTORE_SETUPS)
+    def test_set_attrs_keeps_previous_metadata(self, storebuilder):
+        """
+        setting attrs shouldn't change the metadata found before
+        """
+        with storebuilder.build() as (__, store):
+            course = CourseFactory.create(modulestore=store)
+            new_asset_loc = course.id.make_asset_key('asset', 'burnside.jpg')
+            store.save_asset_metadata(self._make_asset_metadata(new_asset_loc), ModuleStoreEnum.UserID.test)
+            asset_md = store.find_asset_metadata(new_asset_loc)
+            store.set_asset_metadata_attrs(new_asset_loc, {'md5': 'changed'}, ModuleStoreEnum.UserID.test)
+            assert asset_md.fields['md5'] == '77631ca4f0e08419b70726a447333ab6'
+            assert store.find_asset_metadata(new_asset_loc).fields['md5'] == 'changed'
+
+    @ddt.data(*MODULESTORE_SETUPS)
+    def test_changing_found_metadata_keeps_stored_metadata(self, storebuilder):
+        """
+        changing the metadata found shouldn't change the metadata found later
+        """
+        with storebuilder.build() as (__, store):
+            course = CourseFactory.create(modulestore=store)
+            new_asset_loc = course.id.make_asset_key('asset', 'burnside.jpg')
+            store.save_asset_metadata(self._make_asset_metadata(new_asset_loc), ModuleStoreEnum.UserID.test)
+            store.find_asset_metadata(new_asset_loc).fields['md5'] = 'changed'
+            [asset_md] = store.get_all_asset_metadata(course.id, 'asset')
+            asset_md.fields['md5'] = 'changed'
+            assert store.find_asset_metadata(new_asset_loc).fields['md5'] == '77631ca4f0e08419b70726a447333ab6'
+            [asset_md] = store.get_all_asset_metadata(course.id, 'asset')
+            assert asset_md.fields['md5'] == '77631ca4f0e08419b70726a447333ab6'
+
     @ddt.data(*MODULESTORE_SETUPS)
     def test_save_one_different_asset(self, storebuilder):
         """
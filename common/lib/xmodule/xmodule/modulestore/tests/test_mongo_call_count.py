@@ -10,6 +10,7 @@ from unittest import skip
 
 import ddt
 from django.test import TestCase  # lint-amnesty, pylint: disable=reimported
+from fs.osfs import OSFS
 
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.utils import (
@@ -19,7 +20,7 @@ from xmodule.modulestore.tests.utils import (
     MongoModulestoreBuilder,
     VersioningModulestoreBuilder
 )
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_xml, export_extra_content
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
 MIXED_OLD_MONGO_MODULESTORE_BUILDER = MixedModulestoreBuilder([('draft', MongoModulestoreBuilder())])
@@ -193,3 +194,28 @@ class CountMongoCallsCourseTraversal(TestCase):
                     # and then subsequently retrieved with the lazy and depth=None values
                     course = modulestore.get_item(course.location, depth=None, lazy=False)
                     self._traverse_blocks_in_course(course, access_all_block_fields=True)
+
+    @ddt.data(True, False)
+    def test_prefetch_definitions(self, access_all_block_fields):
+        request_cache = MemoryCache()
+        with MIXED_SPLIT_MODULESTORE_BUILDER.build(request_cache=request_cache) as (content_store, modulestore):
+            course_key = self._import_course(content_store, modulestore)
+
+            # The definitions are loaded lazily, but all in the same query
+            with check_mongo_calls(3):
+                with modulestore.bulk_operations(course_key):
+                    course = modulestore.get_course(course_key, depth=None, prefetch_definitions=True)
+                    self._traverse_blocks_in_course(course, access_all_block_fields)
+
+    @ddt.data('about', 'course_info', 'static_tab')
+    def test_export_extra_content(self, category_type):
+        request_cache = MemoryCache()
+        with MIXED_SPLIT_MODULESTORE_BUILDER.build(request_cache=request_cache) as (content_store, modulestore):
+            course_key = self._import_course(content_store, modulestore)
+            export_dir = mkdtemp()
+            self.addCleanup(rmtree, export_dir, ignore_errors=True)
+            request_cache.data.clear()
+
+            # The course index, the course structure, and the definitions of all the items at once
+            with check_mongo_calls(3):
+                export_extra_content(OSFS(export_dir), modulestore, course_key, course_key, category_type, 'extra')
@@ -13,6 +13,7 @@ from unittest.mock import patch
 
 import pytest
 import ddt
+from bson.objectid import ObjectId
 from ccx_keys.locator import CCXBlockUsageLocator
 from contracts import contract
 from django.core.cache import InvalidCacheBackendError, caches
@@ -24,7 +25,7 @@ from openedx.core.lib import tempdir
 from openedx.core.lib.tests import attr
 from xmodule.course_module import CourseBlock
 from xmodule.fields import Date, Timedelta
-from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import (
     DuplicateCourseError,
@@ -34,12 +35,13 @@ from xmodule.modulestore.exceptions import (
     VersionConflictError
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
-from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
-from xmodule.modulestore.tests.utils import mock_tab_from_json
+from xmodule.modulestore.tests.utils import MemoryCache, mock_tab_from_json
 from xmodule.x_module import XModuleMixin
 
 BRANCH_NAME_DRAFT = ModuleStoreEnum.BranchName.draft
@@ -1205,6 +1207,46 @@ class SplitModuleItemTests(SplitModuleTest):
         matches = modulestore().get_items(locator, settings={'group_access': {'$exists': False}})
         assert len(matches) == 7
 
+    def test_get_items_with_block_index(self):
+        """
+        get_items gives the same results when the blocks are looked up in the index of the
+        structure, which is only kept if there's a request cache
+        """
+        modulestore().request_cache = MemoryCache()
+        self.test_get_items()
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        matches = modulestore().get_items(locator, qualifiers={'category': {'$in': ['chapter', 'course']}})
+        assert len(matches) == 5
+        matches = modulestore().get_items(locator, qualifiers={'category': 'chapter'}, settings={'garbage': 1})
+        assert len(matches) == 0
+
+    def test_get_items_by_content(self):
+        """
+        get_items loads the definitions of all of the candidate blocks in a single query
+        """
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        chapter = modulestore().get_item(locator.make_usage_key('chapter', 'chapter1'))
+        for index in range(3):
+            modulestore().create_child(
+                self.user_id, chapter.location.version_agnostic(),
+                block_type='problem',
+                block_id=f'problem{index}',
+                fields={'display_name': f'problem {index}', 'data': f'<problem>{index}</problem>'}
+            )
+
+        with patch.object(modulestore(), 'get_definition') as mock_get_definition:
+            with patch.object(
+                modulestore(), 'get_definitions', wraps=modulestore().get_definitions
+            ) as mock_get_definitions:
+                matches = modulestore().get_items(
+                    locator,
+                    qualifiers={'category': 'problem'},
+                    content={'data': re.compile(r'<problem>[12]</problem>')},
+                )
+        assert sorted(match.location.block_id for match in matches) == ['problem1', 'problem2']
+        assert mock_get_definitions.call_count == 1
+        assert not mock_get_definition.called
+
     def test_get_parents(self):
         '''
         get_parent_location(locator): BlockUsageLocator
@@ -1968,6 +2010,26 @@ class TestInheritance(SplitModuleTest):
         # overridden
         assert node.graceperiod == datetime.timedelta(hours=4)
 
+    def test_inheritance_table(self):
+        """
+        Inherited settings are looked up in the inheritance table of the structure, which is
+        only kept if there's a request cache, rather than by loading the ancestors of the block
+        """
+        modulestore().request_cache = MemoryCache()
+        locator = BlockUsageLocator(
+            CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT), 'problem', 'problem3_2'
+        )
+        node = modulestore().get_item(locator)
+        with patch.object(
+            CachingDescriptorSystem, 'xblock_from_json', autospec=True,
+            side_effect=CachingDescriptorSystem.xblock_from_json,
+        ) as mock_from_json:
+            # inherited
+            assert node.graceperiod == datetime.timedelta(hours=2)
+            # default
+            assert not node.visible_to_staff_only
+        mock_from_json.assert_not_called()
+
     def test_inheritance_not_saved(self):
         """
         Was saving inherited settings with updated blocks causing inheritance to be sticky
@@ -2186,6 +2248,75 @@ class TestPublish(SplitModuleTest):
         assert source_block_keys == dest_block_keys
 
 
+class TestParentsIndex(SplitModuleTest):
+    """
+    Test the index of the parents of the blocks of a structure, on a course with over 10k blocks
+    """
+    # The number of children of each block but the problems
+    FANOUT = 10
+
+    def setUp(self):
+        super().setUp()
+        self.store = modulestore()
+        self.store.request_cache = MemoryCache()
+        self.structure = self._build_structure()
+        self.course = CourseEnvelope(None, self.structure)
+
+    def _build_structure(self):
+        """
+        Build a structure with FANOUT chapters of FANOUT sequentials of FANOUT verticals of
+        FANOUT problems each.
+        """
+        blocks = {}
+
+        def add_block(block_key, depth):
+            child_type = ('chapter', 'sequential', 'vertical', 'problem', None)[depth]
+            children = []
+            if child_type is not None:
+                for index in range(self.FANOUT):
+                    child_key = BlockKey(child_type, f'{block_key.id}_{index}')
+                    add_block(child_key, depth + 1)
+                    children.append(child_key)
+            blocks[block_key] = BlockData(block_type=block_key.type, fields={'children': children})
+
+        root = BlockKey('course', 'course')
+        add_block(root, 0)
+        return {'_id': ObjectId(), 'root': root, 'blocks': blocks}
+
+    def test_parents(self):
+        assert len(self.structure['blocks']) > 10000
+        for block_key in random.sample(list(self.structure['blocks']), 50):
+            # pylint: disable=protected-access
+            assert self.store._get_parents_from_structure(block_key, self.structure) == \
+                self.store._find_parents_in_structure(block_key, self.structure)
+
+    def test_index_built_once_per_structure_version(self):
+        with patch.object(
+            self.store, 'build_block_key_to_parents_mapping', wraps=self.store.build_block_key_to_parents_mapping,
+        ) as mock_build_mapping:
+            assert all(
+                self.store.has_path_to_root(block_key, self.course)
+                for block_key in self.structure['blocks']
+            )
+        assert mock_build_mapping.call_count == 1
+
+    def test_index_discarded_on_update_structure(self):
+        problem = BlockKey('problem', 'course_0_0_0_0')
+        moved_problem = BlockKey('problem', 'course_1_0_0_0')
+        old_parent = BlockKey('vertical', 'course_1_0_0')
+        new_parent = BlockKey('vertical', 'course_0_0_0')
+        get_parents = self.store._get_parents_from_structure  # pylint: disable=protected-access
+        assert get_parents(moved_problem, self.structure) == [old_parent]
+
+        self.structure['blocks'][old_parent].fields['children'].remove(moved_problem)
+        self.structure['blocks'][new_parent].fields['children'].append(moved_problem)
+        with patch.object(self.store.db_connection, 'insert_structure'):
+            self.store.update_structure(CourseLocator('org', 'course', 'run'), self.structure)
+
+        assert get_parents(moved_problem, self.structure) == [new_parent]
+        assert get_parents(problem, self.structure) == [new_parent]
+
+
 class TestSchema(SplitModuleTest):
     """
     Test the db schema (and possibly eventually migrations?)
@@ -1,14 +1,32 @@
 """ Test the behavior of split_mongo/MongoConnection """
 
 
+import datetime
+import pickle
 import unittest
+import zlib
 from unittest.mock import patch
 
+import ddt
 import pytest
+from bson.objectid import ObjectId
+from django.core.cache.backends.locmem import LocMemCache
+from django.test.utils import override_settings
 from pymongo.errors import ConnectionFailure
+from pytz import UTC
 
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    CourseStructureCache,
+    CourseStructureCodec,
+    TIMER,
+    MongoConnection,
+    SharedStructureCache,
+    active_profiles,
+    profile_queries
+)
 
 
 class TestHeartbeatFailureException(unittest.TestCase):
@@ -24,3 +42,188 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with pytest.raises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+def make_structure():
+    """
+    Return a structure of a course with a single chapter, as returned by structure_from_mongo.
+    """
+    # BSON only keeps the milliseconds of datetimes, like mongo
+    edited_on = datetime.datetime(2021, 1, 1, 12, 30, 15, 123000, tzinfo=UTC)
+    edit_info = {'edited_on': edited_on, 'edited_by': 'staff', 'update_version': ObjectId()}
+    root = BlockKey('course', 'course')
+    chapter = BlockKey('chapter', 'chapter')
+    return {
+        '_id': ObjectId(),
+        'root': root,
+        'blocks': {
+            root: BlockData(
+                block_type='course', definition=ObjectId(), edit_info=edit_info,
+                fields={'children': [chapter], 'display_name': 'Course'},
+            ),
+            chapter: BlockData(block_type='chapter', definition=ObjectId(), edit_info=edit_info, fields={}),
+        },
+        'edited_on': edited_on,
+        'edited_by': 'staff',
+        'schema_version': 1,
+    }
+
+
+@ddt.ddt
+class TestCourseStructureCodec(unittest.TestCase):
+    """ Test the codecs of the CourseStructureCache """
+
+    @ddt.data(*[
+        (serializer, compressor)
+        for serializer in CourseStructureCodec.SERIALIZERS
+        for compressor, functions in CourseStructureCodec.COMPRESSORS.items()
+        if functions is not None
+    ])
+    @ddt.unpack
+    def test_round_trip(self, serializer, compressor):
+        structure = make_structure()
+        data = CourseStructureCodec(serializer, compressor).encode(structure)
+        assert CourseStructureCodec.decode(data) == (structure, (serializer, compressor))
+
+    def test_legacy_format(self):
+        # The legacy codec is stored without an envelope, so that previous releases can read it
+        structure = make_structure()
+        data = CourseStructureCodec('pickle4', 'zlib').encode(structure)
+        assert data == zlib.compress(pickle.dumps(structure, 4), 1)
+        assert CourseStructureCodec.decode(data) == (structure, ('pickle4', 'zlib'))
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            CourseStructureCodec('garbage', 'zlib')
+        with pytest.raises(ValueError):
+            CourseStructureCodec.decode(CourseStructureCodec.ENVELOPE_MAGIC + bytes([1, 99, 1]) + b'garbage')
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_migrate_on_read(self, mock_get_cache):
+        mock_get_cache.return_value = LocMemCache('course_structure_cache', {})
+        structure = make_structure()
+        CourseStructureCache(CourseStructureCodec('pickle4', 'zlib')).set('key', structure)
+
+        cache = CourseStructureCache(CourseStructureCodec('bson', 'none'))
+        assert cache.get('key') == structure
+        assert CourseStructureCodec.decode(cache.cache.get('key')) == (structure, ('bson', 'none'))
+
+
+class TestSharedStructureCache(unittest.TestCase):
+    """
+    Tests the process-wide LRU cache of course structures.
+    """
+    def setUp(self):
+        super().setUp()
+        self.cache = SharedStructureCache()
+        self.structure = make_structure()
+        self.structure_size = len(pickle.dumps(self.structure, pickle.HIGHEST_PROTOCOL))
+
+    def test_hit_and_miss(self):
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=10 * self.structure_size):
+            assert self.cache.get('a') is None
+            self.cache.set('a', self.structure)
+            assert self.cache.get('a') is self.structure
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+        assert (len(self.cache), self.cache.size) == (1, self.structure_size)
+
+    def test_evicts_least_recently_used(self):
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=2 * self.structure_size):
+            self.cache.set('a', self.structure)
+            self.cache.set('b', self.structure)
+            self.cache.get('a')
+            self.cache.set('c', self.structure)
+            assert self.cache.get('b') is None
+            assert self.cache.get('a') is self.structure
+            assert self.cache.get('c') is self.structure
+        assert self.cache.evictions == 1
+        assert self.cache.size == 2 * self.structure_size
+
+    def test_too_large(self):
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=self.structure_size - 1):
+            self.cache.set('a', self.structure)
+            assert self.cache.get('a') is None
+        assert self.cache.size == 0
+
+    def test_disabled(self):
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=0):
+            self.cache.set('a', self.structure)
+            assert self.cache.get('a') is None
+        assert len(self.cache) == 0
+
+    def test_clear(self):
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=10 * self.structure_size):
+            self.cache.set('a', self.structure)
+            self.cache.clear()
+            assert self.cache.get('a') is None
+        assert self.cache.size == 0
+
+    def test_indexes(self):
+        index = {'a': 1}
+        index_size = len(pickle.dumps(index, pickle.HIGHEST_PROTOCOL))
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=10 * self.structure_size):
+            self.cache.set_index('a', self.structure, 'index', index)
+            assert self.cache.get_index('a', 'index') is None
+            self.cache.set('a', self.structure)
+            self.cache.set_index('a', make_structure(), 'index', index)
+            assert self.cache.get_index('a', 'index') is None
+            self.cache.set_index('a', self.structure, 'index', index)
+            assert self.cache.get_index('a', 'index') is index
+        assert self.cache.size == self.structure_size + index_size
+
+    def test_evicts_indexes_with_structure(self):
+        index = {'a': 1}
+        with override_settings(COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES=2 * self.structure_size):
+            self.cache.set('a', self.structure)
+            self.cache.set('b', self.structure)
+            self.cache.set_index('a', self.structure, 'index', index)
+            assert self.cache.get('a') is None
+            assert self.cache.get_index('a', 'index') is None
+        assert self.cache.evictions == 1
+        assert self.cache.size == self.structure_size
+
+
+class TestQueryProfile(unittest.TestCase):
+    """
+    Tests the profiles of the split modulestore operations timed by the QueryTimer.
+    """
+    def test_query_counts(self):
+        with profile_queries() as profile:
+            with TIMER.timer('get_structure.find_one', 'course'):
+                pass
+            with TIMER.timer('get_definitions', 'course'):
+                pass
+            with TIMER.timer('get_definition', 'course'):
+                pass
+            with TIMER.timer('structure_from_mongo', 'course'):
+                pass
+        assert profile.query_counts() == {'structure': 1, 'definition': 2, 'course_index': 0}
+        assert profile.query_count() == 3
+        assert profile.query_duration() >= 0
+        assert not active_profiles()
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_cache_tiers(self, mock_get_cache):
+        mock_get_cache.return_value = LocMemCache('course_structure_cache', {})
+        cache = CourseStructureCache(CourseStructureCodec('pickle4', 'zlib'))
+        structure = make_structure()
+        cache.set('key', structure)
+
+        with profile_queries() as profile:
+            cache.get('key')
+            cache.get('missing')
+        assert profile.cache_hits('course_structure_cache') == 1
+        assert profile.cache_misses('course_structure_cache') == 1
+        assert profile.bytes_decoded == len(pickle.dumps(structure, 4))
+        assert profile.summary()['course_structure_cache_hits'] == 1
+        assert f'bytes_decoded={profile.bytes_decoded}' in str(profile)
+
+    def test_nested(self):
+        with profile_queries() as outer:
+            with TIMER.timer('get_course_index', 'course'):
+                pass
+            with profile_queries() as inner:
+                with TIMER.timer('get_course_index', 'course'):
+                    pass
+        assert outer.query_count('course_index') == 2
+        assert inner.query_count('course_index') == 1
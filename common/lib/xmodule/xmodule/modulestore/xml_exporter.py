@@ -3,13 +3,21 @@ Methods for exporting course data to XML
 """
 
 
+import io
 import logging
-import os
+import tarfile
+import time
 from abc import abstractmethod
 from json import dumps
+from tempfile import SpooledTemporaryFile
 
 import lxml.etree
+from fs import errors
+from fs.base import FS
+from fs.info import Info
+from fs.mode import Mode
 from fs.osfs import OSFS
+from fs.path import abspath, basename, dirname, normpath
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 
@@ -26,6 +34,155 @@ PUBLISHED_DIR = "published"
 
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
+# Files written to a TarExportFS are kept in memory up to this size, and spooled to a temporary file beyond it.
+TAR_EXPORT_SPOOL_MAX_SIZE = 1024 * 1024
+
+
+class TarExportFS(FS):
+    """
+    A write-only pyfilesystem FS which adds the directories and files written to it as members of an
+    open tar archive, so that an export can be streamed into a (compressed) tarball without first
+    writing the whole OLX tree to disk.
+
+    Each file becomes a member of the archive when it is closed; until then its data is held in
+    memory, up to TAR_EXPORT_SPOOL_MAX_SIZE bytes, so the memory used by an export is bounded by
+    that size rather than by the size of the exported files. Writing a file again adds another
+    member with the same name, which replaces the previous one when the archive is extracted.
+    """
+    _meta = {
+        'case_insensitive': False,
+        'invalid_path_chars': '\0',
+        'network': False,
+        'read_only': False,
+        'thread_safe': True,
+        'unicode_paths': True,
+        'virtual': False,
+    }
+
+    def __init__(self, tar_file):
+        """
+        `tar_file`: A `tarfile.TarFile` opened for writing, e.g. with mode 'w:gz'
+        """
+        super().__init__()
+        self.tar_file = tar_file
+        self._dirs = {'/'}
+        self._files = set()
+
+    def __repr__(self):
+        return f'TarExportFS({self.tar_file.name!r})'
+
+    def _add_member(self, path, tar_type, size=0, fileobj=None):
+        """
+        Add a member of the given type for the given absolute path to the archive.
+        """
+        tar_info = tarfile.TarInfo(path.lstrip('/'))
+        tar_info.type = tar_type
+        tar_info.mode = 0o755 if tar_type == tarfile.DIRTYPE else 0o644
+        tar_info.mtime = time.time()
+        tar_info.size = size
+        self.tar_file.addfile(tar_info, fileobj)
+
+    def _add_file(self, path, spool):
+        """
+        Add the data written to the given spooled file as a member for the given absolute path.
+        """
+        with self._lock:
+            size = spool.tell()
+            spool.seek(0)
+            self._add_member(path, tarfile.REGTYPE, size, spool)
+            self._files.add(path)
+
+    def getinfo(self, path, namespaces=None):
+        self.check()
+        _path = abspath(normpath(path))
+        with self._lock:
+            if _path in self._dirs:
+                is_dir = True
+            elif _path in self._files:
+                is_dir = False
+            else:
+                raise errors.ResourceNotFound(path)
+        return Info({'basic': {'name': basename(_path), 'is_dir': is_dir}})
+
+    def listdir(self, path):
+        self.check()
+        _path = abspath(normpath(path))
+        with self._lock:
+            if _path not in self._dirs:
+                if _path in self._files:
+                    raise errors.DirectoryExpected(path)
+                raise errors.ResourceNotFound(path)
+            return sorted(
+                basename(child) for child in self._dirs | self._files
+                if child != '/' and dirname(child) == _path
+            )
+
+    def makedir(self, path, permissions=None, recreate=False):
+        self.check()
+        _path = abspath(normpath(path))
+        with self._lock:
+            if _path in self._dirs:
+                if not recreate:
+                    raise errors.DirectoryExists(path)
+            elif _path in self._files:
+                raise errors.DirectoryExists(path)
+            elif dirname(_path) not in self._dirs:
+                raise errors.ResourceNotFound(path)
+            else:
+                self._add_member(_path, tarfile.DIRTYPE)
+                self._dirs.add(_path)
+            return self.opendir(_path)
+
+    def openbin(self, path, mode='r', buffering=-1, **options):
+        self.check()
+        _mode = Mode(mode)
+        _mode.validate_bin()
+        if _mode.reading or _mode.appending:
+            raise errors.Unsupported(path, msg='TarExportFS only supports writing new files')
+        _path = abspath(normpath(path))
+        with self._lock:
+            if _path in self._dirs:
+                raise errors.FileExpected(path)
+            if dirname(_path) not in self._dirs:
+                raise errors.ResourceNotFound(path)
+            if _mode.exclusive and _path in self._files:
+                raise errors.FileExists(path)
+        return _TarMemberFile(self, _path)
+
+    def remove(self, path):
+        raise errors.Unsupported(path, msg='TarExportFS does not support removing files')
+
+    def removedir(self, path):
+        raise errors.Unsupported(path, msg='TarExportFS does not support removing directories')
+
+    def setinfo(self, path, info):
+        self.getinfo(path)
+
+
+class _TarMemberFile(io.RawIOBase):
+    """
+    A binary file opened for writing on a TarExportFS, which is added to the archive when closed.
+    """
+    def __init__(self, tar_fs, path):
+        super().__init__()
+        self.name = path
+        self._tar_fs = tar_fs
+        self._spool = SpooledTemporaryFile(max_size=TAR_EXPORT_SPOOL_MAX_SIZE)
+
+    def writable(self):
+        return True
+
+    def write(self, data):  # pylint: disable=arguments-differ
+        return self._spool.write(data)
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._tar_fs._add_file(self.name, self._spool)  # pylint: disable=protected-access
+            finally:
+                self._spool.close()
+                super().close()
+
 
 def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
     """
@@ -37,7 +194,8 @@ def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
         draft_modules = modulestore.get_items(
             course_key,
             qualifiers={'category': {'$nin': DIRECT_ONLY_CATEGORIES}},
-            revision=ModuleStoreEnum.RevisionOption.draft_only
+            revision=ModuleStoreEnum.RevisionOption.draft_only,
+            prefetch_definitions=True,
         )
         # Check to see if the returned draft modules have changes w.r.t. the published module.
         # Only modules with changes will be exported into the /drafts directory.
@@ -112,7 +270,8 @@ class ExportManager:
         `modulestore`: A `ModuleStore` object that is the source of the modules to export
         `contentstore`: A `ContentStore` object that is the source of the content to export, can be None
         `courselike_key`: The Locator of the Descriptor to export
-        `root_dir`: The directory to write the exported xml to
+        `root_dir`: The directory to write the exported xml to, or a pyfilesystem `FS` (such as a
+            `TarExportFS`) to write it into
         `target_dir`: The name of the directory inside `root_dir` to write the content to
         """
         self.modulestore = modulestore
@@ -133,7 +292,7 @@ class ExportManager:
         Perform any additional tasks to the root XML node.
         """
 
-    def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
+    def process_extra(self, root, courselike, xml_centric_courselike_key, export_fs):
         """
         Process additional content, like static assets.
         """
@@ -155,7 +314,7 @@ class ExportManager:
         """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
+            fsm = self.root_dir if isinstance(self.root_dir, FS) else OSFS(self.root_dir)
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -173,8 +332,7 @@ class ExportManager:
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
-            self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
+            self.process_extra(root, courselike, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
             self.post_process(root, export_fs)
@@ -201,27 +359,23 @@ class CourseExportManager(ExportManager):
         with export_fs.open('course.xml', 'wb') as course_xml:
             lxml.etree.ElementTree(root).write(course_xml, encoding='utf-8')
 
-    def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
+    def process_extra(self, root, courselike, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makedir(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
+            self.contentstore.export_all_for_course_to_fs(
+                self.courselike_key, export_fs, 'static', 'policies/assets.json',
             )
 
             # If we are using the default course image, export it to the
@@ -233,15 +387,18 @@ class CourseExportManager(ExportManager):
                             courselike.id,
                             courselike.course_image
                         ),
+                        as_stream=True,
                     )
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
-                        course_image_file.write(course_image.data)
+                    try:
+                        images_dir = export_fs.makedirs('static/images', recreate=True)
+                        with images_dir.open('course_image.jpg', 'wb') as course_image_file:
+                            for chunk in course_image.stream_data():
+                                course_image_file.write(chunk)
+                    finally:
+                        course_image.close()
 
         # export the static tabs
         export_extra_content(
@@ -308,7 +465,7 @@ class LibraryExportManager(ExportManager):
         root.set('org', self.courselike_key.org)
         root.set('library', self.courselike_key.library)
 
-    def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
+    def process_extra(self, root, courselike, xml_centric_courselike_key, export_fs):
         """
         Notionally, libraries may have assets. This is currently unsupported, but the structure is here
         to ease in duck typing during import. This may be expanded as a useful feature eventually.
@@ -317,10 +474,8 @@ class LibraryExportManager(ExportManager):
         export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
+            self.contentstore.export_all_for_course_to_fs(
+                self.courselike_key, export_fs, 'static', 'policies/assets.json',
             )
 
     def post_process(self, root, export_fs):
@@ -393,7 +548,10 @@ def _export_field_content(xblock_item, item_dir):
 
 
 def export_extra_content(export_fs, modulestore, source_course_key, dest_course_key, category_type, dirname, file_suffix=''):  # lint-amnesty, pylint: disable=line-too-long, missing-function-docstring
-    items = modulestore.get_items(source_course_key, qualifiers={'category': category_type})
+    # prefetch_definitions: Loads the definitions of all of the items with a single query once the first is exported.
+    items = modulestore.get_items(
+        source_course_key, qualifiers={'category': category_type}, prefetch_definitions=True
+    )
 
     if len(items) > 0:
         item_dir = export_fs.makedir(dirname, recreate=True)
@@ -28,6 +28,8 @@ import mimetypes
 import os
 import re
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 
 import xblock
 from django.utils.translation import ugettext as _
@@ -83,11 +85,19 @@ class LocationMixin(XBlockMixin):
         )
 
 
-class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docstring
-    def __init__(self, static_content_store, course_data_path, target_id):
+class StaticContentImporter:
+    """
+    Imports the static files of a course into the contentstore.
+
+    If an executor is given, the files are imported concurrently by its threads, and
+    wait_for_pending_imports must be called to wait for them to be imported.
+    """
+    def __init__(self, static_content_store, course_data_path, target_id, executor=None):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.executor = executor
+        self._pending_imports = []
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -117,6 +127,12 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
                 if verbose:
                     log.debug('importing static content %s...', file_path)
 
+                if self.executor is not None:
+                    self._pending_imports.append(
+                        self.executor.submit(self.import_static_file, file_path, base_dir=static_dir)
+                    )
+                    continue
+
                 imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
 
                 if imported_file_attrs:
@@ -179,6 +195,29 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
 
         return file_subpath, asset_key
 
+    def wait_for_pending_imports(self):
+        """
+        Wait for the static files submitted to the executor to be imported, logging the progress.
+
+        Returns the remapping of the paths of the imported files to their asset keys.
+        """
+        remap_dict = {}
+        pending_imports, self._pending_imports = self._pending_imports, []
+        total = len(pending_imports)
+        progress_interval = max(total // 10, 1)
+        try:
+            for done, future in enumerate(as_completed(pending_imports), start=1):
+                imported_file_attrs = future.result()
+                if imported_file_attrs:
+                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+                if done % progress_interval == 0 or done == total:
+                    log.info(f'Course import {self.target_id}: Imported {done} of {total} static files')
+        finally:
+            # Don't import the remaining files if one of them failed
+            for future in pending_imports:
+                future.cancel()
+        return remap_dict
+
 
 class ImportManager:
     """
@@ -222,6 +261,10 @@ class ImportManager:
             create this file to implement custom logic in their course.
 
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
+
+        static_import_workers: The number of threads importing the static files into static_content_store
+            while the blocks are imported into the modulestore. If 1, the static files are imported
+            before the blocks, in the importing thread.
     """
     store_class = XMLModuleStore
 
@@ -234,7 +277,8 @@ class ImportManager:
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
-            status=None
+            status=None,
+            static_import_workers=1,
     ):
         self.store = store
         self.user_id = user_id
@@ -260,6 +304,7 @@ class ImportManager:
             target_course_id=target_id,
         )
         self.status = status
+        self.static_import_workers = static_import_workers
         self.logger, self.errors = make_error_tracker()
 
     def preflight(self):
@@ -271,20 +316,42 @@ class ImportManager:
         if self.target_id:
             assert len(self.xml_module_store.modules) == 1, 'Store unable to load course correctly.'
 
-    def import_static(self, data_path, dest_id):
+    @contextmanager
+    def static_import_executor(self):
+        """
+        Context manager providing the executor importing the static files concurrently,
+        or None if they're imported by the importing thread.
+        """
+        if self.static_content_store is None or self.static_import_workers <= 1:
+            yield None
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.static_import_workers, thread_name_prefix='course_import_static'
+        )
+        try:
+            yield executor
+        finally:
+            executor.shutdown(wait=True)
+
+    def import_static(self, data_path, dest_id, executor=None):
         """
         Import all static items into the content store.
+
+        If an executor is given, the items are imported concurrently by it; the returned
+        StaticContentImporter must then be used to wait for them to be imported.
         """
         if self.static_content_store is None:
             log.warning(
                 f'Course import {self.target_id}: Static content store is None. Skipping static content import.'
             )
-            return
+            return None
 
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            executor=executor,
         )
         if self.do_import_static:
             if self.verbose:
@@ -325,6 +392,8 @@ class ImportManager:
                 content_subdir=simport, verbose=self.verbose
             )
 
+        return static_content_importer
+
     def import_asset_metadata(self, data_dir, course_id):
         """
         Read in assets XML file, parse it, and add all asset metadata to the modulestore.
@@ -533,12 +602,12 @@ class ImportManager:
                 continue
 
             # This bulk operation wraps all the operations to populate the published branch.
-            with self.store.bulk_operations(dest_id):
+            with self.store.bulk_operations(dest_id), self.static_import_executor() as executor:
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                # Import all static pieces, concurrently with the blocks if there's an executor.
+                static_content_importer = self.import_static(data_path, dest_id, executor)
 
                 # Import asset metadata stored in XML.
                 self.import_asset_metadata(data_path, dest_id)
@@ -546,6 +615,9 @@ class ImportManager:
                 # Import all children
                 self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
+                if static_content_importer is not None:
+                    static_content_importer.wait_for_pending_imports()
+
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
@@ -4,13 +4,19 @@ get_course_blocks function.
 """
 
 
+from collections import OrderedDict
+
 from django.conf import settings
 from edx_when import field_data
+from edx_when.api import get_dates_for_course
 
+from common.djangoapps.student.roles import CourseBetaTesterRole
 from lms.djangoapps.course_api.blocks.transformers.block_completion import BlockCompletionTransformer
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.features.content_type_gating.block_transformers import ContentTypeGateTransformer
+from openedx.features.content_type_gating.models import ContentTypeGatingConfig
+from xmodule.partitions.partitions_service import get_user_partition_groups
 
 from .transformers import library_content, load_override_data, start_date, user_partitions, visibility
 from .usage_info import CourseUsageInfo
@@ -19,6 +25,10 @@ INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER = (
     'lms.djangoapps.courseware.student_field_overrides.IndividualStudentOverrideProvider'
 )
 
+# Maximum number of transformed block structures kept by
+# BulkCourseBlocks for reuse by users of the same equivalence class.
+MAX_CACHED_EQUIVALENCE_CLASSES = 32
+
 
 def has_individual_student_override_provider():
     """
@@ -109,3 +119,126 @@ def get_course_blocks(
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def get_course_blocks_for_users(
+        users,
+        starting_block_usage_key,
+        collected_block_structure=None,
+        allow_start_dates_in_future=False,
+        include_has_scheduled_content=False,
+):
+    """
+    A bulk version of get_course_blocks for the default course block
+    access transformers, lazily yielding a (user, block_structure) tuple
+    for each of the given users.
+
+    See BulkCourseBlocks for the arguments.
+
+    Yields:
+        (User, BlockStructureBlockData) - Each user with the transformed
+            block structure that get_course_blocks would return for them.
+    """
+    bulk_course_blocks = BulkCourseBlocks(
+        starting_block_usage_key,
+        collected_block_structure,
+        allow_start_dates_in_future=allow_start_dates_in_future,
+        include_has_scheduled_content=include_has_scheduled_content,
+    )
+    for user in users:
+        yield user, bulk_course_blocks.get(user)
+
+
+class BulkCourseBlocks:
+    """
+    Transforms the blocks of a course for many users with the default
+    course block access transformers.
+
+    Users whose inputs to the transformers are the same (staff access,
+    user partition groups, content type gating, beta testing and
+    personalized dates) are grouped in equivalence classes, and the
+    block structure is transformed only once for each class. Computing
+    these inputs queries the roles, cohorts and enrollments of the user,
+    which callers handling many users should prefetch (see BulkRoleCache,
+    bulk_cache_cohorts and CourseEnrollment.bulk_fetch_enrollment_states).
+    """
+
+    def __init__(
+            self,
+            starting_block_usage_key,
+            collected_block_structure=None,
+            allow_start_dates_in_future=False,
+            include_has_scheduled_content=False,
+    ):
+        """
+        Arguments:
+            starting_block_usage_key (UsageKey) - Specifies the starting block
+                of the block structure that is to be transformed.
+
+            collected_block_structure (BlockStructureBlockData) - A
+                block structure retrieved from a prior call to
+                BlockStructureManager.get_collected.  If not provided, it is
+                retrieved once for all users.
+        """
+        self.starting_block_usage_key = starting_block_usage_key
+        self.course_key = starting_block_usage_key.course_key
+        if collected_block_structure is None:
+            collected_block_structure = get_block_structure_manager(self.course_key).get_collected()
+        self.collected_block_structure = collected_block_structure
+        self.allow_start_dates_in_future = allow_start_dates_in_future
+        self.include_has_scheduled_content = include_has_scheduled_content
+
+        # Library content selections and individual student overrides are
+        # specific to each user, so no users are equivalent.
+        self._group_users = not has_individual_student_override_provider() and not any(
+            block_key.block_type == 'library_content' for block_key in collected_block_structure
+        )
+        self._partitions = collected_block_structure.get_transformer_data(
+            user_partitions.UserPartitionTransformer, 'user_partitions'
+        ) or []
+        # Map of equivalence signature to the transformed block structure,
+        # which is never handed out, only copied.
+        # OrderedDict {tuple: BlockStructureBlockData}
+        self._transformed_block_structures = OrderedDict()
+
+    def get(self, user):
+        """
+        Returns the transformed block structure that get_course_blocks
+        would return for the given user, as a separate copy that the
+        caller is free to modify.
+        """
+        signature = _get_equivalence_signature(user, self.course_key, self._partitions) if self._group_users else None
+        block_structure = self._transformed_block_structures.get(signature) if signature else None
+        if block_structure is None:
+            block_structure = get_course_blocks(
+                user,
+                self.starting_block_usage_key,
+                collected_block_structure=self.collected_block_structure,
+                allow_start_dates_in_future=self.allow_start_dates_in_future,
+                include_has_scheduled_content=self.include_has_scheduled_content,
+            )
+            if not signature:
+                return block_structure
+            self._transformed_block_structures[signature] = block_structure
+            if len(self._transformed_block_structures) > MAX_CACHED_EQUIVALENCE_CLASSES:
+                self._transformed_block_structures.popitem(last=False)
+        else:
+            self._transformed_block_structures.move_to_end(signature)
+        return block_structure.copy()
+
+
+def _get_equivalence_signature(user, course_key, partitions):
+    """
+    Returns a hashable value of the inputs of the default course block
+    access transformers for the given user, other than the user itself.
+    """
+    partition_groups = get_user_partition_groups(course_key, partitions, user, 'id')
+    return (
+        CourseUsageInfo(course_key, user).has_staff_access,
+        tuple(sorted(
+            (partition_id, group.id if group else None) for partition_id, group in partition_groups.items()
+        )),
+        ContentTypeGatingConfig.enabled_for_enrollment(user=user, course_key=course_key),
+        CourseBetaTesterRole(course_key).has_user(user),
+        frozenset(get_dates_for_course(course_key, user).items()),
+    )
@@ -0,0 +1,60 @@
+"""
+Tests for course_blocks/api.py
+"""
+
+
+from unittest.mock import patch
+
+from common.djangoapps.student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from .. import api
+from ..api import get_course_blocks, get_course_blocks_for_users
+
+
+class GetCourseBlocksForUsersTestCase(ModuleStoreTestCase):
+    """
+    Tests for get_course_blocks_for_users and BulkCourseBlocks.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(parent=self.course, category='chapter')
+        self.staff_only_chapter = ItemFactory.create(
+            parent=self.course, category='chapter', visible_to_staff_only=True,
+        )
+        self.students = [UserFactory.create() for _ in range(3)]
+        for student in self.students:
+            CourseEnrollmentFactory.create(user=student, course_id=self.course.id)
+        self.staff = UserFactory.create(is_staff=True)
+
+    def test_same_as_get_course_blocks(self):
+        users = self.students + [self.staff]
+        for user, block_structure in get_course_blocks_for_users(users, self.course.location):
+            expected = get_course_blocks(user, self.course.location)
+            assert set(block_structure) == set(expected)
+            assert (self.staff_only_chapter.location in block_structure) == (user == self.staff)
+
+    def test_transformed_once_per_equivalence_class(self):
+        users = self.students + [self.staff]
+        with patch.object(api, 'get_course_blocks', wraps=api.get_course_blocks) as mock_get_course_blocks:
+            results = list(get_course_blocks_for_users(users, self.course.location))
+
+        assert [user for user, _ in results] == users
+        assert mock_get_course_blocks.call_count == 2
+
+    def test_separate_copies(self):
+        (_, block_structure), (_, other_block_structure) = get_course_blocks_for_users(
+            self.students[:2], self.course.location,
+        )
+        assert block_structure is not other_block_structure
+        block_structure.remove_block(self.chapter.location, keep_descendants=False)
+        assert self.chapter.location in other_block_structure
+
+    def test_individual_student_overrides(self):
+        with patch.object(api, 'has_individual_student_override_provider', return_value=True):
+            with patch.object(api, 'get_course_blocks', wraps=api.get_course_blocks) as mock_get_course_blocks:
+                list(get_course_blocks_for_users(self.students, self.course.location))
+        assert mock_get_course_blocks.call_count == len(self.students)
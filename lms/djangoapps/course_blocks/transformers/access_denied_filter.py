@@ -4,16 +4,21 @@ Access Denied Message Filter Transformer implementation.
 # TODO: Remove this file after REVE-52 lands and old-mobile-app traffic falls to < 5% of mobile traffic
 
 
-from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+from openedx.core.djangoapps.content.block_structure.transformer import (
+    BlockStructureTransformer,
+    FilteringTransformerMixin
+)
 
 
-class AccessDeniedMessageFilterTransformer(BlockStructureTransformer):
+class AccessDeniedMessageFilterTransformer(FilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that removes any block from the course that has an
     authorization_denial_reason or an authorization_denial_message.
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT = True
+    APPLY_IN_ORDER = True
 
     @classmethod
     def name(cls):
@@ -31,10 +36,10 @@ class AccessDeniedMessageFilterTransformer(BlockStructureTransformer):
         """
         block_structure.request_xblock_fields('authorization_denial_reason', 'authorization_denial_message')
 
-    def transform(self, usage_info, block_structure):
+    def transform_block_filters(self, usage_info, block_structure):
         def _filter(block_key):
             reason = block_structure.get_xblock_field(block_key, 'authorization_denial_reason')
             message = block_structure.get_xblock_field(block_key, 'authorization_denial_message')
             return reason and message
 
-        block_structure.remove_block_traversal(_filter)
+        return [block_structure.create_removal_filter(_filter)]
@@ -7,7 +7,10 @@ from datetime import datetime
 
 from pytz import utc
 
-from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+from openedx.core.djangoapps.content.block_structure.transformer import (
+    BlockStructureTransformer,
+    FilteringTransformerMixin
+)
 from xmodule.seq_module import SequenceBlock
 
 from .utils import collect_merged_boolean_field
@@ -15,7 +18,7 @@ from .utils import collect_merged_boolean_field
 MAXIMUM_DATE = utc.localize(datetime.max)
 
 
-class HiddenContentTransformer(BlockStructureTransformer):
+class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransformer):
     """
     A transformer that enforces the hide_after_due field on
     blocks by removing children blocks from the block structure for
@@ -33,6 +36,8 @@ class HiddenContentTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 3
     READ_VERSION = 3
+    INCREMENTAL_COLLECT = True
+    APPLY_IN_ORDER = True
     MERGED_HIDE_AFTER_DUE = 'merged_hide_after_due'
 
     @classmethod
@@ -69,22 +74,29 @@ class HiddenContentTransformer(BlockStructureTransformer):
 
         block_structure.request_xblock_fields('self_paced', 'end', 'due')
 
-    def transform(self, usage_info, block_structure):
+    def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
             return [block_structure.create_universal_filter()]
 
-        block_structure.remove_block_traversal(lambda block_key: self._is_block_hidden(block_structure, block_key))
+        root_block = block_structure[block_structure.root_block_usage_key]
+        self_paced = root_block.self_paced
+        course_end = root_block.end if self_paced else None
+        return [
+            block_structure.create_removal_filter(
+                lambda block_key: self._is_block_hidden(block_structure, block_key, self_paced, course_end),
+            )
+        ]
 
-    def _is_block_hidden(self, block_structure, block_key):
+    def _is_block_hidden(self, block_structure, block_key, self_paced, course_end):
         """
         Returns whether the block with the given block_key should
-        be hidden, given the current time.
+        be hidden, given the current time and the pacing and end date
+        of the course.
         """
         hide_after_due = self._get_merged_hide_after_due(block_structure, block_key)
-        self_paced = block_structure[block_structure.root_block_usage_key].self_paced
         if self_paced:
-            hidden_date = block_structure[block_structure.root_block_usage_key].end
+            hidden_date = course_end
         else:
             # Important Note:
             # A small subtlety of grabbing the due date here is that this transformer relies on the
@@ -72,9 +72,12 @@ def collect_merged_boolean_field(
     the value is ANDed across all parents for blocks with
     multiple parents and ORed across all ancestors down a single
     hierarchy chain.
+
+    Only blocks with instantiated xBlocks are collected, so this
+    supports incremental collection.
     """
 
-    for block_key in block_structure.topological_traversal():
+    for block_key in block_structure.xblock_topological_traversal():
         # compute merged value of the boolean field from all parents
         parents = block_structure.get_parents(block_key)
         all_parents_merged_value = all(
@@ -114,9 +117,12 @@ def collect_merged_date_field(
     value is percolated down the hierarchy of the block_structure
     and stored as a value of merged_field_name in the
     block_structure.
+
+    Only blocks with instantiated xBlocks are collected, so this
+    supports incremental collection.
     """
 
-    for block_key in block_structure.topological_traversal():
+    for block_key in block_structure.xblock_topological_traversal():
 
         parents = block_structure.get_parents(block_key)
         block_date = get_field_on_block(block_structure.get_xblock(block_key), xblock_field_name)
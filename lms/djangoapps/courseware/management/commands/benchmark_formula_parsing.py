@@ -0,0 +1,93 @@
+"""
+Command to compare the time taken to evaluate and preview the math expressions of the
+formularesponse problems of a course with calc, which parses the expression on every call, and
+with capa's cache of parsed formulas.
+"""
+
+
+from time import perf_counter
+
+from calc import evaluator as calc_evaluator
+from calc.preview import latex_preview as calc_latex_preview
+from django.core.management.base import BaseCommand
+from lxml import etree
+
+from capa.formula import PARSED_FORMULAS, evaluator, latex_preview
+from openedx.core.lib.command_utils import parse_course_keys
+from xmodule.modulestore.django import modulestore
+
+# To run from command line: ./manage.py lms benchmark_formula_parsing course-v1:org+course+run
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_formula_parsing 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    help = (
+        'Evaluates and previews the correct answer of every formularesponse of the given courses the given '
+        'number of times, with calc and with the cache of parsed formulas, and reports the number of calls '
+        'per second and the hit rate of the cache. Answers depending on the problem script are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Course keys of the courses whose problems are used.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each answer is evaluated and previewed.',
+            default=100,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            answers = [
+                (response.get('answer'), response.get('samples').split('@')[0].split(','), response.get('type') == 'cs')
+                for problem in modulestore().get_items(course_key, qualifiers={'category': 'problem'})
+                for response in etree.fromstring(problem.data).iter('formularesponse')
+                if '$' not in response.get('answer', '$') + response.get('samples', '$')
+            ]
+            PARSED_FORMULAS.clear()
+            for mode, evaluate, preview in (
+                ('calc', calc_evaluator, calc_latex_preview),
+                ('cached', evaluator, latex_preview),
+            ):
+                for operation in ('evaluator', 'latex_preview'):
+                    start = perf_counter()
+                    for _ in range(options['iterations']):
+                        for answer, variables, case_sensitive in answers:
+                            if operation == 'evaluator':
+                                values = dict.fromkeys(variables, 1.5)
+                                self._ignore_errors(evaluate, values, {}, answer, case_sensitive=case_sensitive)
+                            else:
+                                self._ignore_errors(preview, answer, variables, case_sensitive=case_sensitive)
+                    elapsed = perf_counter() - start
+                    self.stdout.write(
+                        '{course_key}\tanswers={answers}\tmode={mode}\toperation={operation}\t'
+                        'calls_per_s={throughput:.1f}'.format(
+                            course_key=course_key,
+                            answers=len(answers),
+                            mode=mode,
+                            operation=operation,
+                            throughput=len(answers) * options['iterations'] / elapsed if elapsed else 0,
+                        )
+                    )
+            self.stdout.write('{course_key}\thit_rate={hit_rate:.3f}'.format(
+                course_key=course_key,
+                hit_rate=PARSED_FORMULAS.stats()['hit_rate'],
+            ))
+
+    @staticmethod
+    def _ignore_errors(func, *args, **kwargs):
+        """
+        Calls `func`, ignoring the errors of the expressions that can't be evaluated at the chosen
+        point, as both modes raise the same.
+        """
+        try:
+            func(*args, **kwargs)
+        except Exception:  # pylint: disable=broad-except
+            pass
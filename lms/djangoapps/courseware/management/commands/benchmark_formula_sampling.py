@@ -0,0 +1,101 @@
+"""
+Command to compare the time taken to check the answers to the formularesponse problems of a course
+by evaluating the expressions sample by sample with calc.evaluator, and all samples at once with
+capa's compiled formulas.
+"""
+
+
+import random
+from time import perf_counter
+
+from calc import evaluator
+from django.core.management.base import BaseCommand
+from lxml import etree
+
+from capa.formula import CompiledFormula
+from capa.util import compare_with_tolerance
+from openedx.core.lib.command_utils import parse_course_keys
+from xmodule.modulestore.django import modulestore
+
+# To run from command line: ./manage.py lms benchmark_formula_sampling course-v1:org+course+run
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_formula_sampling 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    help = (
+        'Checks the correct answer of every formularesponse of the given courses against itself, the given '
+        'number of times, evaluating the expressions at the sample points one by one with calc.evaluator and '
+        'all at once with compiled formulas, and reports the number of submissions checked per second. '
+        'Responses whose answer or samples depend on the problem script are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Course keys of the courses whose problems are checked.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each answer is checked.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            responses = [
+                (response.get('answer'), response.get('samples'), response.get('type') == 'cs')
+                for problem in modulestore().get_items(course_key, qualifiers={'category': 'problem'})
+                for response in etree.fromstring(problem.data).iter('formularesponse')
+                if '$' not in response.get('answer', '$') + response.get('samples', '$')
+            ]
+            for mode, check in (('per_sample', self._check_per_sample), ('compiled', self._check_compiled)):
+                start = perf_counter()
+                for _ in range(options['iterations']):
+                    for answer, samples, case_sensitive in responses:
+                        check(answer, self._randomize_variables(samples), case_sensitive)
+                elapsed = perf_counter() - start
+                self.stdout.write(
+                    '{course_key}\tresponses={responses}\tmode={mode}\tsubmissions_per_s={throughput:.1f}'.format(
+                        course_key=course_key,
+                        responses=len(responses),
+                        mode=mode,
+                        throughput=len(responses) * options['iterations'] / elapsed if elapsed else 0,
+                    )
+                )
+
+    @staticmethod
+    def _randomize_variables(samples):
+        """
+        Returns the sample points of a formularesponse `samples` attribute, like
+        FormulaResponse.randomize_variables.
+        """
+        variables, ranges = samples.split('@')
+        ranges, numsamples = ranges.split('#')
+        ranges = list(zip(*[list(map(float, bounds.split(','))) for bounds in ranges.split(':')]))
+        return [
+            {variable: random.uniform(*bounds) for variable, bounds in zip(variables.split(','), ranges)}
+            for _ in range(int(numsamples))
+        ]
+
+    @staticmethod
+    def _check_per_sample(answer, var_dict_list, case_sensitive):
+        """
+        Checks `answer` against itself as FormulaResponse did before compiled formulas.
+        """
+        values = [evaluator(var_dict, {}, answer, case_sensitive=case_sensitive) for var_dict in var_dict_list]
+        expected = [evaluator(var_dict, {}, answer, case_sensitive=case_sensitive) for var_dict in var_dict_list]
+        return all(compare_with_tolerance(value, other) for value, other in zip(values, expected))
+
+    @staticmethod
+    def _check_compiled(answer, var_dict_list, case_sensitive):
+        """
+        Checks `answer` against itself as FormulaResponse does.
+        """
+        values = CompiledFormula(answer, case_sensitive).evaluate_samples(var_dict_list)
+        expected = CompiledFormula(answer, case_sensitive).evaluate_samples(var_dict_list)
+        return all(compare_with_tolerance(value, other) for value, other in zip(values, expected))
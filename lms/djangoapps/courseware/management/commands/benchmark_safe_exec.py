@@ -0,0 +1,107 @@
+"""
+Command to compare the throughput of executing the jailed code of capa problems in a new sandboxed
+process for each execution and in the pool of warm workers.
+"""
+
+
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from codejail import jail_code
+from codejail.django_integration import ConfigureCodeJailMiddleware
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management.base import BaseCommand, CommandError
+
+from capa.safe_exec.pool import SafeExecPool, sandbox_command
+from capa.safe_exec.safe_exec import ASSUMED_IMPORTS, CODE_PROLOG, LAZY_IMPORTS
+
+# To run from command line: ./manage.py lms benchmark_safe_exec --threads 1 4 --workers 4
+
+# A customresponse check function typical of Python-graded problems.
+CODE = textwrap.dedent("""\
+    expected = numpy.array([random.randint(1, 9) for _ in range(10)])
+    answer = expected * (1 + 1e-9)
+    correct = bool(numpy.allclose(answer, expected, rtol=1e-6)) and abs(math.sqrt(float(answer.sum()))) > 0
+""")
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_safe_exec --executions 200 --threads 1 4 8 --workers 4 --settings=devstack
+    """
+    help = (
+        'Executes a typical customresponse script in the sandbox the given number of times from each of the '
+        'given numbers of threads, once with a new sandboxed process for each execution and once with a pool '
+        'of warm workers of the given size, and reports the number of executions per second.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--executions',
+            help='Number of executions timed for each number of threads.',
+            default=100,
+            type=int,
+        )
+        parser.add_argument(
+            '--threads',
+            help='Numbers of threads executing the script concurrently to compare.',
+            nargs='+',
+            default=[1, 4],
+            type=int,
+        )
+        parser.add_argument(
+            '--workers',
+            help='Number of workers of the pool.',
+            default=4,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        # Apply settings.CODE_JAIL like the middleware does in the LMS processes.
+        try:
+            ConfigureCodeJailMiddleware()
+        except MiddlewareNotUsed:
+            pass
+        if not jail_code.is_configured('python'):
+            raise CommandError('codejail is not configured for python.')
+
+        pool = SafeExecPool(
+            sandbox_command(),
+            options['workers'],
+            queue_timeout=60,
+            preload=[modname for _, modname in ASSUMED_IMPORTS],
+        )
+        pool.start()
+        try:
+            for threads in options['threads']:
+                for model, exec_fn in (('process', codejail_safe_exec), ('pool', pool.safe_exec)):
+                    self.stdout.write(
+                        'threads={threads}\tmodel={model}\texecutions_per_s={throughput:.1f}'.format(
+                            threads=threads,
+                            model=model,
+                            throughput=self._measure(exec_fn, threads, options['executions']),
+                        )
+                    )
+        finally:
+            pool.close()
+
+    @staticmethod
+    def _measure(exec_fn, threads, executions):
+        """
+        Returns the number of executions of the script per second with the given code executor,
+        from the given number of threads.
+        """
+        def execute(seed):
+            globals_dict = {}
+            exec_fn(CODE_PROLOG % seed + LAZY_IMPORTS + CODE, globals_dict)
+            if not globals_dict['correct']:
+                raise CommandError('The script did not run correctly.')
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(execute, range(executions)))
+        elapsed = perf_counter() - start
+        return executions / elapsed if elapsed else 0
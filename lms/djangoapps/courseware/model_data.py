@@ -15,6 +15,7 @@ pieces of information for each scope, and thus how to cache, prefetch, and creat
 entries.
 
 UserStateCache: A cache for Scope.user_state
+BulkUserStateCache: A cache for the Scope.user_state of many users at once
 UserStateSummaryCache: A cache for Scope.user_state_summary
 PreferencesCache: A cache for Scope.preferences
 UserInfoCache: A cache for Scope.user_info
@@ -26,9 +27,12 @@ import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from operator import attrgetter
 
 from contracts import contract, new_contract
+from django.contrib.auth import get_user_model
 from django.db import DatabaseError, IntegrityError, transaction
+from edx_user_state_client.interface import XBlockUserState
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import LearningContextKey
@@ -40,7 +44,13 @@ from xblock.runtime import KeyValueStore
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.django import modulestore
 
-from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
+from .models import (
+    StudentModule,
+    XModuleStudentInfoField,
+    XModuleStudentPrefsField,
+    XModuleUserStateSummaryField,
+    chunks
+)
 
 log = logging.getLogger(__name__)
 
@@ -493,6 +503,113 @@ class UserStateCache:
         return key.block_scope_id
 
 
+class BulkUserStateCache:
+    """
+    Cache for the Scope.user_state xblock field data of all users in a course.
+
+    The StudentModules of a set of blocks are loaded in a few chunked queries,
+    rather than in one paginated query per block, and are handed out per
+    block. This cache is read-only.
+    """
+    # The number of blocks whose StudentModules are loaded or counted in a single query.
+    USAGE_KEY_CHUNK_SIZE = 500
+    # The number of users whose usernames are loaded in a single query.
+    USER_CHUNK_SIZE = 100
+
+    def __init__(self, course_id):
+        """
+        Arguments:
+            course_id (:class:`~LearningContextKey`): The course whose state is cached.
+        """
+        self.course_id = course_id
+        self._usernames = {}
+        self._student_modules_by_block = defaultdict(dict)
+
+    def count_usage_keys(self, usage_keys):
+        """
+        Returns the number of StudentModules that caching the supplied
+        ``usage_keys`` would load, without loading them.
+
+        Arguments:
+            usage_keys (iterable of :class:`~UsageKey`): The blocks to count state for.
+        """
+        return sum(
+            StudentModule.objects.filter(course_id=self.course_id, module_state_key__in=usage_keys_chunk).count()
+            for usage_keys_chunk in chunks(list(usage_keys), self.USAGE_KEY_CHUNK_SIZE)
+        )
+
+    def cache_usage_keys(self, usage_keys):
+        """
+        Load the StudentModules of the supplied ``usage_keys`` into this cache.
+
+        Arguments:
+            usage_keys (iterable of :class:`~UsageKey`): The blocks to cache state for.
+        """
+        usage_keys = list(usage_keys)
+        if not usage_keys:
+            return
+
+        student_modules = StudentModule.objects.chunked_filter(
+            'module_state_key__in', usage_keys, course_id=self.course_id, chunk_size=self.USAGE_KEY_CHUNK_SIZE,
+        )
+        for student_module in student_modules:
+            usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+            self._student_modules_by_block[usage_key][student_module.student_id] = student_module
+
+        self._cache_usernames()
+
+    def iter_all_for_block(self, usage_key):
+        """
+        Yields an :class:`~XBlockUserState` for each user that has state for
+        the supplied block, ordered by StudentModule id, in the same way as
+        :meth:`DjangoXBlockUserStateClient.iter_all_for_block`.
+
+        Arguments:
+            usage_key (:class:`~UsageKey`): The block to return state for.
+        """
+        student_modules = self._student_modules_by_block.get(usage_key, {})
+        for student_module in sorted(student_modules.values(), key=attrgetter('id')):
+            user_state = self._user_state(student_module, usage_key)
+            if user_state is not None:
+                yield user_state
+
+    def _user_state(self, student_module, usage_key):
+        """
+        Returns an :class:`~XBlockUserState` for the supplied StudentModule,
+        or None if it has no state, following the semantics of
+        :class:`DjangoXBlockUserStateClient`.
+        """
+        if student_module.state is None:
+            return None
+
+        state = json.loads(student_module.state)
+        if state == {}:
+            return None
+
+        return XBlockUserState(
+            self._usernames[student_module.student_id],
+            usage_key,
+            state,
+            student_module.modified,
+            Scope.user_state,
+        )
+
+    def _cache_usernames(self):
+        """
+        Loads the usernames of the users whose StudentModules were cached and
+        whose usernames are not yet known, in chunked queries.
+        """
+        student_ids = {
+            student_id
+            for student_modules in self._student_modules_by_block.values()
+            for student_id in student_modules
+        }
+        for user_ids in chunks(list(student_ids - set(self._usernames)), self.USER_CHUNK_SIZE):
+            self._usernames.update(
+                get_user_model().objects.filter(id__in=user_ids).values_list('id', 'username')
+            )
+
+
 class UserStateSummaryCache(DjangoOrmFieldCache):
     """
     Cache for Scope.user_state_summary xblock field data.
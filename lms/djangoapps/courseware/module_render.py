@@ -1069,10 +1069,14 @@ def handle_xblock_callback(request, course_id, usage_id, handler, suffix=None):
 
 
 def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None,
-                           will_recheck_access=False):
+                           will_recheck_access=False, prefetch_descendants=False):
     """
     Gets a module instance based on its `usage_id` in a course, for a given request/user
 
+    If `prefetch_descendants` is True, all of the descendants of the module are loaded with it,
+    and their definitions are loaded in a single batch as soon as the first of them is needed,
+    e.g. when rendering the module.
+
     Returns (instance, tracking_context)
     """
     user = request.user
@@ -1084,7 +1088,10 @@ def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_inf
         raise Http404("Invalid location")  # lint-amnesty, pylint: disable=raise-missing-from
 
     try:
-        descriptor = modulestore().get_item(usage_key)
+        if prefetch_descendants:
+            descriptor = modulestore().get_item(usage_key, depth=None, prefetch_definitions=True)
+        else:
+            descriptor = modulestore().get_item(usage_key)
         descriptor_orig_usage_key, descriptor_orig_version = modulestore().get_block_original_usage(usage_key)
     except ItemNotFoundError:
         log.warning(
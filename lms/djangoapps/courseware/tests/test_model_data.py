@@ -13,7 +13,12 @@ from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
-from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from lms.djangoapps.courseware.model_data import (
+    BulkUserStateCache,
+    DjangoKeyValueStore,
+    FieldDataCache,
+    InvalidScopeError
+)
 from lms.djangoapps.courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -428,3 +433,40 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestBulkUserStateCache(TestCase):
+    """Tests for BulkUserStateCache"""
+    # Tell Django to clean out all databases, not just default
+    databases = {alias for alias in connections}  # lint-amnesty, pylint: disable=unnecessary-comprehension
+
+    def setUp(self):
+        super().setUp()
+        self.users = [UserFactory.create() for _ in range(3)]
+        for index, user in enumerate(self.users[:2]):
+            StudentModuleFactory(student=user, state=json.dumps({'a_field': index}))
+        StudentModuleFactory(student=self.users[2], state=json.dumps({}))
+        self.user_state_cache = BulkUserStateCache(course_id)
+
+    def test_count_usage_keys(self):
+        assert self.user_state_cache.count_usage_keys([location('usage_id')]) == 3
+        assert self.user_state_cache.count_usage_keys([location('other_usage_id')]) == 0
+
+    def test_iter_all_for_block(self):
+        # One query for the state of the block, and one for the usernames of its users
+        with self.assertNumQueries(2):
+            self.user_state_cache.cache_usage_keys([location('usage_id')])
+        assert [
+            (user_state.username, user_state.state)
+            for user_state in self.user_state_cache.iter_all_for_block(location('usage_id'))
+        ] == [(user.username, {'a_field': index}) for index, user in enumerate(self.users[:2])]
+
+    def test_iter_all_for_block_in_student_module_order(self):
+        for index, user in enumerate(reversed(self.users)):
+            StudentModuleFactory(
+                student=user, module_state_key=location('other_usage_id'), state=json.dumps({'a_field': index}),
+            )
+        self.user_state_cache.cache_usage_keys([location('other_usage_id')])
+        assert [
+            user_state.username for user_state in self.user_state_cache.iter_all_for_block(location('other_usage_id'))
+        ] == [user.username for user in reversed(self.users)]
@@ -25,6 +25,7 @@ from edx_toggles.toggles.testutils import override_waffle_flag, override_waffle_
 from markupsafe import escape
 from milestones.tests.utils import MilestonesTestCaseMixin
 from opaque_keys.edx.keys import CourseKey, UsageKey
+from pymongo.collection import Collection
 from pytz import UTC, utc
 from web_fragments.fragment import Fragment
 from xblock.core import XBlock
@@ -103,7 +104,7 @@ from xmodule.modulestore.tests.django_utils import (
     ModuleStoreTestCase,
     SharedModuleStoreTestCase
 )
-from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls, check_query_budget
 
 QUERY_COUNT_TABLE_BLACKLIST = WAFFLE_TABLES
 
@@ -2990,6 +2991,28 @@ class TestRenderXBlock(RenderXBlockTestMixin, ModuleStoreTestCase, CompletionWaf
         self.assertContains(response, 'data-enable-completion-on-view-service="true"')
         self.assertContains(response, 'data-mark-completed-on-view-after-delay')
 
+    def _count_mongo_finds(self):
+        """
+        Returns the number of mongo finds made to render the block to be tested.
+        """
+        with patch.object(Collection, 'find', autospec=True, side_effect=Collection.find) as mock_find:
+            self.verify_response()
+        return mock_find.call_count
+
+    def test_render_vertical_prefetches_definitions(self):
+        """
+        Test that the definitions of the children of a vertical are loaded in a single query.
+        """
+        self.block_name_to_be_tested = 'vertical_block'
+        self.setup_course(ModuleStoreEnum.Type.split)
+        self.setup_user(admin=True, enroll=True, login=True)
+        self.verify_response()
+        mongo_finds = self._count_mongo_finds()
+
+        for _ in range(3):
+            ItemFactory.create(parent=self.vertical_block, category='html', data='<p>More HTML Content</p>')
+        assert self._count_mongo_finds() == mongo_finds
+
         request = RequestFactoryNoCsrf().post(
             '/',
             data=json.dumps({"completion": 1}),
@@ -3015,6 +3038,22 @@ class TestRenderXBlock(RenderXBlockTestMixin, ModuleStoreTestCase, CompletionWaf
         self.assertContains(response, 'data-enable-completion-on-view-service="false"')
         self.assertNotContains(response, 'data-mark-completed-on-view-after-delay')
 
+    def test_render_vertical_query_budget(self):
+        """
+        Test that the modulestore queries made to render a vertical don't grow with its number of children.
+        """
+        self.block_name_to_be_tested = 'vertical_block'
+        self.setup_course(ModuleStoreEnum.Type.split)
+        self.setup_user(admin=True, enroll=True, login=True)
+        self.verify_response()
+        with check_query_budget() as profile:
+            self.verify_response()
+
+        for _ in range(3):
+            ItemFactory.create(parent=self.vertical_block, category='html', data='<p>More HTML Content</p>')
+        with check_query_budget(**profile.query_counts()):
+            self.verify_response()
+
     def test_rendering_descendant_of_gated_sequence(self):
         """
         Test that we redirect instead of rendering what should be gated content,
@@ -1759,7 +1759,7 @@ def render_xblock(request, usage_key_string, check_if_enrolled=True):
         recheck_access = request.GET.get('recheck_access') == '1'
         block, _ = get_module_by_usage_id(
             request, str(course_key), str(usage_key), disable_staff_debug_info=True, course=course,
-            will_recheck_access=recheck_access
+            will_recheck_access=recheck_access, prefetch_descendants=True,
         )
 
         student_view_context = request.GET.dict()
@@ -5,7 +5,7 @@ Code used to get and cache the requested course-data
 
 from django.utils.encoding import python_2_unicode_compatible
 
-from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.course_blocks.api import BulkCourseBlocks, get_course_blocks
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from xmodule.modulestore.django import modulestore
 
@@ -22,7 +22,15 @@ class CourseData:
     This is an in-memory object that maintains its own internal
     cache during its lifecycle.
     """
-    def __init__(self, user, course=None, collected_block_structure=None, structure=None, course_key=None):
+    def __init__(
+        self,
+        user,
+        course=None,
+        collected_block_structure=None,
+        structure=None,
+        course_key=None,
+        bulk_course_blocks=None,
+    ):
         if not any((course, collected_block_structure, structure, course_key)):
             raise ValueError(
                 "You must specify one of course, collected_block_structure, structure, or course_key to this method."
@@ -32,6 +40,7 @@ class CourseData:
         self._structure = structure
         self._course = course
         self._course_key = course_key
+        self._bulk_course_blocks = bulk_course_blocks
         self._location = None
 
     @property
@@ -59,11 +68,14 @@ class CourseData:
     @property
     def structure(self):  # lint-amnesty, pylint: disable=missing-function-docstring
         if self._structure is None:
-            self._structure = get_course_blocks(
-                self.user,
-                self.location,
-                collected_block_structure=self._collected_block_structure,
-            )
+            if self._bulk_course_blocks is not None:
+                self._structure = self._bulk_course_blocks.get(self.user)
+            else:
+                self._structure = get_course_blocks(
+                    self.user,
+                    self.location,
+                    collected_block_structure=self._collected_block_structure,
+                )
         return self._structure
 
     @property
@@ -72,6 +84,16 @@ class CourseData:
             self._collected_block_structure = get_block_structure_manager(self.course_key).get_collected()
         return self._collected_block_structure
 
+    @property
+    def bulk_course_blocks(self):
+        """
+        Returns the BulkCourseBlocks transforming the collected structure
+        of the course for any number of users.
+        """
+        if self._bulk_course_blocks is None:
+            self._bulk_course_blocks = BulkCourseBlocks(self.location, self.collected_structure)
+        return self._bulk_course_blocks
+
     @property
     def course(self):
         if not self._course:
@@ -33,6 +33,7 @@ class CourseGradeFactory:
             course_structure=None,
             course_key=None,
             create_if_needed=True,
+            bulk_course_blocks=None,
     ):
         """
         Returns the CourseGrade for the given user in the course.
@@ -42,9 +43,12 @@ class CourseGradeFactory:
         Else, returns None.
 
         At least one of course, collected_block_structure, course_structure,
-        or course_key should be provided.
+        or course_key should be provided. The user's course structure is
+        taken from bulk_course_blocks, if given and needed.
         """
-        course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
+        course_data = CourseData(
+            user, course, collected_block_structure, course_structure, course_key, bulk_course_blocks,
+        )
         try:
             return self._read(user, course_data)
         except PersistentCourseGrade.DoesNotExist:
@@ -63,15 +67,19 @@ class CourseGradeFactory:
             course_structure=None,
             course_key=None,
             force_update_subsections=False,
+            bulk_course_blocks=None,
     ):
         """
         Computes, updates, and returns the CourseGrade for the given
         user in the course.
 
         At least one of course, collected_block_structure, course_structure,
-        or course_key should be provided.
+        or course_key should be provided. The user's course structure is
+        taken from bulk_course_blocks, if given and needed.
         """
-        course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
+        course_data = CourseData(
+            user, course, collected_block_structure, course_structure, course_key, bulk_course_blocks,
+        )
         return self._update(
             user,
             course_data,
@@ -99,7 +107,8 @@ class CourseGradeFactory:
         # 1. Correctness: the same version of the course is used to
         #    compute the grade for all students.
         # 2. Optimization: the collected course_structure is not
-        #    retrieved from the data store multiple times.
+        #    retrieved from the data store multiple times, and is only
+        #    transformed once for all students with the same access to it.
         course_data = CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
@@ -114,6 +123,7 @@ class CourseGradeFactory:
                 'course': course_data.course,
                 'collected_block_structure': course_data.collected_structure,
                 'course_key': course_data.course_key,
+                'bulk_course_blocks': course_data.bulk_course_blocks,
             }
             if force_update:
                 kwargs['force_update_subsections'] = True
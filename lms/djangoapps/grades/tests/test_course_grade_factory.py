@@ -9,6 +9,7 @@ from django.conf import settings
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.courseware.access import has_access
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
@@ -298,6 +299,15 @@ class TestGradeIteration(SharedModuleStoreTestCase):
             assert course_grade.letter_grade is None
             assert course_grade.percent == 0.0
 
+    def test_transformed_once_for_equivalent_students(self):
+        with patch(
+            'lms.djangoapps.course_blocks.api.get_course_blocks', wraps=get_course_blocks,
+        ) as mock_get_course_blocks:
+            all_course_grades, all_errors = self._course_grades_and_errors_for(self.course, self.students)
+        assert not all_errors
+        assert len(all_course_grades) == len(self.students)
+        assert mock_get_course_blocks.call_count == 1
+
     @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.read')
     def test_grading_exception(self, mock_course_grade):
         """Test that we correctly capture exception messages that bubble up from
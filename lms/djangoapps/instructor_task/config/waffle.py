@@ -23,6 +23,21 @@ GENERATE_PROBLEM_GRADE_REPORT_VERIFIED_ONLY = 'generate_problem_grade_report_ver
 # TODO: Replace with WaffleFlag(). See waffle_flags() docstring.
 GENERATE_COURSE_GRADE_REPORT_VERIFIED_ONLY = 'generate_course_grade_report_verified_only'
 
+# .. toggle_name: instructor_task.shard_grade_reports
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Split course grade reports and problem grade reports of courses with more than
+#   GRADE_REPORT_USERS_PER_SHARD enrolled learners into shards of learners in user id ranges, which are generated
+#   in parallel by separate celery subtasks and merged into a single report once all of them are done.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+SHARD_GRADE_REPORTS = CourseWaffleFlag(
+    waffle_namespace=INSTRUCTOR_TASK_WAFFLE_FLAG_NAMESPACE,
+    flag_name='shard_grade_reports',
+    module_name=__name__,
+)
+
 
 def waffle_flags():
     """
@@ -68,3 +83,11 @@ def course_grade_report_verified_only(course_id):
     False otherwise.
     """
     return waffle_flags()[GENERATE_COURSE_GRADE_REPORT_VERIFIED_ONLY].is_enabled(course_id)
+
+
+def shard_grade_reports_enabled(course_id):
+    """
+    Returns True if grade reports for the given course should be
+    generated in parallel shards, False otherwise.
+    """
+    return SHARD_GRADE_REPORTS.is_enabled(course_id)
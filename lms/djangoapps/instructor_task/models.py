@@ -12,17 +12,20 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import codecs
 import csv
 import hashlib
+import io
 import json
 import logging
 import os.path
+import tempfile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext as _
@@ -286,12 +289,33 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        The rows are written to a temporary file as they are consumed and
+        the file is then streamed to the storage backend, so `rows` can be
+        a generator of more rows than fit in memory.
+        """
+        with tempfile.TemporaryFile() as output_file:
+            text_output = io.TextIOWrapper(output_file, encoding='utf-8', newline='')
+            csvwriter = csv.writer(text_output)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            text_output.flush()
+            text_output.detach()
+            output_file.seek(0)
+            self.storage.save(self.path_to(course_id, filename), File(output_file, name=filename))
+
+    def read_rows(self, course_id, filename):
+        """
+        Given a course_id and filename of a csv file stored by `store_rows`,
+        return a generator of its rows, each a list of strings.
+        """
+        with self.storage.open(self.path_to(course_id, filename)) as csv_file:
+            yield from csv.reader(codecs.iterdecode(csv_file, 'utf-8'))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file named `filename` stored for the given `course_id`.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
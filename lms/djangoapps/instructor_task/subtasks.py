@@ -353,6 +353,15 @@ def queue_subtasks_for_query(
     return progress
 
 
+def get_subtask_states(entry_id):
+    """
+    Returns a dict mapping the id of each subtask of the specified InstructorTask to its current state.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_status_info = json.loads(entry.subtasks)['status']
+    return {subtask_id: subtask_status['state'] for subtask_id, subtask_status in subtask_status_info.items()}
+
+
 def _acquire_subtask_lock(task_id):
     """
     Mark the specified task_id as being in progress.
@@ -384,6 +393,19 @@ def _release_subtask_lock(task_id):
     cache.delete(key)
 
 
+def acquire_final_subtask_lock(final_subtask_id):
+    """
+    Mark the specified final subtask, registered along with other subtasks, as being queued.
+
+    This is used to make sure that the final subtask is queued only once, when several of the
+    other subtasks complete at the same moment and each find that all of them are done.
+
+    Returns true if the final subtask was not already marked as queued; false if it was.
+    """
+    key = f"final-subtask-{final_subtask_id}"
+    return cache.add(key, 'true', SUBTASK_LOCK_EXPIRE)
+
+
 def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
     """
     Confirms that the current subtask is known to the InstructorTask and hasn't already been completed.
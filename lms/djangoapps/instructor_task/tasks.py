@@ -53,6 +53,12 @@ from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Grade reports that can be generated in parallel shards, by report name.
+SHARDED_GRADE_REPORTS = {
+    report_class.REPORT_NAME: report_class
+    for report_class in (CourseGradeReport, ProblemGradeReport)
+}
+
 
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
@@ -193,7 +199,14 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
+    create_shard_subtask = partial(
+        _create_grade_report_shard_subtask,
+        CourseGradeReport.REPORT_NAME,
+        entry_id,
+        xmodule_instance_args,
+        action_name,
+    )
+    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args, create_shard_subtask=create_shard_subtask)
     return run_main_task(entry_id, task_fn, action_name)
 
 
@@ -211,10 +224,116 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(ProblemGradeReport.generate, xmodule_instance_args)
+    create_shard_subtask = partial(
+        _create_grade_report_shard_subtask,
+        ProblemGradeReport.REPORT_NAME,
+        entry_id,
+        xmodule_instance_args,
+        action_name,
+    )
+    task_fn = partial(ProblemGradeReport.generate, xmodule_instance_args, create_shard_subtask=create_shard_subtask)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+def _create_grade_report_shard_subtask(
+    report_name,
+    entry_id,
+    xmodule_instance_args,
+    action_name,
+    shard_index,
+    user_id_range,
+    merge_subtask_id,
+    initial_subtask_status,
+):
+    """Creates a subtask to generate a shard of a grade report for the given user id range."""
+    return generate_grade_report_shard.subtask(
+        (
+            entry_id,
+            xmodule_instance_args,
+            report_name,
+            action_name,
+            shard_index,
+            user_id_range,
+            merge_subtask_id,
+            initial_subtask_status.to_dict(),
+        ),
+        task_id=initial_subtask_status.task_id,
+    )
+
+
+def _create_grade_report_merge_subtask(
+    report_name,
+    entry_id,
+    xmodule_instance_args,
+    action_name,
+    num_shards,
+    initial_subtask_status,
+):
+    """Creates a subtask to merge the shards of a grade report."""
+    return merge_grade_report_shards.subtask(
+        (
+            entry_id,
+            xmodule_instance_args,
+            report_name,
+            action_name,
+            num_shards,
+            initial_subtask_status.to_dict(),
+        ),
+        task_id=initial_subtask_status.task_id,
+    )
+
+
+@shared_task
+@set_code_owner_attribute
+def generate_grade_report_shard(
+    entry_id,
+    xmodule_instance_args,
+    report_name,
+    action_name,
+    shard_index,
+    user_id_range,
+    merge_subtask_id,
+    subtask_status_dict,
+):
+    """
+    Generate the shard of a course or problem grade report for the learners
+    in the given user id range, and queue the merge of the report's shards
+    once all of them are done.
+    """
+    create_merge_subtask = partial(
+        _create_grade_report_merge_subtask, report_name, entry_id, xmodule_instance_args, action_name,
+    )
+    return SHARDED_GRADE_REPORTS[report_name].generate_shard(
+        entry_id,
+        xmodule_instance_args,
+        action_name,
+        shard_index,
+        user_id_range,
+        merge_subtask_id,
+        subtask_status_dict,
+        create_merge_subtask,
+    )
+
+
+@shared_task
+@set_code_owner_attribute
+def merge_grade_report_shards(
+    entry_id,
+    xmodule_instance_args,
+    report_name,
+    action_name,
+    num_shards,
+    subtask_status_dict,
+):
+    """
+    Concatenate the shards of a course or problem grade report into the
+    final report and push it to an S3 bucket for download.
+    """
+    return SHARDED_GRADE_REPORTS[report_name].merge_shards(
+        entry_id, xmodule_instance_args, action_name, num_shards, subtask_status_dict,
+    )
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
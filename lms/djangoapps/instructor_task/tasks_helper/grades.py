@@ -2,13 +2,17 @@
 Functionality for generating grade reports.
 """
 
+import json
 import logging
+import os
 import re
 from collections import OrderedDict, defaultdict
 from datetime import datetime
 from itertools import chain
 from time import time
+from uuid import uuid4
 
+from celery.states import FAILURE, READY_STATES, SUCCESS
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from lazy import lazy
@@ -19,9 +23,11 @@ from six.moves import zip_longest
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.roles import BulkRoleCache
+from common.djangoapps.util.db import outer_atomic
 from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.courseware.courses import get_course_by_id
+from lms.djangoapps.courseware.model_data import BulkUserStateCache
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
@@ -31,7 +37,17 @@ from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.instructor_task.config.waffle import (
     course_grade_report_verified_only,
     optimize_get_learners_switch_enabled,
-    problem_grade_report_verified_only
+    problem_grade_report_verified_only,
+    shard_grade_reports_enabled
+)
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    acquire_final_subtask_lock,
+    check_subtask_is_valid,
+    get_subtask_states,
+    initialize_subtask_info,
+    update_subtask_status
 )
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
@@ -68,6 +84,24 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _user_id_range_filter_kwargs(context):
+    """
+    Returns the filter kwargs restricting users to the user id range of
+    the given context, if any.  The range holds the ids above its lower
+    bound and up to its upper bound, either of which may be None to leave
+    the range open-ended.
+    """
+    if context.user_id_range is None:
+        return {}
+    after_id, max_id = context.user_id_range
+    filter_kwargs = {}
+    if after_id is not None:
+        filter_kwargs['id__gt'] = after_id
+    if max_id is not None:
+        filter_kwargs['id__lte'] = max_id
+    return filter_kwargs
+
+
 class GradeReportBase:
     """
     Base class for grade reports (ProblemGradeReport and CourseGradeReport).
@@ -143,7 +177,10 @@ class GradeReportBase:
             if verified_only:
                 filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
 
-            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
+            # The chunks are id ranges of these users, so they stay within the user id range of the context.
+            user_ids_list = get_user_model().objects.filter(
+                **filter_kwargs, **_user_id_range_filter_kwargs(context)
+            ).values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
@@ -204,7 +241,7 @@ class _CourseGradeReportContext:
     boundaries.
     """
 
-    def __init__(self, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    def __init__(self, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, user_id_range=None):
         self.task_info_string = (
             'Task: {task_id}, '
             'InstructorTask ID: {entry_id}, '
@@ -216,8 +253,10 @@ class _CourseGradeReportContext:
             course_id=course_id,
             task_input=_task_input,
         )
+        self.entry_id = _entry_id
         self.action_name = action_name
         self.course_id = course_id
+        self.user_id_range = user_id_range
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
         self.report_for_verified_only = course_grade_report_verified_only(self.course_id)
 
@@ -293,7 +332,7 @@ class _ProblemGradeReportContext:
     boundaries.
     """
 
-    def __init__(self, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    def __init__(self, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, user_id_range=None):
         task_id = _xmodule_instance_args.get('task_id') if _xmodule_instance_args is not None else None
         self.task_info_string = (
             'Task: {task_id}, '
@@ -311,6 +350,7 @@ class _ProblemGradeReportContext:
         self.task_input = _task_input
         self.action_name = action_name
         self.course_id = course_id
+        self.user_id_range = user_id_range
         self.report_for_verified_only = problem_grade_report_verified_only(self.course_id)
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
         self.file_name = 'problem_grade_report'
@@ -397,21 +437,304 @@ class _CourseGradeBulkContext:  # lint-amnesty, pylint: disable=missing-class-do
         BulkCourseTags.prefetch(context.course_id, users)
 
 
-class CourseGradeReport:
+class _ShardedGradeReportMixin:
+    """
+    Mixin for grade reports that can be split into shards of learners in
+    consecutive user id ranges.  The shards are generated in parallel by
+    separate subtasks of the report's InstructorTask, and a final subtask
+    then merges them in order into a single report.
+
+    Classes using this mixin define REPORT_NAME and CONTEXT_CLASS, along
+    with the _generate, _batched_rows, _success_headers and _error_headers
+    methods.
+    """
+    REPORT_NAME = None
+    CONTEXT_CLASS = None
+
+    # Directory, relative to the course's report directory, in which shards
+    # are stored until they are merged.  Report download links only list
+    # the files directly within the course's report directory.
+    SHARD_DIRECTORY = 'shards'
+
+    @classmethod
+    def _generate_report(cls, context, create_shard_subtask):
+        """
+        Generates the report for the given context, or queues the subtasks
+        generating its shards if sharding is enabled for the course and the
+        report is large enough.  Returns the task progress.
+        """
+        report = cls()
+        if create_shard_subtask is not None and shard_grade_reports_enabled(context.course_id):
+            progress = report._queue_shards(context, create_shard_subtask)  # pylint: disable=protected-access
+            if progress is not None:
+                return progress
+        return report._generate(context)  # pylint: disable=protected-access
+
+    @classmethod
+    def generate_shard(
+        cls,
+        entry_id,
+        xmodule_instance_args,
+        action_name,
+        shard_index,
+        user_id_range,
+        merge_subtask_id,
+        subtask_status_dict,
+        create_merge_subtask,
+    ):
+        """
+        Generates and stores the shard of the report for the learners in the
+        given user id range, and queues the merge subtask, created by calling
+        create_merge_subtask(num_shards, initial_subtask_status), once all
+        shards of the report are done.  Returns the subtask status as a dict.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        shard_exception = None
+        try:
+            with modulestore().bulk_operations(entry.course_id):
+                context = cls.CONTEXT_CLASS(
+                    xmodule_instance_args,
+                    entry_id,
+                    entry.course_id,
+                    json.loads(entry.task_input),
+                    action_name,
+                    user_id_range=user_id_range,
+                )
+                succeeded, failed = cls()._store_shard(context, shard_index)  # pylint: disable=protected-access
+        except Exception as exc:  # pylint: disable=broad-except
+            TASK_LOG.exception(
+                'Task: %s, InstructorTask ID: %s, failed to generate shard %s of %s',
+                current_task_id, entry_id, shard_index, cls.REPORT_NAME,
+            )
+            subtask_status.increment(state=FAILURE)
+            shard_exception = exc
+        else:
+            subtask_status.increment(succeeded=succeeded, failed=failed, state=SUCCESS)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+
+        # The merge is queued even if a shard failed, so that the InstructorTask completes.
+        # Shards completing at the same moment may all find that they are done,
+        # so only the one acquiring the lock queues the merge.
+        shard_states = get_subtask_states(entry_id)
+        del shard_states[merge_subtask_id]
+        if all(state in READY_STATES for state in shard_states.values()):
+            if acquire_final_subtask_lock(merge_subtask_id):
+                create_merge_subtask(len(shard_states), SubtaskStatus.create(merge_subtask_id)).apply_async()
+
+        if shard_exception is not None:
+            raise shard_exception
+        return subtask_status.to_dict()
+
+    @classmethod
+    def merge_shards(cls, entry_id, xmodule_instance_args, action_name, num_shards, subtask_status_dict):
+        """
+        Concatenates the stored shards of the report, in order, into the
+        final report, and deletes them.  If any of the shards failed, no
+        report is uploaded and the InstructorTask fails, as it does if the
+        merge itself fails.  Returns the subtask status as a dict.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        shard_states = get_subtask_states(entry_id)
+        del shard_states[current_task_id]
+        num_failed_shards = sum(state != SUCCESS for state in shard_states.values())
+        try:
+            with modulestore().bulk_operations(entry.course_id):
+                context = cls.CONTEXT_CLASS(
+                    xmodule_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name,
+                )
+                report = cls()
+                try:
+                    if not num_failed_shards:
+                        report._merge_shards(context, num_shards)  # pylint: disable=protected-access
+                finally:
+                    report._delete_shards(context, num_shards)  # pylint: disable=protected-access
+        except Exception:
+            TASK_LOG.exception(
+                'Task: %s, InstructorTask ID: %s, failed to merge shards of %s',
+                current_task_id, entry_id, cls.REPORT_NAME,
+            )
+            cls._fail_merge(entry_id, subtask_status, 'Failed to merge the shards of the report', num_failed_shards, 1)
+            raise
+
+        if num_failed_shards:
+            TASK_LOG.error(
+                'Task: %s, InstructorTask ID: %s, %s of %s shards of %s failed',
+                current_task_id, entry_id, num_failed_shards, num_shards, cls.REPORT_NAME,
+            )
+            message = f'{num_failed_shards} of {num_shards} shards of the report failed'
+            cls._fail_merge(entry_id, subtask_status, message, num_failed_shards, 0)
+        else:
+            subtask_status.increment(state=SUCCESS)
+            update_subtask_status(entry_id, current_task_id, subtask_status)
+        return subtask_status.to_dict()
+
+    @staticmethod
+    def _fail_merge(entry_id, subtask_status, message, num_failed_shards, num_failed_merges):
+        """
+        Records the failure of the merge subtask with the given status, and
+        fails the InstructorTask, with the given message and the numbers of
+        failed shards and merges in its task_output.
+        """
+        subtask_status.increment(state=FAILURE)
+        # Completing the last subtask marks the InstructorTask as succeeded, so
+        # both updates are made in the same transaction.
+        with outer_atomic():
+            update_subtask_status(entry_id, subtask_status.task_id, subtask_status)
+            entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+            task_progress = json.loads(entry.task_output)
+            task_progress.update({
+                'message': message,
+                'failed_shards': num_failed_shards,
+                'failed_merges': num_failed_merges,
+            })
+            entry.task_output = InstructorTask.create_output_for_success(task_progress)
+            entry.task_state = FAILURE
+            entry.save()
+
+    def _enrolled_users(self, context):
+        """
+        Returns a queryset of the users included in the report, ordered by id.
+        """
+        filter_kwargs = {
+            'courseenrollment__course_id': context.course_id,
+        }
+        if context.report_for_verified_only:
+            filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+        return get_user_model().objects.filter(**filter_kwargs).order_by('id')
+
+    def _queue_shards(self, context, create_shard_subtask):
+        """
+        Queues the subtasks generating the shards of the report, each for up
+        to settings.GRADE_REPORT_USERS_PER_SHARD learners in a user id range,
+        created by calling create_shard_subtask(shard_index, user_id_range,
+        merge_subtask_id, initial_subtask_status).  Returns the task progress,
+        or None without queueing anything if the report fits in one shard.
+        """
+        entry = InstructorTask.objects.get(pk=context.entry_id)
+
+        # Subtasks may already have been queued if this task was requeued by celery.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning('%s, Shards of %s have already been queued', context.task_info_string, self.REPORT_NAME)
+            return json.loads(entry.task_output)
+
+        # The user id ranges of the shards are contiguous, and those of the first and last
+        # shards are open-ended, so that learners whose ids fall between or beyond the users
+        # found here, such as learners enrolling in the meantime, are not left out.  They're
+        # all known before any shard is registered, so that every registered shard is queued.
+        users_per_shard = settings.GRADE_REPORT_USERS_PER_SHARD
+        max_ids = []
+        total_num_users = 0
+        for total_num_users, user_id in enumerate(
+            self._enrolled_users(context).values_list('id', flat=True).iterator(), start=1,
+        ):
+            if total_num_users % users_per_shard == 0:
+                max_ids.append(user_id)
+        if total_num_users <= users_per_shard:
+            return None
+        if total_num_users % users_per_shard == 0:
+            max_ids.pop()
+        user_id_ranges = list(zip([None] + max_ids, max_ids + [None]))
+
+        merge_subtask_id = str(uuid4())
+        shard_subtask_ids = [str(uuid4()) for _ in user_id_ranges]
+        TASK_LOG.info(
+            '%s, Queueing %s shards of %s for %s users',
+            context.task_info_string, len(user_id_ranges), self.REPORT_NAME, total_num_users,
+        )
+        # Make sure this is committed to database before handing off subtasks to celery.
+        with outer_atomic():
+            progress = initialize_subtask_info(
+                entry, context.action_name, total_num_users, shard_subtask_ids + [merge_subtask_id],
+            )
+        for shard_index, (user_id_range, subtask_id) in enumerate(zip(user_id_ranges, shard_subtask_ids)):
+            create_shard_subtask(
+                shard_index, user_id_range, merge_subtask_id, SubtaskStatus.create(subtask_id),
+            ).apply_async()
+        return progress
+
+    def _shard_filename(self, context, shard_index, suffix=''):
+        """
+        Returns the name of the file storing the given shard of the report.
+        """
+        return os.path.join(self.SHARD_DIRECTORY, str(context.entry_id), f'{shard_index}{suffix}.csv')
+
+    def _store_shard(self, context, shard_index):
+        """
+        Generates and stores the success and error rows, without headers,
+        of the learners in the user id range of the given context.  Returns
+        the numbers of learners that succeeded and failed.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        batch_sizes, error_rows = [], []
+
+        def success_rows():
+            for batch_success_rows, batch_error_rows in self._batched_rows(context):
+                batch_sizes.append(len(batch_success_rows))
+                error_rows.extend(batch_error_rows)
+                yield from batch_success_rows
+
+        report_store.store_rows(context.course_id, self._shard_filename(context, shard_index), success_rows())
+        report_store.store_rows(context.course_id, self._shard_filename(context, shard_index, '_err'), error_rows)
+        return sum(batch_sizes), len(error_rows)
+
+    def _merge_shards(self, context, num_shards):
+        """
+        Uploads the report, and its error report if there are any errors,
+        concatenating the stored shards in order.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+        def shard_rows(suffix=''):
+            for shard_index in range(num_shards):
+                yield from report_store.read_rows(context.course_id, self._shard_filename(context, shard_index, suffix))
+
+        date = datetime.now(UTC)
+        success_rows = chain([self._success_headers(context)], shard_rows())
+        upload_csv_to_report_store(success_rows, self.REPORT_NAME, context.course_id, date)
+        error_rows = list(shard_rows('_err'))
+        if error_rows:
+            error_rows = [self._error_headers()] + error_rows
+            upload_csv_to_report_store(error_rows, self.REPORT_NAME + '_err', context.course_id, date)
+
+    def _delete_shards(self, context, num_shards):
+        """
+        Deletes the stored shards of the report.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        for shard_index in range(num_shards):
+            report_store.delete(context.course_id, self._shard_filename(context, shard_index))
+            report_store.delete(context.course_id, self._shard_filename(context, shard_index, '_err'))
+
+
+class CourseGradeReport(_ShardedGradeReportMixin):
     """
     Class to encapsulate functionality related to generating Grade Reports.
     """
+    REPORT_NAME = 'grade_report'
+    CONTEXT_CLASS = _CourseGradeReportContext
+
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
     @classmethod
-    def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    def generate(
+        cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, create_shard_subtask=None,
+    ):
         """
-        Public method to generate a grade report.
+        Public method to generate a grade report.  If create_shard_subtask
+        is given, large reports may be generated in parallel shards.
         """
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
-            return CourseGradeReport()._generate(context)  # lint-amnesty, pylint: disable=protected-access
+            return cls._generate_report(context, create_shard_subtask)
 
     def _generate(self, context):
         """
@@ -422,10 +745,9 @@ class CourseGradeReport:
         error_headers = self._error_headers()
         batched_rows = self._batched_rows(context)
 
-        context.update_status('Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
-
-        context.update_status('Uploading grades')
+        context.update_status('Compiling and uploading grades')
+        error_rows = []
+        success_rows = self._compile(context, batched_rows, error_rows)
         self._upload(context, success_headers, success_rows, error_headers, error_rows)
 
         return context.update_status('Completed grades')
@@ -459,32 +781,41 @@ class CourseGradeReport:
             users = [u for u in users if u is not None]
             yield self._rows_for_users(context, users)
 
-    def _compile(self, context, batched_rows):
+    def _compile(self, context, batched_rows, error_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        A generator of the success rows for the given batched_rows and
+        context, which are only graded as the rows are consumed.  Error
+        rows are appended to the given error_rows list, and the metrics
+        on task status are updated and reported to the task after each
+        batch.
+
+        The success rows are not accumulated, so the report can be
+        streamed to the report store with memory usage independent of
+        the number of learners.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = zip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+        for batch_success_rows, batch_error_rows in batched_rows:
+            yield from batch_success_rows
+            error_rows.extend(batch_error_rows)
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+            # update metrics on task status
+            context.task_progress.succeeded += len(batch_success_rows)
+            context.task_progress.failed += len(batch_error_rows)
+            context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+            context.task_progress.total = context.task_progress.attempted
+            context.update_status('Compiling and uploading grades')
 
     def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
         Creates and uploads a CSV for the given headers and rows.
+
+        success_rows may be a generator; it is consumed while the CSV is
+        written, before error_rows are read.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store(chain([success_headers], success_rows), self.REPORT_NAME, context.course_id, date)
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+            upload_csv_to_report_store(error_rows, self.REPORT_NAME + '_err', context.course_id, date)
 
     def _grades_header(self, context):
         """
@@ -533,7 +864,7 @@ class CourseGradeReport:
                 include_inactive=True,
                 verified_only=verified_only,
             )
-            users = users.select_related('profile')
+            users = users.filter(**_user_id_range_filter_kwargs(context)).select_related('profile')
             return grouper(users)
 
         def users_for_course_v2(course_id, verified_only=False):
@@ -548,7 +879,10 @@ class CourseGradeReport:
             if verified_only:
                 filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
 
-            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
+            # The chunks are id ranges of these users, so they stay within the user id range of the context.
+            user_ids_list = get_user_model().objects.filter(
+                **filter_kwargs, **_user_id_range_filter_kwargs(context)
+            ).values_list('id', flat=True).order_by('id')
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
@@ -702,20 +1036,24 @@ class CourseGradeReport:
             return success_rows, error_rows
 
 
-class ProblemGradeReport(GradeReportBase):
+class ProblemGradeReport(_ShardedGradeReportMixin, GradeReportBase):
     """
     Class to encapsulate functionality related to generating Problem Grade Reports.
     """
+    REPORT_NAME = 'problem_grade_report'
+    CONTEXT_CLASS = _ProblemGradeReportContext
 
     @classmethod
-    def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    def generate(
+        cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name, create_shard_subtask=None,
+    ):
         """
-        Public method to generate a grade report.
+        Public method to generate a grade report.  If create_shard_subtask
+        is given, large reports may be generated in parallel shards.
         """
         with modulestore().bulk_operations(course_id):
             context = _ProblemGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
-            # pylint: disable=protected-access
-            return ProblemGradeReport()._generate(context)
+            return cls._generate_report(context, create_shard_subtask)
 
     def _generate(self, context):
         """
@@ -902,15 +1240,27 @@ class ProblemResponses:
                     break
                 course_blocks = get_course_blocks(user, usage_key)
                 base_path = cls._build_block_base_path(store.get_item(usage_key))
-                for title, path, block_key in cls._build_problem_list(course_blocks, usage_key):
+                problems = [
+                    (title, path, block_key)
+                    for title, path, block_key in cls._build_problem_list(course_blocks, usage_key)
                     # Chapter and sequential blocks are filtered out since they include state
                     # which isn't useful for this report.
-                    if block_key.block_type in ('sequential', 'chapter'):
-                        continue
-
-                    if filter_types is not None and block_key.block_type not in filter_types:
-                        continue
+                    if block_key.block_type not in ('sequential', 'chapter') and (
+                        filter_types is None or block_key.block_type in filter_types
+                    )
+                ]
+
+                # The state of the problems is loaded in a few chunked queries rather than per
+                # problem, unless there is more of it than the responses the report may hold.
+                bulk_user_state_cache = BulkUserStateCache(course_key)
+                problem_keys = [block_key for _, _, block_key in problems]
+                if max_count is None or bulk_user_state_cache.count_usage_keys(problem_keys) <= max_count:
+                    bulk_user_state_cache.cache_usage_keys(problem_keys)
+                    user_state_source = bulk_user_state_cache
+                else:
+                    user_state_source = user_state_client
 
+                for title, path, block_key in problems:
                     block = store.get_item(block_key)
                     generated_report_data = defaultdict(list)
 
@@ -918,7 +1268,7 @@ class ProblemResponses:
                     # human-readable formatting for user state.
                     if hasattr(block, 'generate_report_data'):
                         try:
-                            user_state_iterator = user_state_client.iter_all_for_block(block_key)
+                            user_state_iterator = user_state_source.iter_all_for_block(block_key)
                             for username, state in block.generate_report_data(user_state_iterator, max_count):
                                 generated_report_data[username].append(state)
                         except NotImplementedError:
@@ -66,6 +66,20 @@ class ReportStoreTestMixin:
 
         assert [link[0] for link in report_store.links_for(self.course_id)] == ['new_file', 'middle_file', 'old_file']
 
+    def test_store_rows_from_generator(self):
+        """
+        Test that ReportStore.store_rows() writes all of the rows of a
+        generator as csv.
+        """
+        report_store = self.create_report_store()  # lint-amnesty, pylint: disable=assignment-from-no-return
+        rows = (['row', str(index), 'ni\xf1o'] for index in range(3))
+        report_store.store_rows(self.course_id, 'rows_file', rows)
+
+        path = report_store.path_to(self.course_id, 'rows_file')
+        with report_store.storage.open(path) as report_file:
+            content = report_file.read().decode('utf-8')
+        assert content.splitlines() == ['row,0,ni\xf1o', 'row,1,ni\xf1o', 'row,2,ni\xf1o']
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -7,6 +7,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
@@ -15,11 +16,15 @@ from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
 from unittest.mock import ANY, MagicMock, Mock, patch
 from urllib.parse import quote
+from uuid import uuid4
 
 import ddt
+import pytest
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from edx_django_utils.cache import RequestCache
 from edx_toggles.toggles.testutils import override_waffle_flag
 from freezegun import freeze_time
@@ -39,6 +44,7 @@ from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsec
 from lms.djangoapps.grades.subsection_grade import CreateSubsectionGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
 from lms.djangoapps.instructor_analytics.basic import UNAVAILABLE, list_problem_responses
+from lms.djangoapps.instructor_task.config.waffle import SHARD_GRADE_REPORTS
 from lms.djangoapps.instructor_task.tasks_helper.certs import (
     generate_students_certificates,
     _invalidate_generated_certificates
@@ -58,6 +64,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_submission_files,
     upload_ora2_summary
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -433,6 +440,49 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
             {'attempted': expected_students, 'succeeded': expected_students, 'failed': 0}, result
         )
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch.object(CourseGradeReport, 'USER_BATCH_SIZE', 2)
+    def test_rows_streamed_to_report_store(self, _mock_current_task):
+        """
+        Test that the grade rows are passed to the report store as they are
+        compiled, rather than accumulated for all learners beforehand.
+        """
+        for i in range(3):
+            self.create_student(f'student{i}', f'student{i}@example.com')
+
+        uploaded_rows = []
+
+        def upload_csv(rows, *args):
+            assert not isinstance(rows, list)
+            uploaded_rows.extend(rows)
+
+        with patch(
+            'lms.djangoapps.instructor_task.tasks_helper.grades.upload_csv_to_report_store',
+            side_effect=upload_csv,
+        ):
+            result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+
+        assert len(uploaded_rows) == 4
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    @patch.object(CourseGradeReport, 'USER_BATCH_SIZE', 2)
+    def test_progress_reported_per_batch(self, mock_current_task):
+        for i in range(3):
+            self.create_student(f'student{i}', f'student{i}@example.com')
+
+        CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+
+        progress = [
+            (kwargs['meta']['attempted'], kwargs['meta']['step'])
+            for _, kwargs in mock_current_task.return_value.update_state.call_args_list
+        ]
+        assert (2, 'Compiling and uploading grades') in progress
+        assert (3, 'Compiling and uploading grades') in progress
+        assert progress.index((2, 'Compiling and uploading grades')) < progress.index(
+            (3, 'Compiling and uploading grades')
+        )
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
@@ -469,6 +519,185 @@ class TestTeamGradeReport(InstructorGradeReportTestCase):
         self._verify_cell_data_for_user(self.student2.username, self.course.id, 'Team Name', team2.name)
 
 
+@ddt.ddt
+@override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+@override_waffle_flag(SHARD_GRADE_REPORTS, active=True)
+@patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+class TestShardedGradeReport(InstructorGradeReportTestCase):
+    """
+    Tests that grade reports can be generated in parallel shards.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(f'student{i}', f'student{i}@example.com') for i in range(5)]
+        self.entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+        )
+
+    def _queue_shards(self, report_class=CourseGradeReport):
+        """
+        Generates the report, returning its progress and the arguments the
+        shard subtasks are created with.
+        """
+        shard_subtasks = []
+
+        def create_shard_subtask(*args):
+            shard_subtasks.append(args)
+            return Mock()
+
+        progress = report_class.generate(
+            None, self.entry.id, self.course.id, None, 'graded', create_shard_subtask=create_shard_subtask,
+        )
+        return progress, shard_subtasks
+
+    def _generate_shards(self, shard_subtasks, report_class=CourseGradeReport):
+        """
+        Generates all shards in order, returning the arguments the merge
+        subtasks are created with.
+        """
+        merge_subtasks = []
+
+        def create_merge_subtask(*args):
+            merge_subtasks.append(args)
+            return Mock()
+
+        for shard_index, user_id_range, merge_subtask_id, subtask_status in shard_subtasks:
+            report_class.generate_shard(
+                self.entry.id,
+                None,
+                'graded',
+                shard_index,
+                user_id_range,
+                merge_subtask_id,
+                subtask_status.to_dict(),
+                create_merge_subtask,
+            )
+        return merge_subtasks
+
+    @ddt.data(CourseGradeReport, ProblemGradeReport)
+    def test_sharded_report(self, report_class, _mock_current_task):
+        self._assert_sharded_report(report_class)
+
+    @patch(
+        'lms.djangoapps.instructor_task.tasks_helper.grades.optimize_get_learners_switch_enabled',
+        Mock(return_value=True),
+    )
+    def test_sharded_report_with_optimized_learners_query(self, _mock_current_task):
+        self._assert_sharded_report(CourseGradeReport)
+
+    def _assert_sharded_report(self, report_class):
+        """
+        Generates the report of the given class in shards, and checks that
+        it includes every learner, in order.
+        """
+        progress, shard_subtasks = self._queue_shards(report_class)
+        assert progress['total'] == 5
+        assert [shard_index for shard_index, _, _, _ in shard_subtasks] == [0, 1, 2]
+        assert [user_id_range for _, user_id_range, _, _ in shard_subtasks] == [
+            (None, self.students[1].id),
+            (self.students[1].id, self.students[3].id),
+            (self.students[3].id, None),
+        ]
+
+        merge_subtasks = self._generate_shards(shard_subtasks, report_class)
+        [(num_shards, merge_subtask_status)] = merge_subtasks
+        assert num_shards == 3
+        report_class.merge_shards(self.entry.id, None, 'graded', num_shards, merge_subtask_status.to_dict())
+
+        self.entry.refresh_from_db()
+        assert self.entry.task_state == SUCCESS
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, json.loads(self.entry.task_output))
+        assert self._report_usernames() == [student.username for student in self.students]
+
+    def test_last_shard_open_ended_when_full(self, _mock_current_task):
+        CourseEnrollment.objects.filter(user=self.students[4], course_id=self.course.id).delete()
+        progress, shard_subtasks = self._queue_shards()
+        assert progress['total'] == 4
+        assert [user_id_range for _, user_id_range, _, _ in shard_subtasks] == [
+            (None, self.students[1].id),
+            (self.students[1].id, None),
+        ]
+
+        # Only the queued shards and the merge are registered, so the merge is queued once they're done.
+        self.entry.refresh_from_db()
+        assert json.loads(self.entry.subtasks)['total'] == 3
+        [(num_shards, _)] = self._generate_shards(shard_subtasks)
+        assert num_shards == 2
+
+    def _report_usernames(self):
+        """
+        Returns the usernames in the uploaded report.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        [(report_csv_filename, _)] = report_store.links_for(self.course.id)
+        report_path = report_store.path_to(self.course.id, report_csv_filename)
+        with report_store.storage.open(report_path) as csv_file:
+            return [row['Username'] for row in unicodecsv.DictReader(csv_file)]
+
+    def test_learner_enrolled_after_queueing(self, _mock_current_task):
+        _, shard_subtasks = self._queue_shards()
+        student = self.create_student('student5', 'student5@example.com')
+
+        [(num_shards, merge_subtask_status)] = self._generate_shards(shard_subtasks)
+        CourseGradeReport.merge_shards(self.entry.id, None, 'graded', num_shards, merge_subtask_status.to_dict())
+        assert self._report_usernames() == [student.username for student in self.students + [student]]
+
+    def test_merge_queued_once(self, _mock_current_task):
+        _, shard_subtasks = self._queue_shards()
+        # Every shard finds all of them done, as when they complete at the same moment.
+        merge_subtask_id = shard_subtasks[0][2]
+        subtask_ids = [subtask_status.task_id for _, _, _, subtask_status in shard_subtasks] + [merge_subtask_id]
+        with patch(
+            'lms.djangoapps.instructor_task.tasks_helper.grades.get_subtask_states',
+            side_effect=lambda entry_id: dict.fromkeys(subtask_ids, SUCCESS),
+        ):
+            merge_subtasks = self._generate_shards(shard_subtasks)
+        assert len(merge_subtasks) == 1
+
+    def test_failed_shard(self, _mock_current_task):
+        _, shard_subtasks = self._queue_shards()
+        with patch.object(CourseGradeReport, '_store_shard', side_effect=[(2, 0), Exception, (1, 0)]):
+            with pytest.raises(Exception):
+                self._generate_shards(shard_subtasks)
+            merge_subtasks = self._generate_shards(shard_subtasks[2:])
+
+        [(num_shards, merge_subtask_status)] = merge_subtasks
+        CourseGradeReport.merge_shards(self.entry.id, None, 'graded', num_shards, merge_subtask_status.to_dict())
+
+        self.entry.refresh_from_db()
+        assert self.entry.task_state == FAILURE
+        self.assertDictContainsSubset(
+            {'attempted': 3, 'succeeded': 3, 'failed': 0, 'failed_shards': 1, 'failed_merges': 0},
+            json.loads(self.entry.task_output),
+        )
+        assert ReportStore.from_config(config_name='GRADES_DOWNLOAD').links_for(self.course.id) == []
+
+    def test_failed_merge(self, _mock_current_task):
+        _, shard_subtasks = self._queue_shards()
+        [(num_shards, merge_subtask_status)] = self._generate_shards(shard_subtasks)
+        with patch.object(CourseGradeReport, '_merge_shards', side_effect=Exception):
+            with pytest.raises(Exception):
+                CourseGradeReport.merge_shards(
+                    self.entry.id, None, 'graded', num_shards, merge_subtask_status.to_dict(),
+                )
+
+        self.entry.refresh_from_db()
+        assert self.entry.task_state == FAILURE
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'failed_shards': 0, 'failed_merges': 1},
+            json.loads(self.entry.task_output),
+        )
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=5)
+    def test_not_sharded_when_small(self, _mock_current_task):
+        progress, shard_subtasks = self._queue_shards()
+        assert shard_subtasks == []
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, progress)
+
+
 # pylint: disable=protected-access
 @ddt.ddt
 class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
@@ -516,6 +745,43 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
 
         assert len(student_data) == 4
 
+    @ddt.data(None, 100)
+    def test_build_student_data_num_queries(self, max_count):
+        """
+        Ensure that the number of queries made to build the student data does
+        not grow with the number of students that answered the problems, when
+        the number of responses is unbounded or their state fits in the bound.
+        """
+        for idx in range(1, 3):
+            self.define_option_problem(f'Problem{idx}')
+
+        def num_queries():
+            with patch.dict('django.conf.settings.FEATURES', {'MAX_PROBLEM_RESPONSES_COUNT': max_count}), \
+                 CaptureQueriesContext(connection) as queries:
+                student_data, _ = ProblemResponses._build_student_data(
+                    user_id=self.instructor.id,
+                    course_key=self.course.id,
+                    usage_key_str_list=[str(self.course.location)],
+                )
+            return len(student_data), len(queries)
+
+        def answer_problems(students):
+            for student in students:
+                for idx in range(1, 3):
+                    self.submit_student_answer(student.username, f'Problem{idx}', ['Option 1'])
+
+        students = [self.create_student(f'student{ctr}') for ctr in range(5)]
+        answer_problems(students[:2])
+        # Warm up the caches that are independent of the number of students.
+        num_queries()
+        num_responses, queries_for_few_students = num_queries()
+        assert num_responses == 4
+
+        answer_problems(students[2:])
+        num_responses, queries_for_more_students = num_queries()
+        assert num_responses == 10
+        assert queries_for_more_students == queries_for_few_students
+
     @patch(
         'lms.djangoapps.instructor_task.tasks_helper.grades.list_problem_responses',
         wraps=list_problem_responses
@@ -1852,9 +2118,11 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
             self.submit_student_answer(self.student.username, 'Problem1', ['Option 1'])
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'), \
              patch('lms.djangoapps.grades.course_data.get_course_blocks') as mock_course_blocks, \
+             patch('lms.djangoapps.course_blocks.api.get_course_blocks') as mock_bulk_course_blocks, \
              patch('lms.djangoapps.grades.subsection_grade.get_score') as mock_get_score:
             CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
             assert not mock_course_blocks.called
+            assert not mock_bulk_course_blocks.called
             assert not mock_get_score.called
 
 
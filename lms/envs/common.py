@@ -1065,6 +1065,41 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_SERIALIZER
+# .. setting_default: 'pickle4'
+# .. setting_description: How split modulestore course structures are serialized in the 'course_structure_cache':
+#   'pickle4', 'pickle5' or 'bson'. Structures cached with another serializer are rewritten when they're read, so
+#   this can be changed without clearing the cache. Only 'pickle4' with the 'zlib' compressor can be read by
+#   releases which predate this setting.
+COURSE_STRUCTURE_CACHE_SERIALIZER = 'pickle4'
+
+# .. setting_name: COURSE_STRUCTURE_CACHE_COMPRESSOR
+# .. setting_default: 'zlib'
+# .. setting_description: How split modulestore course structures are compressed in the 'course_structure_cache':
+#   'none', 'zlib', 'zstd' (requires the zstandard package) or 'lz4' (requires the lz4 package). Falls back to
+#   'zlib' if the package of the compressor isn't installed. See COURSE_STRUCTURE_CACHE_SERIALIZER.
+COURSE_STRUCTURE_CACHE_COMPRESSOR = 'zlib'
+
+# .. setting_name: COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES
+# .. setting_default: 64 * 1024 * 1024
+# .. setting_description: Maximum total size, in bytes, of the published split modulestore course structures kept
+#   in memory by each process and shared across its requests, which are checked before the 'course_structure_cache'.
+#   The least recently used structures are evicted beyond it. 0 disables the process-wide cache.
+COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# .. toggle_name: MODULESTORE_QUERY_PROFILING
+# .. toggle_implementation: DjangoSetting
+# .. toggle_default: False
+# .. toggle_description: Profile the split modulestore queries made by each request and celery task: the number and
+#   duration of the structure, definition and course index queries, and the hits of the structure caches. Requests
+#   report them as custom monitoring attributes, a log line and an X-Modulestore-Profile response header; tasks log
+#   them when they complete.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warnings: The response header exposes the query counts of each view to its users, so only enable this
+#   outside of production, or briefly while investigating a slow view.
+MODULESTORE_QUERY_PROFILING = False
+
 ############################ OAUTH2 Provider ###################################
 OAUTH_EXPIRE_CONFIDENTIAL_CLIENT_DAYS = 365
 OAUTH_EXPIRE_PUBLIC_CLIENT_DAYS = 30
@@ -1593,6 +1628,19 @@ CODE_JAIL = {
     # on the /debug/run_python page, the key is 'debug_run_python').
     # Values should be dictionaries that look like 'limits'.
     "limit_overrides": {},
+
+    # Pool of warm workers executing the jailed code of capa problems, instead of a new
+    # process for each execution (see common/lib/capa/capa/safe_exec/pool.py).
+    'pool': {
+        # Maximum number of workers of each process; 0 disables the pool.
+        'size': 0,
+        # Number of executions after which a worker is replaced.
+        'max_runs': 100,
+        # Peak resident memory of an execution (in bytes) over which its worker is replaced; 0 means no threshold.
+        'max_memory': 0,
+        # Time in seconds that an execution waits for a free worker before failing.
+        'queue_timeout': 1,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -2006,6 +2054,9 @@ MIDDLEWARE = [
     # Cookie monitoring
     'openedx.core.lib.request_utils.CookieMonitoringMiddleware',
 
+    # Modulestore query profiling, see MODULESTORE_QUERY_PROFILING.
+    'openedx.core.lib.request_utils.ModulestoreProfilingMiddleware',
+
     'lms.djangoapps.mobile_api.middleware.AppVersionUpgrade',
     'openedx.core.djangoapps.header_control.middleware.HeaderControlMiddleware',
     'lms.djangoapps.discussion.django_comment_client.middleware.AjaxExceptionMiddleware',
@@ -2735,6 +2786,24 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     #   https://github.com/edx/edx-platform/pull/17760,
     #   https://openedx.atlassian.net/browse/DEPR-146
     PRUNING_ACTIVE=False,
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['SERIALIZATION_FORMAT']
+    # .. setting_default: 'zpickle'
+    # .. setting_description: Format used to serialize collected block structures into the cache
+    #   and storage. Either 'zpickle', the original zlib-compressed pickle format, or 'compact', a
+    #   versioned columnar format that is smaller and faster to deserialize. Data written in either
+    #   format can be read regardless of this setting, but only by releases that understand the
+    #   compact format: switch to 'compact' once no worker running an older release reads the
+    #   cache, or those workers will re-collect every structure written in it.
+    SERIALIZATION_FORMAT='zpickle',
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['LOCAL_CACHE_MAX_SIZE']
+    # .. setting_default: 0
+    # .. setting_description: Maximum total size, in bytes (as serialized), of the block structures
+    #   kept deserialized in each process' local LRU cache tier, which is checked before the django
+    #   cache. An entry is only used while it holds the version of the structure last collected by
+    #   any process, as recorded in the django cache. A value of 0 disables the local cache tier.
+    LOCAL_CACHE_MAX_SIZE=0,
 )
 
 ################################ Bulk Email ###################################
@@ -3478,6 +3547,13 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': None,
 }
 
+# .. setting_name: GRADE_REPORT_USERS_PER_SHARD
+# .. setting_default: 5000
+# .. setting_description: Maximum number of learners in each shard of a course grade report or problem
+#   grade report, when the `instructor_task.shard_grade_reports` course waffle flag is enabled. Shards are
+#   generated in parallel by separate celery subtasks.
+GRADE_REPORT_USERS_PER_SHARD = 5000
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': None,
@@ -223,6 +223,10 @@ CACHES = {
     },
 }
 
+# Like the course_structure_cache, the process-wide structure cache would make the number of mongo calls of a test
+# depend on the tests run before it.
+COURSE_STRUCTURE_SHARED_CACHE_MAX_BYTES = 0
+
 ############################### BLOCKSTORE #####################################
 # Blockstore tests
 RUN_BLOCKSTORE_TESTS = os.environ.get('EDXAPP_RUN_BLOCKSTORE_TESTS', 'no').lower() in ('true', 'yes', '1')
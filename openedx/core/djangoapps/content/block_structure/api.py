@@ -46,6 +46,15 @@ def clear_course_from_cache(course_key):
     get_block_structure_manager(course_key).clear()
 
 
+def clear_course_from_local_cache(course_key):
+    """
+    Removes the block structure for the given course_key from the
+    process-local cache tier only, leaving the cache and storage
+    untouched.
+    """
+    get_block_structure_manager(course_key).clear_local()
+
+
 def get_block_structure_manager(course_key):
     """
     Returns the manager for managing Block Structures for the given course.
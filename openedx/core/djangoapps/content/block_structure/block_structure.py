@@ -7,6 +7,8 @@ Module with family of classes for block structures.
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
+    _LazyTransformerDataMap - Data structure for a single block's
+        transformer data, loaded on demand.
 """
 
 
@@ -25,11 +27,33 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 TRANSFORMER_VERSION_KEY = '_version'
 
 
+def _universal_filter(block_key):  # pylint: disable=unused-argument
+    """
+    A filter function that always returns True for all blocks.
+    """
+    return True
+
+
+def _set_slots_state(instance, state):
+    """
+    Sets the given pickled state on the given instance of a class with
+    __slots__. The state may also have been pickled before the class
+    used __slots__, in which case it is a plain instance dict.
+    """
+    if isinstance(state, tuple):
+        instance_dict, slots_dict = state
+        state = dict(instance_dict or {}, **(slots_dict or {}))
+    for name, value in state.items():
+        object.__setattr__(instance, name, value)
+
+
 class _BlockRelations:
     """
     Data structure to encapsulate relationships for a single block,
     including its children and parents.
     """
+    __slots__ = ('parents', 'children')
+
     def __init__(self):
 
         # List of usage keys of this block's parents.
@@ -40,6 +64,19 @@ class _BlockRelations:
         # list [UsageKey]
         self.children = []
 
+    def __setstate__(self, state):
+        _set_slots_state(self, state)
+
+    def copy(self):
+        """
+        Returns a copy of these relations. Usage keys are immutable
+        so only the lists are copied.
+        """
+        relations = _BlockRelations.__new__(_BlockRelations)
+        relations.parents = list(self.parents)
+        relations.children = list(self.children)
+        return relations
+
 
 class BlockStructure:
     """
@@ -282,6 +319,8 @@ class FieldData:
     """
     Data structure to encapsulate collected fields.
     """
+    __slots__ = ('fields',)
+
     def class_field_names(self):
         """
         Returns list of names of fields that are defined directly
@@ -315,6 +354,17 @@ class FieldData:
         else:
             del self.fields[field_name]
 
+    def __setstate__(self, state):
+        _set_slots_state(self, state)
+
+    def __deepcopy__(self, memo):
+        # Copies the class fields directly, which is considerably faster
+        # than the generic reduce-based copy of slotted objects.
+        copied = self.__class__.__new__(self.__class__)
+        for field_name in self.class_field_names():
+            object.__setattr__(copied, field_name, deepcopy(getattr(self, field_name), memo))
+        return copied
+
     def _is_own_field(self, field_name):
         """
         Returns whether the given field_name is the name of an
@@ -327,7 +377,7 @@ class TransformerData(FieldData):
     """
     Data structure to encapsulate collected data for a transformer.
     """
-    pass  # lint-amnesty, pylint: disable=unnecessary-pass
+    __slots__ = ()
 
 
 class TransformerDataMap(dict):
@@ -376,10 +426,61 @@ class TransformerDataMap(dict):
             return key
 
 
+class _LazyTransformerDataMap(TransformerDataMap):
+    """
+    A TransformerDataMap of a single block whose entries are loaded on
+    first access from a source of not yet deserialized transformer block
+    data, shared by all blocks (and all copies) of a block structure.
+
+    The source must provide a transformer_names attribute and a
+    load(transformer_name, usage_key) method returning a new
+    TransformerData, or None if the block has no data for the
+    transformer.
+    """
+    __slots__ = ('_usage_key', '_source')
+
+    def __init__(self, usage_key, source):
+        super().__init__()
+        self._usage_key = usage_key
+        self._source = source
+
+    def __missing__(self, transformer_name):
+        transformer_data = self._source.load(transformer_name, self._usage_key)
+        if transformer_data is None:
+            raise KeyError(transformer_name)
+        dict.__setitem__(self, transformer_name, transformer_data)
+        return transformer_data
+
+    def load_all(self):
+        """
+        Loads the data of all transformers that is not yet loaded.
+        """
+        for transformer_name in self._source.transformer_names:
+            if transformer_name not in self:
+                try:
+                    self[transformer_name]
+                except KeyError:
+                    pass
+
+    def __deepcopy__(self, memo):
+        # Copies only the loaded entries, sharing the source.
+        copied = _LazyTransformerDataMap(self._usage_key, self._source)
+        for transformer_name, transformer_data in self.items():
+            dict.__setitem__(copied, transformer_name, deepcopy(transformer_data, memo))
+        return copied
+
+    def __reduce_ex__(self, protocol):
+        # Pickles as a regular TransformerDataMap with all entries loaded.
+        self.load_all()
+        return TransformerDataMap, (), None, None, iter(self.items())
+
+
 class BlockData(FieldData):
     """
     Data structure to encapsulate collected data for a single block.
     """
+    __slots__ = ('location', 'transformer_data')
+
     def class_field_names(self):
         return super().class_field_names() + ['location', 'transformer_data']
 
@@ -423,7 +524,7 @@ class BlockStructureBlockData(BlockStructure):
         from .factory import BlockStructureFactory
         return BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
+            {usage_key: relations.copy() for usage_key, relations in self._block_relations.items()},
             deepcopy(self.transformer_data),
             deepcopy(self._block_data_map),
         )
@@ -644,7 +745,7 @@ class BlockStructureBlockData(BlockStructure):
         """
         Returns a filter function that always returns True for all blocks.
         """
-        return lambda block_key: True
+        return _universal_filter
 
     def create_removal_filter(self, removal_condition, keep_descendants=False):
         """
@@ -813,6 +914,25 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         return self._xblock_map[usage_key]
 
+    def xblock_topological_traversal(self, **kwargs):
+        """
+        Performs a topological sort of the block structure and yields
+        the usage_key of each block that has an instantiated xBlock.
+
+        All blocks have instantiated xBlocks during a full collection.
+        During an incremental collection, only the blocks that are being
+        re-collected do, while the previously collected data of all
+        other blocks remains available through this block structure.
+
+        Arguments:
+            See the description of topological_traversal.
+        """
+        return (
+            usage_key
+            for usage_key in self.topological_traversal(**kwargs)
+            if usage_key in self._xblock_map
+        )
+
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
@@ -831,6 +951,29 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         self._xblock_map[usage_key] = xblock
 
+    def _reuse_collected_data(self, previous_block_structure, usage_keys_to_collect):
+        """
+        Releases the xBlocks of all blocks that are not in
+        usage_keys_to_collect and copies their data, along with the
+        structure-wide transformer data, from the given previously
+        collected block structure instead.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - The
+                previously collected block structure, which must contain
+                all blocks that are not in usage_keys_to_collect.
+
+            usage_keys_to_collect (set(UsageKey)) - Usage keys of the
+                blocks whose xBlocks are to be kept for collection.
+        """
+        self.transformer_data = deepcopy(previous_block_structure.transformer_data)
+        for usage_key in list(self._xblock_map):
+            if usage_key not in usage_keys_to_collect:
+                del self._xblock_map[usage_key]
+                self._block_data_map[usage_key] = deepcopy(
+                    previous_block_structure._block_data_map[usage_key]  # pylint: disable=protected-access
+                )
+
     def _collect_requested_xblock_fields(self):
         """
         Iterates through all instantiated xBlocks that were added and
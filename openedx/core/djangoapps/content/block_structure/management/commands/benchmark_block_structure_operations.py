@@ -0,0 +1,113 @@
+"""
+Command to measure the memory footprint and the time of common operations
+on the collected block structures of real courses.
+"""
+
+
+import logging
+import tracemalloc
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure.serialization import get_serializer
+from openedx.core.lib.command_utils import parse_course_keys
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_operations 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    args = '<course_id course_id ...>'
+    help = (
+        'Reports the memory used by the collected block structures of the given courses, and the '
+        'time taken by copy, topological_traversal and remove_block_traversal on them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Course keys of the courses to benchmark.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each operation is timed; the mean is reported.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = api.get_course_in_cache(course_key)
+            result = dict(
+                memory_kb=self._measure_memory(block_structure) / 1024,
+                copy_ms=self._time(block_structure.copy, iterations),
+                topological_traversal_ms=self._time(
+                    lambda: sum(1 for _ in block_structure.topological_traversal()),  # pylint: disable=cell-var-from-loop
+                    iterations,
+                ),
+                remove_block_traversal_ms=self._time_remove_block_traversal(block_structure, iterations),
+            )
+            self.stdout.write(
+                '{course_key}\tblocks={blocks}\tmemory_kb={memory_kb:.0f}\tcopy_ms={copy_ms:.2f}\t'
+                'topological_traversal_ms={topological_traversal_ms:.2f}\t'
+                'remove_block_traversal_ms={remove_block_traversal_ms:.2f}'.format(
+                    course_key=course_key,
+                    blocks=len(block_structure),
+                    **result
+                )
+            )
+
+    @staticmethod
+    def _measure_memory(block_structure):
+        """
+        Returns the number of bytes allocated when deserializing a new
+        instance of the given block structure with the configured
+        serialization format.
+        """
+        serializer = get_serializer()
+        serialized_data = serializer.serialize(block_structure)
+        tracemalloc.start()
+        try:
+            deserialized = serializer.deserialize(serialized_data, block_structure.root_block_usage_key)
+            memory, _ = tracemalloc.get_traced_memory()
+            del deserialized
+        finally:
+            tracemalloc.stop()
+        return memory
+
+    @staticmethod
+    def _time(operation, iterations):
+        """
+        Returns the mean time, in milliseconds, taken by the given operation.
+        """
+        start = perf_counter()
+        for _ in range(iterations):
+            operation()
+        return (perf_counter() - start) * 1000 / iterations
+
+    @staticmethod
+    def _time_remove_block_traversal(block_structure, iterations):
+        """
+        Returns the mean time, in milliseconds, taken by a
+        remove_block_traversal removing about half of the non-root blocks
+        of a copy of the given block structure. Copying is not included.
+        """
+        root_block_usage_key = block_structure.root_block_usage_key
+
+        def removal_condition(block_key):
+            return block_key != root_block_usage_key and hash(block_key) % 2
+
+        total = 0
+        for _ in range(iterations):
+            copied = block_structure.copy()
+            start = perf_counter()
+            copied.remove_block_traversal(removal_condition)
+            total += perf_counter() - start
+        return total * 1000 / iterations
@@ -0,0 +1,87 @@
+"""
+Command to compare the block structure serialization formats on real courses.
+"""
+
+
+import logging
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure.serialization import SERIALIZERS
+from openedx.core.lib.command_utils import parse_course_keys
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_serialization 'course-v1:edX+DemoX+Demo_Course' --iterations 20
+    """
+    args = '<course_id course_id ...>'
+    help = (
+        'Reports the serialized size and the serialization and deserialization times '
+        'of the collected block structures of the given courses, for each serialization format.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Course keys of the courses to benchmark.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each operation is timed; the mean is reported.',
+            default=10,
+            type=int,
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            choices=sorted(SERIALIZERS),
+            default=sorted(SERIALIZERS),
+            help='Serialization formats to benchmark.',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = api.get_course_in_cache(course_key)
+            for format_name in options['formats']:
+                result = self._benchmark(SERIALIZERS[format_name](), block_structure, iterations)
+                self.stdout.write(
+                    '{course_key}\t{format_name}\tblocks={blocks}\tbytes={size}\t'
+                    'serialize_ms={serialize_ms:.2f}\tdeserialize_ms={deserialize_ms:.2f}'.format(
+                        course_key=course_key,
+                        format_name=format_name,
+                        blocks=len(block_structure),
+                        **result
+                    )
+                )
+
+    @staticmethod
+    def _benchmark(serializer, block_structure, iterations):
+        """
+        Returns the serialized size and mean serialization and
+        deserialization times, in milliseconds, of the given block
+        structure with the given serializer.
+        """
+        start = perf_counter()
+        for _ in range(iterations):
+            serialized_data = serializer.serialize(block_structure)
+        serialize_time = perf_counter() - start
+
+        start = perf_counter()
+        for _ in range(iterations):
+            serializer.deserialize(serialized_data, block_structure.root_block_usage_key)
+        deserialize_time = perf_counter() - start
+
+        return dict(
+            size=len(serialized_data),
+            serialize_ms=serialize_time * 1000 / iterations,
+            deserialize_ms=deserialize_time * 1000 / iterations,
+        )
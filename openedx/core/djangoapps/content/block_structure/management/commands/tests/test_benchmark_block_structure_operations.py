@@ -0,0 +1,29 @@
+"""
+Tests for benchmark_block_structure_operations management command.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestBenchmarkBlockStructureOperations(ModuleStoreTestCase):
+    """
+    Tests benchmark_block_structure_operations management command.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        ItemFactory.create(parent=chapter, category='sequential')
+
+    def test_reports_operations(self):
+        out = StringIO()
+        call_command('benchmark_block_structure_operations', str(self.course.id), '--iterations', '1', stdout=out)
+        line, = out.getvalue().splitlines()
+        assert line.startswith(f'{self.course.id}\tblocks=3\tmemory_kb=')
+        for operation in ('copy', 'topological_traversal', 'remove_block_traversal'):
+            assert f'\t{operation}_ms=' in line
@@ -0,0 +1,31 @@
+"""
+Tests for benchmark_block_structure_serialization management command.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ...serialization import SERIALIZERS
+
+
+class TestBenchmarkBlockStructureSerialization(ModuleStoreTestCase):
+    """
+    Tests benchmark_block_structure_serialization management command.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        ItemFactory.create(parent=chapter, category='sequential')
+
+    def test_reports_each_format(self):
+        out = StringIO()
+        call_command('benchmark_block_structure_serialization', str(self.course.id), '--iterations', '1', stdout=out)
+        lines = out.getvalue().splitlines()
+        assert len(lines) == len(SERIALIZERS)
+        for line, format_name in zip(lines, sorted(SERIALIZERS)):
+            assert line.startswith(f'{self.course.id}\t{format_name}\tblocks=3\t')
@@ -5,13 +5,21 @@ BlockStructures.
 
 
 from contextlib import contextmanager
+from logging import getLogger
 
 from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
+from .transformer_registry import TransformerRegistry
 from .transformers import BlockStructureTransformers
 
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Name of the xBlock field whose value identifies the version of the
+# structure in which a block was last changed.
+UPDATE_VERSION_FIELD = 'update_version'
+
 
 class BlockStructureManager:
     """
@@ -121,13 +129,120 @@ class BlockStructureManager:
         the modulestore.
         """
         with self._bulk_operations():
+            block_structure = None
+            if config.INCREMENTAL_COLLECT.is_enabled():
+                block_structure = self._collect_incrementally()
+            if block_structure is None:
+                block_structure = BlockStructureFactory.create_from_modulestore(
+                    self.root_block_usage_key,
+                    self.modulestore,
+                )
+                self._collect(block_structure)
+            self.store.add(block_structure)
+            return block_structure
+
+    def _collect_incrementally(self):
+        """
+        Returns a newly collected block structure for which only the
+        blocks that changed since the block structure in the store was
+        collected are re-collected from the modulestore.
+
+        Returns None if incremental collection is not possible, in which
+        case the caller is expected to collect the whole block structure.
+        """
+        registered_transformers = TransformerRegistry.get_registered_transformers()
+        # Transformers from other packages don't necessarily extend
+        # BlockStructureTransformer, so the attributes may be missing.
+        if not all(getattr(transformer, 'INCREMENTAL_COLLECT', False) for transformer in registered_transformers):
+            return None
+
+        try:
+            previous_block_structure = BlockStructureFactory.create_from_store(
+                self.root_block_usage_key,
+                self.store,
+            )
+        except BlockStructureNotFound:
+            return None
+
+        if any(
+            previous_block_structure._get_transformer_data_version(transformer) != transformer.WRITE_VERSION  # pylint: disable=protected-access
+            for transformer in registered_transformers
+        ):
+            return None
+
+        try:
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore,
+                lazy=True,
             )
-            BlockStructureTransformers.collect(block_structure)
-            self.store.add(block_structure)
-            return block_structure
+            usage_keys_to_collect = self._get_usage_keys_to_collect(
+                block_structure,
+                previous_block_structure,
+                include_ancestors=any(
+                    getattr(transformer, 'COLLECT_DEPENDS_ON_DESCENDANTS', False)
+                    for transformer in registered_transformers
+                ),
+            )
+            block_structure._reuse_collected_data(previous_block_structure, usage_keys_to_collect)  # pylint: disable=protected-access
+            self._collect(block_structure)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(
+                'BlockStructure: incremental collection failed for %s; collecting all blocks instead.',
+                self.root_block_usage_key,
+            )
+            return None
+
+        logger.info(
+            'BlockStructure: incrementally collected %d of %d blocks for %s.',
+            len(usage_keys_to_collect),
+            len(block_structure),
+            self.root_block_usage_key,
+        )
+        return block_structure
+
+    @staticmethod
+    def _get_usage_keys_to_collect(block_structure, previous_block_structure, include_ancestors):
+        """
+        Returns the set of usage keys of the blocks in the given newly
+        created block structure that are to be re-collected: the blocks
+        that are new, whose relations changed or whose update_version
+        differs from the previously collected one, along with all of
+        their descendants, since a block inherits the field values of
+        its ancestors.  If include_ancestors is True, the ancestors of
+        these blocks are included as well.
+        """
+        usage_keys_to_collect = set()
+        for usage_key in block_structure.topological_traversal():
+            update_version = getattr(block_structure.get_xblock(usage_key), UPDATE_VERSION_FIELD, None)
+            parents = block_structure.get_parents(usage_key)
+            if (
+                usage_key not in previous_block_structure or
+                update_version is None or
+                update_version != previous_block_structure.get_xblock_field(usage_key, UPDATE_VERSION_FIELD) or
+                block_structure.get_children(usage_key) != previous_block_structure.get_children(usage_key) or
+                set(parents) != set(previous_block_structure.get_parents(usage_key)) or
+                any(parent_key in usage_keys_to_collect for parent_key in parents)
+            ):
+                usage_keys_to_collect.add(usage_key)
+
+        if include_ancestors:
+            for usage_key in block_structure.post_order_traversal():
+                if any(child_key in usage_keys_to_collect for child_key in block_structure.get_children(usage_key)):
+                    usage_keys_to_collect.add(usage_key)
+
+        return usage_keys_to_collect
+
+    @staticmethod
+    def _collect(block_structure):
+        """
+        Collects data for each registered transformer into the given
+        block structure.
+        """
+        if config.INCREMENTAL_COLLECT.is_enabled():
+            # Needed to identify the changed blocks at the next collection.
+            block_structure.request_xblock_fields(UPDATE_VERSION_FIELD)
+        BlockStructureTransformers.collect(block_structure)
 
     def clear(self):
         """
@@ -136,6 +251,13 @@ class BlockStructureManager:
         """
         self.store.delete(self.root_block_usage_key)
 
+    def clear_local(self):
+        """
+        Removes data for the block structure associated with the given
+        root block key from the process-local cache only.
+        """
+        self.store.delete_local(self.root_block_usage_key)
+
     @contextmanager
     def _bulk_operations(self):
         """
@@ -0,0 +1,446 @@
+"""
+Module for the serialization formats of BlockStructure objects.
+
+The following serializers are implemented:
+    ZPickleSerializer - The original format: a zlib-compressed pickle of
+        the structure's internal relations and data maps.
+    CompactSerializer - A versioned, compact format with an interned
+        usage key table, integer-indexed adjacency arrays and columnar
+        storage of collected block fields, split into segments that are
+        deserialized lazily per transformer.
+
+Serialized data is prefixed with a header identifying its serializer and
+format version (except for the original zpickle format, which predates
+the header), so data written in any known format can be read regardless
+of the format currently configured for writing.
+"""
+# pylint: disable=protected-access
+
+
+import pickle
+import zlib
+from array import array
+from copy import deepcopy
+
+from django.conf import settings
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations, _LazyTransformerDataMap
+from .exceptions import BlockStructureException
+
+# Leading bytes of every serialized payload written with a header. The
+# original zpickle format always starts with a zlib header byte (0x78),
+# so it can never be confused with a headed payload.
+HEADER_MAGIC = b'BS'
+HEADER_LENGTH = len(HEADER_MAGIC) + 2
+
+# Typecode of the arrays used to store integer block ids (32-bit
+# unsigned integers on all supported platforms).
+BLOCK_ID_TYPECODE = 'I'
+
+
+class BlockStructureSerializer:
+    """
+    Base class for a serialization format of BlockStructureBlockData
+    objects.
+
+    Subclasses must define a unique FORMAT_ID and implement the
+    _encode and _decode methods.
+    """
+    # A unique single-byte identifier of the serialization format.
+    FORMAT_ID = None
+
+    # The current version of the serialization format. Incrementally
+    # update this value whenever the encoded data changes in an
+    # incompatible way.
+    VERSION = 1
+
+    def serialize(self, block_structure):
+        """
+        Returns the serialized bytes for the given block structure.
+        """
+        return self._header() + self._encode(block_structure)
+
+    def deserialize(self, serialized_data, root_block_usage_key):
+        """
+        Returns the BlockStructureBlockData deserialized from the given
+        data, which must have been serialized with this format.
+        """
+        version = serialized_data[HEADER_LENGTH - 1]
+        if version != self.VERSION:
+            raise BlockStructureException(
+                f'Unsupported version {version} of block structure serialization format {self.FORMAT_ID}.'
+            )
+        return self._decode(memoryview(serialized_data)[HEADER_LENGTH:], root_block_usage_key)
+
+    def _header(self):
+        """
+        Returns the header identifying this format and its version.
+        """
+        return HEADER_MAGIC + bytes((self.FORMAT_ID, self.VERSION))
+
+    def _encode(self, block_structure):
+        """
+        Returns the encoded bytes for the given block structure.
+        """
+        raise NotImplementedError
+
+    def _decode(self, encoded_data, root_block_usage_key):
+        """
+        Returns the block structure decoded from the given bytes.
+        """
+        raise NotImplementedError
+
+
+class ZPickleSerializer(BlockStructureSerializer):
+    """
+    The original serialization format: a zlib-compressed pickle of the
+    tuple (block relations, transformer data, block data map).
+
+    For backward compatibility, data in this format is written without
+    a header.
+    """
+    FORMAT_ID = 0
+
+    def serialize(self, block_structure):
+        return self._encode(block_structure)
+
+    def deserialize(self, serialized_data, root_block_usage_key):
+        return self._decode(serialized_data, root_block_usage_key)
+
+    def _encode(self, block_structure):
+        return zpickle((
+            block_structure._block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        ))
+
+    def _decode(self, encoded_data, root_block_usage_key):
+        from .factory import BlockStructureFactory
+        block_relations, transformer_data, block_data_map = zunpickle(encoded_data)
+        return BlockStructureFactory.create_new(
+            root_block_usage_key,
+            block_relations,
+            transformer_data,
+            block_data_map,
+        )
+
+
+class CompactSerializer(BlockStructureSerializer):
+    """
+    A compact serialization format for block structures.
+
+    Rather than pickling a graph of per-block Python objects, the
+    structure is flattened into a handful of plain containers before
+    being pickled and compressed:
+
+        * Usage keys are interned into a single table, and blocks are
+          referred to by their integer index in the table everywhere
+          else.
+        * Parents and children are stored as integer arrays in
+          compressed sparse row form (an offsets array and a flat
+          indices array).
+        * Collected xBlock fields and block-specific transformer fields
+          are stored in columns, one per field, each holding the ids of
+          the blocks that have the field and their respective values.
+
+    This avoids pickling and unpickling thousands of BlockData,
+    TransformerData and _BlockRelations instances, each with their own
+    instance dictionaries.
+
+    The encoded data is split into independently compressed segments:
+    one for the relations and xBlock fields, one for the transformers'
+    structure-wide data and one per transformer for its block-specific
+    data. Only the first two are decoded upfront; a transformer's block
+    data segment is decoded the first time any block's data for that
+    transformer is accessed, so consumers only pay for the transformer
+    data they actually read.
+    """
+    FORMAT_ID = 1
+    VERSION = 2
+
+    # Pickle protocol used for the encoded containers.
+    PICKLE_PROTOCOL = 4
+
+    def _encode(self, block_structure):
+        block_relations = block_structure._block_relations
+        block_data_map = block_structure._block_data_map
+
+        # Intern the usage keys. Blocks with relations come first so
+        # their ids coincide with their position in the adjacency arrays.
+        usage_keys = list(block_relations)
+        block_ids = {usage_key: block_id for block_id, usage_key in enumerate(usage_keys)}
+        for usage_key in block_data_map:
+            if usage_key not in block_ids:
+                block_ids[usage_key] = len(usage_keys)
+                usage_keys.append(usage_key)
+
+        child_offsets, child_ids = self._encode_adjacency(
+            (block_relations[usage_key].children for usage_key in block_relations), block_ids,
+        )
+        parent_offsets, parent_ids = self._encode_adjacency(
+            (block_relations[usage_key].parents for usage_key in block_relations), block_ids,
+        )
+
+        xblock_fields = {}
+        transformer_block_fields = {}
+        for usage_key, block_data in block_data_map.items():
+            block_id = block_ids[usage_key]
+            self._add_to_columns(xblock_fields, block_id, block_data.fields)
+            if isinstance(block_data.transformer_data, _LazyTransformerDataMap):
+                block_data.transformer_data.load_all()
+            for transformer_name, transformer_block_data in block_data.transformer_data.items():
+                self._add_to_columns(
+                    transformer_block_fields.setdefault(transformer_name, {}),
+                    block_id,
+                    transformer_block_data.fields,
+                )
+
+        core_segment = (
+            usage_keys,
+            len(block_relations),
+            child_offsets,
+            child_ids,
+            parent_offsets,
+            parent_ids,
+            array(BLOCK_ID_TYPECODE, (block_ids[usage_key] for usage_key in block_data_map)),
+            xblock_fields,
+        )
+        transformer_data_segment = {
+            transformer_name: transformer_data.fields
+            for transformer_name, transformer_data in block_structure.transformer_data.items()
+        }
+        return pickle.dumps(
+            (
+                self._encode_segment(core_segment),
+                self._encode_segment(transformer_data_segment),
+                {
+                    transformer_name: self._encode_segment(columns)
+                    for transformer_name, columns in transformer_block_fields.items()
+                },
+            ),
+            self.PICKLE_PROTOCOL,
+        )
+
+    def _decode(self, encoded_data, root_block_usage_key):
+        from .factory import BlockStructureFactory
+        core_segment, transformer_data_segment, transformer_block_segments = pickle.loads(encoded_data)
+        (
+            usage_keys,
+            num_related_blocks,
+            child_offsets,
+            child_ids,
+            parent_offsets,
+            parent_ids,
+            data_block_ids,
+            xblock_fields,
+        ) = self._decode_segment(core_segment)
+
+        block_relations = {}
+        for block_id in range(num_related_blocks):
+            relations = _BlockRelations()
+            relations.children = [
+                usage_keys[child_id]
+                for child_id in child_ids[child_offsets[block_id]:child_offsets[block_id + 1]]
+            ]
+            relations.parents = [
+                usage_keys[parent_id]
+                for parent_id in parent_ids[parent_offsets[block_id]:parent_offsets[block_id + 1]]
+            ]
+            block_relations[usage_keys[block_id]] = relations
+
+        transformer_block_data_source = _TransformerBlockDataSegments(usage_keys, transformer_block_segments)
+        block_data_map = {}
+        block_data_by_id = {}
+        for block_id in data_block_ids:
+            usage_key = usage_keys[block_id]
+            block_data = _new_field_data(
+                BlockData,
+                {},
+                location=usage_key,
+                transformer_data=_LazyTransformerDataMap(usage_key, transformer_block_data_source),
+            )
+            block_data_map[usage_key] = block_data
+            block_data_by_id[block_id] = block_data
+
+        for field_name, (block_ids, values) in xblock_fields.items():
+            for block_id, value in zip(block_ids, values):
+                block_data_by_id[block_id].fields[field_name] = value
+
+        transformer_data = TransformerDataMap()
+        for transformer_name, fields in self._decode_segment(transformer_data_segment).items():
+            dict.__setitem__(transformer_data, transformer_name, _new_field_data(TransformerData, fields))
+
+        return BlockStructureFactory.create_new(
+            root_block_usage_key,
+            block_relations,
+            transformer_data,
+            block_data_map,
+        )
+
+    @classmethod
+    def _encode_segment(cls, segment):
+        """
+        Returns the compressed pickle of the given segment.
+        """
+        return zlib.compress(pickle.dumps(segment, cls.PICKLE_PROTOCOL))
+
+    @staticmethod
+    def _decode_segment(encoded_segment):
+        """
+        Returns the segment decoded from the given compressed pickle.
+        """
+        return pickle.loads(zlib.decompress(encoded_segment))
+
+    @staticmethod
+    def _encode_adjacency(adjacency_lists, block_ids):
+        """
+        Returns the given lists of usage keys in compressed sparse row
+        form: an array of offsets into a flat array of block ids.
+        """
+        offsets = array(BLOCK_ID_TYPECODE, [0])
+        flat_ids = array(BLOCK_ID_TYPECODE)
+        for usage_key_list in adjacency_lists:
+            flat_ids.extend(block_ids[usage_key] for usage_key in usage_key_list)
+            offsets.append(len(flat_ids))
+        return offsets, flat_ids
+
+    @staticmethod
+    def _add_to_columns(columns, block_id, fields):
+        """
+        Adds the given block's fields to the given map of field name to
+        (block ids, values) columns.
+        """
+        for field_name, value in fields.items():
+            try:
+                block_ids, values = columns[field_name]
+            except KeyError:
+                block_ids, values = columns[field_name] = (array(BLOCK_ID_TYPECODE), [])
+            block_ids.append(block_id)
+            values.append(value)
+
+
+class _TransformerBlockDataSegments:
+    """
+    The source of the block-specific transformer data of a block
+    structure deserialized by the CompactSerializer, shared by the
+    _LazyTransformerDataMap of each of its blocks.
+
+    Each transformer's segment is decoded once, on first access, and
+    every block then receives its own copy of its fields, so that the
+    decoded data can be safely shared by all copies of the structure.
+    """
+    def __init__(self, usage_keys, encoded_segments):
+        self._usage_keys = usage_keys
+        self._encoded_segments = encoded_segments
+        # dict {transformer name: dict {UsageKey: fields dict}}
+        self._decoded_segments = {}
+
+    @property
+    def transformer_names(self):
+        """
+        Returns the names of the transformers with block data.
+        """
+        return self._encoded_segments.keys()
+
+    def load(self, transformer_name, usage_key):
+        """
+        Returns a new TransformerData with the given transformer's data
+        for the given block, or None if the block has no such data.
+        """
+        try:
+            decoded_segment = self._decoded_segments[transformer_name]
+        except KeyError:
+            try:
+                encoded_segment = self._encoded_segments[transformer_name]
+            except KeyError:
+                return None
+            decoded_segment = self._decoded_segments[transformer_name] = self._decode(encoded_segment)
+
+        fields = decoded_segment.get(usage_key)
+        if fields is None:
+            return None
+        return _new_field_data(TransformerData, deepcopy(fields))
+
+    def _decode(self, encoded_segment):
+        """
+        Returns the map of usage key to fields decoded from the given
+        segment of field columns.
+        """
+        fields_by_usage_key = {}
+        for field_name, (block_ids, values) in CompactSerializer._decode_segment(encoded_segment).items():
+            for block_id, value in zip(block_ids, values):
+                fields_by_usage_key.setdefault(self._usage_keys[block_id], {})[field_name] = value
+        return fields_by_usage_key
+
+    def __deepcopy__(self, memo):
+        # The decoded data is never handed out directly, so it is shared.
+        return self
+
+
+def _new_field_data(field_data_class, fields, **class_fields):
+    """
+    Returns a new instance of the given FieldData subclass with the given
+    fields dict and class fields, bypassing the per-attribute overhead of
+    FieldData.__setattr__.
+    """
+    field_data = field_data_class.__new__(field_data_class)
+    object.__setattr__(field_data, 'fields', fields)
+    for name, value in class_fields.items():
+        object.__setattr__(field_data, name, value)
+    return field_data
+
+
+SERIALIZERS = {
+    'zpickle': ZPickleSerializer,
+    'compact': CompactSerializer,
+}
+
+DEFAULT_SERIALIZATION_FORMAT = 'zpickle'
+
+
+def get_serializer(format_name=None):
+    """
+    Returns the serializer for the given format name. If no name is
+    given, the format configured in
+    BLOCK_STRUCTURES_SETTINGS['SERIALIZATION_FORMAT'] is used.
+    """
+    if format_name is None:
+        format_name = settings.BLOCK_STRUCTURES_SETTINGS.get('SERIALIZATION_FORMAT', DEFAULT_SERIALIZATION_FORMAT)
+    try:
+        return SERIALIZERS[format_name]()
+    except KeyError:
+        raise BlockStructureException(  # lint-amnesty, pylint: disable=raise-missing-from
+            f'Unknown block structure serialization format: {format_name}'
+        )
+
+
+def get_serializer_for_data(serialized_data):
+    """
+    Returns the serializer that is able to deserialize the given data,
+    as identified by the data's header.
+    """
+    if serialized_data[:len(HEADER_MAGIC)] != HEADER_MAGIC:
+        return ZPickleSerializer()
+
+    format_id = serialized_data[len(HEADER_MAGIC)]
+    for serializer_class in SERIALIZERS.values():
+        if serializer_class.FORMAT_ID == format_id:
+            return serializer_class()
+    raise BlockStructureException(f'Unknown block structure serialization format id: {format_id}')
+
+
+def serialize(block_structure):
+    """
+    Serializes the given block structure using the configured format.
+    """
+    return get_serializer().serialize(block_structure)
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Deserializes the given data, in any known format, and returns the
+    parsed block structure.
+    """
+    return get_serializer_for_data(serialized_data).deserialize(serialized_data, root_block_usage_key)
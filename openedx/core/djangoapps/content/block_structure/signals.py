@@ -11,7 +11,7 @@ from opaque_keys.edx.locator import LibraryLocator
 from xmodule.modulestore.django import SignalHandler
 
 from . import config
-from .api import clear_course_from_cache
+from .api import clear_course_from_cache, clear_course_from_local_cache
 from .models import BlockStructureNotFound
 from .tasks import update_course_in_cache_v2
 
@@ -28,6 +28,8 @@ def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # p
     if isinstance(course_key, LibraryLocator):
         return
 
+    clear_course_from_local_cache(course_key)
+
     if config.INVALIDATE_CACHE_ON_PUBLISH.is_enabled():
         try:
             clear_course_from_cache(course_key)
@@ -4,16 +4,18 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 
 
+from collections import OrderedDict
 from logging import getLogger
+from threading import Lock
+from uuid import uuid4
 
+from django.conf import settings
 from django.utils.encoding import python_2_unicode_compatible
+from edx_django_utils import monitoring as monitoring_utils
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
-
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
-from .factory import BlockStructureFactory
 from .models import BlockStructureModel
 from .transformer_registry import TransformerRegistry
 
@@ -28,8 +30,10 @@ class StubModel:
     conditional statements in the code.
     """
 
-    def __init__(self, root_block_usage_key):
+    def __init__(self, root_block_usage_key, **version_data):
         self.data_usage_key = root_block_usage_key
+        for field_name, value in version_data.items():
+            setattr(self, field_name, value)
 
     def __str__(self):
         return str(self.data_usage_key)
@@ -41,6 +45,105 @@ class StubModel:
         pass  # lint-amnesty, pylint: disable=unnecessary-pass
 
 
+class LocalBlockStructureCache:
+    """
+    Process-local, size-bounded LRU cache of deserialized block
+    structures, used as a tier in front of the django cache.
+
+    Entries are kept per root block usage key along with the version of
+    the structure they hold, as recorded in the django cache by whichever
+    process last collected the structure. An entry is only returned for
+    the current version, so a structure collected after a publish in
+    another process is never shadowed by a stale entry.
+
+    Callers are handed copies of the cached structures, which are never
+    modified. The size of an entry is that of its serialized data.
+    """
+    def __init__(self):
+        # Map of root block usage key to (version, block structure, size).
+        # OrderedDict {UsageKey: (string, BlockStructureBlockData, int)}
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def max_size():
+        """
+        Returns the maximum total size, in bytes, of the cached data.
+        A value of 0 disables the cache.
+        """
+        return settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_SIZE', 0)
+
+    def get(self, root_block_usage_key, version):
+        """
+        Returns the block structure cached for the given root block usage
+        key and version, or None if not found.
+        """
+        if not self.max_size():
+            return None
+
+        with self._lock:
+            entry = self._entries.get(root_block_usage_key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(root_block_usage_key)
+                block_structure = entry[1]
+            else:
+                block_structure = None
+
+        monitoring_utils.increment(
+            'block_structure.local_cache.{}'.format('hit' if block_structure is not None else 'miss')
+        )
+        return block_structure
+
+    def set(self, root_block_usage_key, version, block_structure, size):
+        """
+        Caches the given block structure, of the given version and
+        serialized size, for the given root block usage key, evicting the
+        least recently used entries as needed to stay within the maximum
+        size.
+        """
+        max_size = self.max_size()
+        if size > max_size:
+            self.delete(root_block_usage_key)
+            return
+
+        with self._lock:
+            self._pop(root_block_usage_key)
+            self._entries[root_block_usage_key] = (version, block_structure, size)
+            self._size += size
+            while self._size > max_size:
+                self._pop(next(iter(self._entries)))
+                monitoring_utils.increment('block_structure.local_cache.eviction')
+
+    def delete(self, root_block_usage_key):
+        """
+        Removes any entry for the given root block usage key.
+        """
+        with self._lock:
+            self._pop(root_block_usage_key)
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _pop(self, root_block_usage_key):
+        """
+        Removes any entry for the given root block usage key. Must be
+        called with the lock held.
+        """
+        entry = self._entries.pop(root_block_usage_key, None)
+        if entry:
+            self._size -= entry[2]
+
+
+# The process-wide tier of cached block structures.
+local_cache = LocalBlockStructureCache()
+
+
 class BlockStructureStore:
     """
     Storage for BlockStructure objects.
@@ -57,8 +160,9 @@ class BlockStructureStore:
 
     def add(self, block_structure):
         """
-        Stores and caches a compressed and pickled serialization of
-        the given block structure.
+        Stores and caches a serialization of the given block structure,
+        in the format configured by
+        BLOCK_STRUCTURES_SETTINGS['SERIALIZATION_FORMAT'].
 
         The data stored includes the structure's
         block relations, transformer data, and block data.
@@ -71,11 +175,18 @@ class BlockStructureStore:
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        local_cache.delete(block_structure.root_block_usage_key)
+        self._set_version(bs_model)
 
     def get(self, root_block_usage_key):
         """
         Deserializes and returns the block structure starting at
-        root_block_usage_key, if found in the cache or storage.
+        root_block_usage_key, if found in the process-local cache, the
+        cache or storage.
+
+        The version of the structure last added is looked up in the
+        cache first, and a structure of that version in the
+        process-local cache is returned without querying storage.
 
         The given root_block_usage_key must equate the
         root_block_usage_key previously passed to the `add` method.
@@ -93,15 +204,30 @@ class BlockStructureStore:
             BlockStructureNotFound if the root_block_usage_key is not
             found.
         """
-        bs_model = self._get_model(root_block_usage_key)
+        version = None
+        if local_cache.max_size():
+            version = self._cache.get(self._encode_version_cache_key(root_block_usage_key))
+            if version is not None:
+                block_structure = local_cache.get(root_block_usage_key, version)
+                if block_structure is not None:
+                    return block_structure.copy()
 
+        bs_model = self._get_model(root_block_usage_key)
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        if local_cache.max_size():
+            if version is None and config.STORAGE_BACKING_FOR_CACHE.is_enabled():
+                # The version recorded in the cache expired; storage has it.
+                version = self._set_version(bs_model)
+            if version is not None:
+                local_cache.set(root_block_usage_key, version, block_structure, len(serialized_data))
+                return block_structure.copy()
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -112,11 +238,20 @@ class BlockStructureStore:
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be removed.
         """
+        local_cache.delete(root_block_usage_key)
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        self._cache.delete(self._encode_version_cache_key(root_block_usage_key))
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
+    def delete_local(self, root_block_usage_key):
+        """
+        Deletes the block structure for the given root_block_usage_key
+        from the process-local cache only.
+        """
+        local_cache.delete(root_block_usage_key)
+
     def is_up_to_date(self, root_block_usage_key, modulestore):
         """
         Returns whether the data in storage for the given key is
@@ -155,7 +290,8 @@ class BlockStructureStore:
             )
             return bs_model
         else:
-            return StubModel(block_structure.root_block_usage_key)
+            root_block = block_structure[block_structure.root_block_usage_key]
+            return StubModel(block_structure.root_block_usage_key, **self._version_data_of_block(root_block))
 
     def _add_to_cache(self, serialized_data, bs_model):
         """
@@ -166,6 +302,25 @@ class BlockStructureStore:
         self._cache.set(cache_key, serialized_data, timeout=config.cache_timeout_in_seconds())
         logger.info("BlockStructure: Added to cache; %s, size: %d", bs_model, len(serialized_data))
 
+    def _set_version(self, bs_model):
+        """
+        Records the version of the given BlockStructureModel or StubModel
+        in the cache, as the current version of its block structure, and
+        returns it.
+        """
+        version_data = self._version_data_of_model(bs_model)
+        if version_data['data_version'] is None:
+            # Courses in the old mongo modulestore have no version, so
+            # tell each collection of their structure apart instead.
+            version_data['data_version'] = uuid4().hex
+        version = '.'.join(str(value) for value in version_data.values())
+        self._cache.set(
+            self._encode_version_cache_key(bs_model.data_usage_key),
+            version,
+            timeout=config.cache_timeout_in_seconds(),
+        )
+        return version
+
     def _get_from_cache(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
@@ -195,35 +350,25 @@ class BlockStructureStore:
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, using the
+        configured serialization format.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        return zpickle(data_to_cache)
+        return serialization.serialize(block_structure)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
-        Deserializes the given data and returns the parsed block_structure.
+        Deserializes the given data, in any known serialization format,
+        and returns the parsed block_structure.
         """
-
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            return serialization.deserialize(serialized_data, root_block_usage_key)
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
+            local_cache.delete(root_block_usage_key)
             bs_model = self._get_model(root_block_usage_key)
             logger.exception("BlockStructure: Failed to load data from cache for %s", bs_model)
             raise BlockStructureNotFound(bs_model.data_usage_key)  # lint-amnesty, pylint: disable=raise-missing-from
 
-        return BlockStructureFactory.create_new(
-            root_block_usage_key,
-            block_relations,
-            transformer_data,
-            block_data_map,
-        )
-
     @staticmethod
     def _encode_root_cache_key(bs_model):
         """
@@ -237,6 +382,17 @@ class BlockStructureStore:
             root_usage_key=str(bs_model.data_usage_key),
         )
 
+    @staticmethod
+    def _encode_version_cache_key(root_block_usage_key):
+        """
+        Returns the cache key of the current version of the block
+        structure for the given root block usage key.
+        """
+        return "v{version}.root.version.{root_usage_key}".format(
+            version=str(BlockStructureBlockData.VERSION),
+            root_usage_key=str(root_block_usage_key),
+        )
+
     @staticmethod
     def _version_data_of_block(root_block):
         """
@@ -14,7 +14,7 @@ import ddt
 
 from openedx.core.lib.graph_traversals import traverse_post_order
 
-from ..block_structure import BlockStructure, BlockStructureModulestoreData
+from ..block_structure import BlockData, BlockStructure, BlockStructureModulestoreData, _BlockRelations
 from ..exceptions import TransformerException
 from .helpers import ChildrenMapTestMixin, MockTransformer, MockXBlock
 
@@ -292,3 +292,23 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         assert _get_value(block_structure) == 'edit1'
         assert _get_value(new_copy) == 'edit2'
+
+    def test_copy_mutable_field_values(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
+        block_structure.override_xblock_field(1, 'mutable', ['original_value'])
+        new_copy = block_structure.copy()
+        new_copy.get_xblock_field(1, 'mutable').append('edit')
+        assert block_structure.get_xblock_field(1, 'mutable') == ['original_value']
+        assert new_copy.get_xblock_field(1, 'mutable') == ['original_value', 'edit']
+
+    def test_unpickle_without_slots(self):
+        # Simulates data pickled before the block data classes used __slots__.
+        block_relations = _BlockRelations.__new__(_BlockRelations)
+        block_relations.__setstate__({'parents': [0], 'children': [2]})
+        assert block_relations.parents == [0]
+        assert block_relations.children == [2]
+
+        block_data = BlockData.__new__(BlockData)
+        block_data.__setstate__({'fields': {'display_name': 'name'}, 'location': 1, 'transformer_data': {}})
+        assert block_data.location == 1
+        assert block_data.display_name == 'name'
@@ -8,7 +8,7 @@ from django.test import TestCase
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE
+from ..config import INCREMENTAL_COLLECT, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -94,6 +94,35 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + str(block_key)
 
 
+class IncrementalTestTransformer(MockTransformer):
+    """
+    Test Transformer class that supports incremental collection and
+    records the blocks whose xBlocks it collected.
+    """
+    INCREMENTAL_COLLECT = True
+    collected_block_keys = None
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects the display names of the blocks with instantiated xBlocks.
+        """
+        cls.collected_block_keys = set()
+        for block_key in block_structure.xblock_topological_traversal():
+            cls.collected_block_keys.add(block_key)
+            block_structure.set_transformer_block_field(
+                block_key, cls, 'display_name', block_structure.get_xblock(block_key).display_name,
+            )
+
+
+class DescendantsIncrementalTestTransformer(IncrementalTestTransformer):
+    """
+    Test Transformer class that supports incremental collection of data
+    depending on the blocks' descendants.
+    """
+    COLLECT_DEPENDS_ON_DESCENDANTS = True
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -128,7 +157,8 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             assert self.modulestore.get_items_call_count > 0
         else:
             assert self.modulestore.get_items_call_count == 0
-        expected_count = 1 if expect_cache_updated else 0
+        # The serialized block structure and its version are cached.
+        expected_count = 2 if expect_cache_updated else 0
         assert self.cache.set_call_count == expected_count
 
     def test_get_transformed(self):
@@ -226,3 +256,92 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         assert TestTransformer1.collect_call_count == 2
+
+
+@ddt.ddt
+class TestIncrementalCollect(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Test class for the incremental collection of BlockStructureManager.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.modulestore = MockModulestoreFactory.create(self.children_map, self.block_key_factory)
+        for block_id in range(len(self.children_map)):
+            self.update_block(block_id, 'v1')
+        self.bs_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, MockCache())
+
+    def update_block(self, block_id, update_version):
+        """
+        Updates the display name and update version of the given block in
+        the mock modulestore.
+        """
+        xblock = self.modulestore.blocks[self.block_key_factory(block_id)]
+        xblock.field_map['display_name'] = f'Block {block_id} {update_version}'
+        xblock.field_map['update_version'] = update_version
+
+    def collect(self, registered_transformers):
+        """
+        Updates the collected block structure and returns the ids of the
+        blocks collected by IncrementalTestTransformer.
+        """
+        with override_waffle_switch(INCREMENTAL_COLLECT, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager._update_collected()  # pylint: disable=protected-access
+        return {
+            block_id for block_id in range(len(self.children_map))
+            if self.block_key_factory(block_id) in IncrementalTestTransformer.collected_block_keys
+        }
+
+    def assert_collected_display_names(self, registered_transformers):
+        """
+        Verifies the collected display names of all blocks are up to date.
+        """
+        with mock_registered_transformers(registered_transformers):
+            block_structure = self.bs_manager.get_collected()
+        for block_id in range(len(self.children_map)):
+            block_key = self.block_key_factory(block_id)
+            assert block_structure.get_transformer_block_field(block_key, IncrementalTestTransformer, 'display_name') ==\
+                self.modulestore.blocks[block_key].display_name
+
+    @ddt.data(
+        (IncrementalTestTransformer, 1, {1, 3, 4}),
+        (IncrementalTestTransformer, 4, {4}),
+        (IncrementalTestTransformer, 0, {0, 1, 2, 3, 4}),
+        (DescendantsIncrementalTestTransformer, 1, {0, 1, 3, 4}),
+        (DescendantsIncrementalTestTransformer, 4, {0, 1, 4}),
+    )
+    @ddt.unpack
+    def test_changed_block(self, transformer_class, changed_block_id, expected_collected):
+        transformers = [transformer_class()]
+        assert self.collect(transformers) == {0, 1, 2, 3, 4}
+        assert self.collect(transformers) == set()
+
+        self.update_block(changed_block_id, 'v2')
+        assert self.collect(transformers) == expected_collected
+        self.assert_collected_display_names(transformers)
+
+    def test_changed_relations(self):
+        assert self.collect([IncrementalTestTransformer()]) == {0, 1, 2, 3, 4}
+        self.modulestore.blocks[self.block_key_factory(1)].children.remove(self.block_key_factory(4))
+        self.modulestore.blocks[self.block_key_factory(2)].children.append(self.block_key_factory(4))
+        assert self.collect([IncrementalTestTransformer()]) == {1, 2, 3, 4}
+
+    def test_transformer_without_incremental_collect(self):
+        TestTransformer1.collect_call_count = 0
+        transformers = [IncrementalTestTransformer(), TestTransformer1()]
+        assert self.collect(transformers) == {0, 1, 2, 3, 4}
+        assert self.collect(transformers) == {0, 1, 2, 3, 4}
+        assert TestTransformer1.collect_call_count == 2
+
+    def test_without_update_version(self):
+        assert self.collect([IncrementalTestTransformer()]) == {0, 1, 2, 3, 4}
+        del self.modulestore.blocks[self.block_key_factory(2)].field_map['update_version']
+        assert self.collect([IncrementalTestTransformer()]) == {2}
+
+    def test_outdated_transformer_version(self):
+        assert self.collect([IncrementalTestTransformer()]) == {0, 1, 2, 3, 4}
+        self.addCleanup(setattr, IncrementalTestTransformer, 'WRITE_VERSION', IncrementalTestTransformer.WRITE_VERSION)
+        IncrementalTestTransformer.WRITE_VERSION += 1
+        assert self.collect([IncrementalTestTransformer()]) == {0, 1, 2, 3, 4}
@@ -0,0 +1,136 @@
+"""
+Tests for block_structure/serialization.py
+"""
+# pylint: disable=protected-access
+
+import pytest
+import ddt
+from django.test import TestCase, override_settings
+
+from ..block_structure import BlockStructureBlockData, _LazyTransformerDataMap
+from ..exceptions import BlockStructureException
+from ..serialization import (
+    CompactSerializer,
+    SERIALIZERS,
+    ZPickleSerializer,
+    deserialize,
+    get_serializer,
+    get_serializer_for_data,
+    serialize
+)
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestSerializers(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the block structure serialization formats.
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        mock collected xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map, BlockStructureBlockData)
+        block_structure._add_transformer(MockTransformer)
+        block_structure.set_transformer_data(MockTransformer, 'structure_data', {'a': 1})
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_structure.override_xblock_field(block_key, 'display_name', f'Block {block_id}')
+            if block_id % 2:
+                block_structure.override_xblock_field(block_key, 'graded', True)
+                block_structure.set_transformer_block_field(block_key, MockTransformer, 'odd', block_id)
+        return block_structure
+
+    def assert_same_data(self, block_structure, other_block_structure, children_map):
+        """
+        Verifies that the given block structures have the same relations
+        and collected data.
+        """
+        self.assert_block_structure(other_block_structure, children_map)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            assert block_structure.get_parents(block_key) == other_block_structure.get_parents(block_key)
+            assert block_structure.get_children(block_key) == other_block_structure.get_children(block_key)
+            assert block_structure[block_key].location == other_block_structure[block_key].location
+            assert block_structure[block_key].fields == other_block_structure[block_key].fields
+            for field_name in ('display_name', 'graded'):
+                assert block_structure.get_xblock_field(block_key, field_name) ==\
+                    other_block_structure.get_xblock_field(block_key, field_name)
+            assert block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd') ==\
+                other_block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd')
+        assert block_structure._get_transformer_data_version(MockTransformer) ==\
+            other_block_structure._get_transformer_data_version(MockTransformer)
+        assert other_block_structure.get_transformer_data(MockTransformer, 'structure_data') == {'a': 1}
+
+    @ddt.data(*SERIALIZERS)
+    def test_round_trip(self, format_name):
+        for children_map in (
+            ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+            ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+            ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+        ):
+            block_structure = self.create_collected_block_structure(children_map)
+            serializer = get_serializer(format_name)
+            serialized_data = serializer.serialize(block_structure)
+            deserialized = deserialize(serialized_data, block_structure.root_block_usage_key)
+            self.assert_same_data(block_structure, deserialized, children_map)
+
+    @ddt.data(*SERIALIZERS.items())
+    @ddt.unpack
+    def test_format_detection(self, format_name, serializer_class):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={'SERIALIZATION_FORMAT': format_name}):
+            serialized_data = serialize(block_structure)
+        assert isinstance(get_serializer_for_data(serialized_data), serializer_class)
+
+    def test_zpickle_without_header(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = ZPickleSerializer().serialize(block_structure)
+        assert serialized_data == ZPickleSerializer()._encode(block_structure)
+
+    def test_default_format(self):
+        # Older releases can't read the compact format, so it's opt-in.
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={}):
+            assert isinstance(get_serializer(), ZPickleSerializer)
+
+    def test_compact_lazy_transformer_block_data(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = deserialize(
+            CompactSerializer().serialize(block_structure), block_structure.root_block_usage_key,
+        )
+        block_key = self.block_key_factory(1)
+        assert isinstance(deserialized[block_key].transformer_data, _LazyTransformerDataMap)
+        assert not deserialized[block_key].transformer_data
+
+        copied = deserialized.copy()
+        assert not copied[block_key].transformer_data
+        assert copied.get_transformer_block_field(block_key, MockTransformer, 'odd') == 1
+        assert MockTransformer.name() in copied[block_key].transformer_data
+        assert not deserialized[block_key].transformer_data
+
+        copied.set_transformer_block_field(block_key, MockTransformer, 'odd', 3)
+        assert deserialized.get_transformer_block_field(block_key, MockTransformer, 'odd') == 1
+        assert deserialized[block_key].transformer_data[MockTransformer].odd == 1
+
+    @ddt.data(*SERIALIZERS)
+    def test_reserialize_lazy(self, format_name):
+        block_structure = self.create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        deserialized = deserialize(
+            CompactSerializer().serialize(block_structure), block_structure.root_block_usage_key,
+        )
+        reserialized = deserialize(
+            get_serializer(format_name).serialize(deserialized), block_structure.root_block_usage_key,
+        )
+        self.assert_same_data(block_structure, reserialized, self.DAG_CHILDREN_MAP)
+
+    def test_unsupported_version(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = bytearray(CompactSerializer().serialize(block_structure))
+        serialized_data[3] = CompactSerializer.VERSION + 1
+        with pytest.raises(BlockStructureException):
+            deserialize(bytes(serialized_data), block_structure.root_block_usage_key)
+
+    def test_unknown_format(self):
+        with pytest.raises(BlockStructureException):
+            get_serializer('unknown')
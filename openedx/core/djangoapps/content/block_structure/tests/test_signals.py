@@ -76,3 +76,9 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
     def test_update_only_for_courses(self, key, expect_update_called, mock_update):
         update_block_structure_on_course_publish(sender=None, course_key=key)
         assert mock_update.called == expect_update_called
+
+    @patch('openedx.core.djangoapps.content.block_structure.manager.BlockStructureManager.clear_local')
+    def test_local_cache_invalidation(self, mock_bs_manager_clear_local):
+        self.course.display_name = "Padawan 101"
+        self.store.update_item(self.course, self.user.id)
+        assert mock_bs_manager_clear_local.called
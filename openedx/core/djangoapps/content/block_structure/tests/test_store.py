@@ -4,6 +4,7 @@ Tests for block_structure/cache.py
 
 import pytest
 import ddt
+from django.test import override_settings
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
@@ -11,7 +12,8 @@ from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from ..config import STORAGE_BACKING_FOR_CACHE
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
-from ..store import BlockStructureStore
+from ..serialization import SERIALIZERS
+from ..store import BlockStructureStore, local_cache
 from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, UsageKeyFactoryMixin
 
 
@@ -31,6 +33,8 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
 
         self.mock_cache = MockCache()
         self.store = BlockStructureStore(self.mock_cache)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
 
     def add_transformers(self):
         """
@@ -60,6 +64,23 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             assert stored_value is not None
             self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data(*SERIALIZERS)
+    def test_add_and_get_with_format(self, format_name):
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={'SERIALIZATION_FORMAT': format_name}):
+            self.store.add(self.block_structure)
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            assert stored_value.get_transformer_block_field(
+                self.block_key_factory(0), MockTransformer, 'test',
+            ) == f'{MockTransformer.name()} val'
+
+    def test_get_written_in_other_format(self):
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={'SERIALIZATION_FORMAT': 'zpickle'}):
+            self.store.add(self.block_structure)
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={'SERIALIZATION_FORMAT': 'compact'}):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
         with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
@@ -91,3 +112,100 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         assert self.mock_cache.timeout_from_last_call == 0
         self.store.add(self.block_structure)
         assert self.mock_cache.timeout_from_last_call == timeout
+
+    def clear_cached_data(self):
+        """
+        Removes the serialized block structure from the cache, leaving
+        the version of the structure in place.
+        """
+        bs_model = self.store._get_model(self.block_structure.root_block_usage_key)  # pylint: disable=protected-access
+        self.mock_cache.delete(self.store._encode_root_cache_key(bs_model))  # pylint: disable=protected-access
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 10 ** 6})
+    def test_local_cache_hit(self):
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        self.clear_cached_data()
+        stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+
+        # Each get returns a separate copy of the structure.
+        stored_value.remove_block(self.block_key_factory(1), keep_descendants=False)
+        other_stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        assert other_stored_value is not stored_value
+        self.assert_block_structure(other_stored_value, self.children_map)
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 10 ** 6})
+    def test_local_cache_hit_without_query(self):
+        with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.store.get(self.block_structure.root_block_usage_key)
+            with self.assertNumQueries(0):
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+
+    def test_local_cache_disabled(self):
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        self.clear_cached_data()
+        with pytest.raises(BlockStructureNotFound):
+            self.store.get(self.block_structure.root_block_usage_key)
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 10 ** 6})
+    def test_local_cache_new_version(self):
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+
+        # Another process collects a newer version of the structure.
+        encode_version_cache_key = self.store._encode_version_cache_key  # pylint: disable=protected-access
+        version_cache_key = encode_version_cache_key(self.block_structure.root_block_usage_key)
+        self.mock_cache.set(version_cache_key, 'newer version', timeout=0)
+        self.clear_cached_data()
+        with pytest.raises(BlockStructureNotFound):
+            self.store.get(self.block_structure.root_block_usage_key)
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 10 ** 6})
+    def test_local_cache_unknown_version(self):
+        self.store.add(self.block_structure)
+        encode_version_cache_key = self.store._encode_version_cache_key  # pylint: disable=protected-access
+        self.mock_cache.delete(encode_version_cache_key(self.block_structure.root_block_usage_key))
+        self.store.get(self.block_structure.root_block_usage_key)
+        self.clear_cached_data()
+        with pytest.raises(BlockStructureNotFound):
+            self.store.get(self.block_structure.root_block_usage_key)
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 10 ** 6})
+    def test_local_cache_version_from_storage(self):
+        with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.mock_cache.map.clear()
+            self.store.get(self.block_structure.root_block_usage_key)
+            with self.assertNumQueries(0):
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 10 ** 6})
+    def test_local_cache_delete(self):
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        self.store.delete_local(self.block_structure.root_block_usage_key)
+        self.clear_cached_data()
+        with pytest.raises(BlockStructureNotFound):
+            self.store.get(self.block_structure.root_block_usage_key)
+
+    def test_local_cache_eviction(self):
+        with override_settings(BLOCK_STRUCTURES_SETTINGS={'LOCAL_CACHE_MAX_SIZE': 25}):
+            for root_block_id in range(3):
+                local_cache.set(root_block_id, 'version', self.block_structure, 10)
+            assert local_cache.get(0, 'version') is None
+            assert local_cache.get(1, 'version') is self.block_structure
+            assert local_cache.get(2, 'version') is self.block_structure
+
+            local_cache.get(1, 'version')
+            local_cache.set(3, 'version', self.block_structure, 10)
+            assert local_cache.get(1, 'version') is self.block_structure
+            assert local_cache.get(2, 'version') is None
+            assert local_cache.get(3, 'version') is self.block_structure
+
+            # Entries are only returned for their version.
+            assert local_cache.get(3, 'other version') is None
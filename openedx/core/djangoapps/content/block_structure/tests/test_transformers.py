@@ -8,10 +8,37 @@ import pytest
 
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerDataIncompatible, TransformerException
+from ..transformer import combine_filters
 from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
 
 
+class OrderedFilteringTransformer(MockFilteringTransformer):
+    """
+    Mock filtering transformer whose filters are applied in order,
+    removing the blocks in its removed_blocks list.
+    """
+    APPLY_IN_ORDER = True
+
+    def __init__(self, removed_blocks):
+        self.removed_blocks = removed_blocks
+
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_removal_filter(lambda block_key: block_key in self.removed_blocks)]
+
+
+class RecordingTransformer(MockTransformer):
+    """
+    Mock transformer that records the blocks remaining in the block
+    structure when it is applied.
+    """
+    def __init__(self):
+        self.remaining_blocks = None
+
+    def transform(self, usage_info, block_structure):
+        self.remaining_blocks = set(block_structure.topological_traversal())
+
+
 class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
     """
     Test class for testing BlockStructureTransformers
@@ -40,6 +67,12 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
         assert self.registered_transformers[0] in self.transformers._transformers['no_filter']  # pylint: disable=protected-access, line-too-long
         assert self.registered_transformers[1] in self.transformers._transformers['supports_filter']  # pylint: disable=protected-access, line-too-long
 
+    def test_add_ordered_filtering(self):
+        transformer = OrderedFilteringTransformer([])
+        with mock_registered_transformers([transformer]):
+            self.transformers += [transformer]
+        assert transformer in self.transformers._transformers['no_filter']  # pylint: disable=protected-access
+
     def test_add_unregistered(self):
         with pytest.raises(TransformerException):
             self.transformers += [self.UnregisteredTransformer()]
@@ -75,3 +108,52 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             assert self.transformers.verify_versions(block_structure)
+
+    def test_transform_ordered_filters(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        recording_transformer = RecordingTransformer()
+        transformers = [
+            OrderedFilteringTransformer([1]),
+            recording_transformer,
+            OrderedFilteringTransformer([2]),
+            OrderedFilteringTransformer([4]),
+        ]
+        with mock_registered_transformers(transformers):
+            self.transformers += transformers
+
+        with patch.object(
+            block_structure, 'filter_topological_traversal', wraps=block_structure.filter_topological_traversal,
+        ) as mock_traversal:
+            self.transformers.transform(block_structure)
+
+        assert recording_transformer.remaining_blocks == {0, 2}
+        assert set(block_structure.topological_traversal()) == {0}
+        # the filters of the two adjacent transformers are applied in a single traversal
+        assert mock_traversal.call_count == 2
+
+    def test_transform_universal_filters(self):
+        block_structure = MagicMock()
+        self.add_mock_transformer()
+        self.transformers.transform(block_structure)
+        assert not block_structure.filter_topological_traversal.called
+
+    def test_combine_filters(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        universal_filter = block_structure.create_universal_filter()
+        evaluated = []
+
+        def recording_filter(result):
+            def _filter(block_key):
+                evaluated.append((result, block_key))
+                return result
+            return _filter
+
+        assert combine_filters(block_structure, []) is universal_filter
+        assert combine_filters(block_structure, [universal_filter, universal_filter]) is universal_filter
+
+        single_filter = recording_filter(True)
+        assert combine_filters(block_structure, [universal_filter, single_filter]) is single_filter
+
+        combined_filter = combine_filters(block_structure, [recording_filter(False), recording_filter(True)])
+        assert not combined_filter(1)
+        assert evaluated == [(False, 1)]
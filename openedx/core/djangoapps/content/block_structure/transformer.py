@@ -5,7 +5,6 @@ Transformers.
 
 
 from abc import abstractmethod
-import functools
 
 
 class BlockStructureTransformer:
@@ -58,6 +57,25 @@ class BlockStructureTransformer:
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Transformers may opt in to incremental collection, where only the
+    # blocks that changed since the previous collection (and all of
+    # their descendants) have instantiated xBlocks during the collect
+    # phase.  The previously collected data of all other blocks is
+    # carried over unchanged.
+    #
+    # A transformer should set INCREMENTAL_COLLECT to True only if its
+    # collect implementation accesses xBlocks solely for blocks returned
+    # by block_structure.xblock_topological_traversal (or only calls
+    # request_xblock_fields).  Collection falls back to a full traversal
+    # of the course whenever any registered transformer does not opt in.
+    #
+    # A transformer whose collected data for a block depends on the
+    # block's descendants should also set COLLECT_DEPENDS_ON_DESCENDANTS
+    # to True, so the ancestors of changed blocks are re-collected too.
+    #
+    INCREMENTAL_COLLECT = False
+    COLLECT_DEPENDS_ON_DESCENDANTS = False
+
     @classmethod
     def name(cls):
         """
@@ -169,7 +187,13 @@ class FilteringTransformerMixin(BlockStructureTransformer):
     whenever possible - with this alternative, traversal of the entire block
     structure happens only once for all transformers that implement
     FilteringTransformerMixin.
+
+    Transformers whose filters depend on the transforms of the transformers
+    added before them should set APPLY_IN_ORDER to True.  Their filters are
+    then applied in the order in which they were added, combined into a
+    single traversal with the filters of adjacent such transformers.
     """
+    APPLY_IN_ORDER = False
 
     def transform(self, usage_info, block_structure):
         """
@@ -178,8 +202,7 @@ class FilteringTransformerMixin(BlockStructureTransformer):
         transform_block_filters calls will be combined and used in a single
         tree traversal.
         """
-        filters = self.transform_block_filters(usage_info, block_structure)
-        block_structure.filter_topological_traversal(combine_filters(block_structure, filters))
+        apply_filters(block_structure, self.transform_block_filters(usage_info, block_structure))
 
     @abstractmethod
     def transform_block_filters(self, usage_info, block_structure):
@@ -194,9 +217,12 @@ class FilteringTransformerMixin(BlockStructureTransformer):
             create_universal_filter
             create_removal_filter
 
-        Note: Transformers that implement this alternative should be
-        independent of all other registered transformers as they may not
-        be applied in the order in which they were listed in the registry.
+        Note: Unless APPLY_IN_ORDER is set, transformers that implement
+        this alternative should be independent of all other registered
+        transformers as they may not be applied in the order in which
+        they were listed in the registry.  Otherwise, this method may be
+        called before the filters of the preceding adjacent transformers
+        are applied.
 
         Arguments:
             usage_info (any negotiated type) - A usage-specific object
@@ -214,16 +240,33 @@ class FilteringTransformerMixin(BlockStructureTransformer):
 
 
 def combine_filters(block_structure, filters):
-    return functools.reduce(
-        _filter_chain,
-        filters,
-        block_structure.create_universal_filter()
-    )
+    """
+    Returns a single filter function that 'ands' the given filters
+    together, evaluating them in order and stopping at the first one that
+    returns False.  Universal filters are left out of the combination.
+    """
+    universal_filter = block_structure.create_universal_filter()
+    filters = [filter_func for filter_func in filters if filter_func is not universal_filter]
+    if not filters:
+        return universal_filter
+    if len(filters) == 1:
+        return filters[0]
+
+    def combined_filter(block_key):
+        for filter_func in filters:
+            if not filter_func(block_key):
+                return False
+        return True
+
+    return combined_filter
 
 
-def _filter_chain(accumulated, additional):
+def apply_filters(block_structure, filters):
     """
-    Given two functions that take a block_key and return a boolean, yield
-    a function that takes a block key, and 'ands' the functions together
+    Applies the given filters to the given block_structure in a single
+    traversal, which is skipped entirely if none of the filters can
+    remove any block.
     """
-    return lambda block_key: accumulated(block_key) and additional(block_key)
+    combined_filter = combine_filters(block_structure, filters)
+    if combined_filter is not block_structure.create_universal_filter():
+        block_structure.filter_topological_traversal(combined_filter)
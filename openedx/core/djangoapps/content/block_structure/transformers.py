@@ -4,7 +4,7 @@ Module for a collection of BlockStructureTransformers.
 from logging import getLogger
 
 from .exceptions import TransformerDataIncompatible, TransformerException
-from .transformer import FilteringTransformerMixin, combine_filters
+from .transformer import FilteringTransformerMixin, apply_filters
 from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
@@ -62,7 +62,7 @@ class BlockStructureTransformers:
             )
 
         for transformer in transformers:
-            if isinstance(transformer, FilteringTransformerMixin):
+            if isinstance(transformer, FilteringTransformerMixin) and not transformer.APPLY_IN_ORDER:
                 self._transformers['supports_filter'].append(transformer)
             else:
                 self._transformers['no_filter'].append(transformer)
@@ -108,7 +108,9 @@ class BlockStructureTransformers:
         The given block structure is transformed by each transformer in the
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
-        the order that they were added.
+        the order that they were added, with the filters of adjacent
+        transformers that apply them in order combined into a single
+        traversal.
         """
         self._transform_with_filters(block_structure)
         self._transform_without_filters(block_structure)
@@ -128,13 +130,20 @@ class BlockStructureTransformers:
         for transformer in self._transformers['supports_filter']:
             filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
 
-        combined_filters = combine_filters(block_structure, filters)
-        block_structure.filter_topological_traversal(combined_filters)
+        apply_filters(block_structure, filters)
 
     def _transform_without_filters(self, block_structure):
         """
         Transforms the given block_structure using the transform
-        method from the given transformers.
+        method from the given transformers, or the transform_block_filters
+        method for transformers that apply their filters in order.
         """
+        ordered_filters = []
         for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+            if isinstance(transformer, FilteringTransformerMixin):
+                ordered_filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            else:
+                apply_filters(block_structure, ordered_filters)
+                ordered_filters = []
+                transformer.transform(self.usage_info, block_structure)
+        apply_filters(block_structure, ordered_filters)
@@ -6,12 +6,19 @@ Signal handler for exceptions.
 
 import logging
 
-from celery.signals import task_postrun
+from celery.signals import task_postrun, task_prerun
 from django.conf import settings
 from django.core.signals import got_request_exception
 from django.dispatch import receiver
 from edx_django_utils.cache import RequestCache
 
+from xmodule.modulestore.split_mongo.mongo_connection import start_profile, stop_profile
+
+log = logging.getLogger(__name__)
+
+# The modulestore query profiles of the running celery tasks, by task id.
+_TASK_QUERY_PROFILES = {}
+
 
 @receiver(got_request_exception)
 def record_request_exception(sender, **kwargs):
@@ -32,3 +39,24 @@ def _clear_request_cache(**kwargs):
     """
     if getattr(settings, 'CLEAR_REQUEST_CACHE_ON_TASK_COMPLETION', True):
         RequestCache.clear_all_namespaces()
+
+
+@task_prerun.connect
+def _start_modulestore_query_profile(task_id=None, **kwargs):
+    """
+    When MODULESTORE_QUERY_PROFILING is enabled, start profiling the
+    modulestore queries made by a celery task.
+    """
+    if getattr(settings, 'MODULESTORE_QUERY_PROFILING', False):
+        _TASK_QUERY_PROFILES[task_id] = start_profile()
+
+
+@task_postrun.connect
+def _log_modulestore_query_profile(task_id=None, task=None, **kwargs):
+    """
+    Once a profiled celery task completes, log the modulestore queries it made.
+    """
+    profile = _TASK_QUERY_PROFILES.pop(task_id, None)
+    if profile is not None:
+        stop_profile(profile)
+        log.info('Modulestore queries of task %s[%s]: %s', task.name, task_id, profile)
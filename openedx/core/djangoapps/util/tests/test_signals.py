@@ -2,12 +2,16 @@
 
 
 from unittest import TestCase
+from unittest.mock import patch
 from pytest import mark
 
 from celery import shared_task
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
 
+from openedx.core.djangoapps.util import signals
+from xmodule.modulestore.split_mongo.mongo_connection import TIMER, active_profiles
+
 
 @mark.django_db
 class TestClearRequestCache(TestCase):
@@ -26,3 +30,29 @@ class TestClearRequestCache(TestCase):
     def test_clear_cache_celery(self):
         self._dummy_task.apply(args=(self,)).get()
         assert not self._get_cache().get_cached_response('cache_key').is_found
+
+
+class TestModulestoreQueryProfile(TestCase):
+    """
+    Tests the modulestore queries made by celery tasks are logged when profiling is enabled.
+    """
+    @shared_task
+    def _dummy_task(self):
+        """ A task that makes a modulestore query. """
+        with TIMER.timer('get_definition', 'course'):
+            pass
+
+    @override_settings(MODULESTORE_QUERY_PROFILING=True)
+    def test_profiling_enabled(self):
+        with patch.object(signals, 'log') as mock_log:
+            self._dummy_task.apply(args=(self,)).get()
+        mock_log.info.assert_called_once()
+        assert 'definition_queries=1' in str(mock_log.info.call_args[0][-1])
+        assert not active_profiles()
+        assert not signals._TASK_QUERY_PROFILES  # pylint: disable=protected-access
+
+    @override_settings(MODULESTORE_QUERY_PROFILING=False)
+    def test_profiling_disabled(self):
+        with patch.object(signals, 'log') as mock_log:
+            self._dummy_task.apply(args=(self,)).get()
+        mock_log.info.assert_not_called()
@@ -16,6 +16,7 @@ from opaque_keys.edx.keys import CourseKey
 from rest_framework.views import exception_handler
 
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
+from xmodule.modulestore.split_mongo.mongo_connection import profile_queries
 
 # accommodates course api urls, excluding any course api routes that do not fall under v*/courses, such as v1/blocks.
 COURSE_REGEX = re.compile(fr'^(.*?/courses/)(?!v[0-9]+/[^/]+){settings.COURSE_ID_PATTERN}')
@@ -231,6 +232,42 @@ class CookieMonitoringMiddleware(MiddlewareMixin):
             log.debug('%s = %d', name, size)
 
 
+class ModulestoreProfilingMiddleware:
+    """
+    Middleware for reporting the split modulestore queries made by each request, to see which
+    views make more queries than they should.
+
+    Attributes that are added by this middleware, for each of the values of the QueryProfile summary:
+
+    modulestore.<kind>_queries: The number of mongo queries of structures, definitions or course indexes.
+    modulestore.<kind>_ms: The time spent in those queries, in milliseconds.
+    modulestore.<tier>_hits: The number of structures found in each structure cache.
+    modulestore.<tier>_misses: The number of structures not found in each structure cache.
+    modulestore.bytes_decoded: The bytes of structures decoded from the course_structure_cache.
+
+    The summary is also logged, and returned in the X-Modulestore-Profile response header.
+
+    Related Settings (see annotations for details):
+
+    - MODULESTORE_QUERY_PROFILING
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'MODULESTORE_QUERY_PROFILING', False):
+            return self.get_response(request)
+
+        with profile_queries() as profile:
+            response = self.get_response(request)
+
+        for name, value in profile.summary().items():
+            set_custom_attribute(f'modulestore.{name}', value)
+        log.info('Modulestore queries of %s %s: %s', request.method, request.path, profile)
+        response['X-Modulestore-Profile'] = str(profile)
+        return response
+
+
 def expected_error_exception_handler(exc, context):
     """
     Replacement for DRF's default exception handler to enable observing expected errors.
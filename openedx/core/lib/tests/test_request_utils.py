@@ -7,6 +7,7 @@ import ddt
 import pytest
 from django.conf import settings
 from django.core.exceptions import SuspiciousOperation
+from django.http import HttpResponse
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
@@ -14,6 +15,7 @@ from edx_django_utils.cache import RequestCache
 from openedx.core.lib.request_utils import (
     CookieMonitoringMiddleware,
     ExpectedErrorMiddleware,
+    ModulestoreProfilingMiddleware,
     _get_expected_error_settings_dict,
     clear_cached_expected_error_settings,
     course_id_from_url,
@@ -21,6 +23,7 @@ from openedx.core.lib.request_utils import (
     get_request_or_stub,
     safe_get_host,
 )
+from xmodule.modulestore.split_mongo.mongo_connection import TIMER
 
 
 class RequestUtilTestCase(unittest.TestCase):
@@ -212,6 +215,45 @@ class RequestUtilTestCase(unittest.TestCase):
         ], any_order=True)
 
 
+class TestModulestoreProfilingMiddleware(unittest.TestCase):
+    """
+    Tests for ModulestoreProfilingMiddleware
+    """
+    def setUp(self):
+        super().setUp()
+        self.mock_request = RequestFactory().get('/test')
+
+    @staticmethod
+    def _get_response(request):
+        """
+        A view which makes a modulestore query.
+        """
+        with TIMER.timer('get_structure.find_one', 'course'):
+            pass
+        return HttpResponse()
+
+    @override_settings(MODULESTORE_QUERY_PROFILING=True)
+    @patch('openedx.core.lib.request_utils.set_custom_attribute')
+    def test_profiling_enabled(self, mock_set_custom_attribute):
+        response = ModulestoreProfilingMiddleware(self._get_response)(self.mock_request)
+
+        assert 'structure_queries=1, ' in response['X-Modulestore-Profile']
+        assert 'definition_queries=0, ' in response['X-Modulestore-Profile']
+        mock_set_custom_attribute.assert_has_calls([
+            call('modulestore.structure_queries', 1),
+            call('modulestore.definition_queries', 0),
+            call('modulestore.course_index_queries', 0),
+        ], any_order=True)
+
+    @override_settings(MODULESTORE_QUERY_PROFILING=False)
+    @patch('openedx.core.lib.request_utils.set_custom_attribute')
+    def test_profiling_disabled(self, mock_set_custom_attribute):
+        response = ModulestoreProfilingMiddleware(self._get_response)(self.mock_request)
+
+        assert 'X-Modulestore-Profile' not in response
+        mock_set_custom_attribute.assert_not_called()
+
+
 class TestGetExpectedErrorSettingsDict(unittest.TestCase):
     """
     Tests for processing issues in _get_expected_error_settings_dict()